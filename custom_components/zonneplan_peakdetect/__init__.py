@@ -1,24 +1,37 @@
 from __future__ import annotations
 
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from typing import TYPE_CHECKING
 
-from .data import ZonneplanBmsConfigEntry, ZonneplanBmsData
+from .const import STORAGE_KEY, STORAGE_VERSION
+
+# Home Assistant is only imported when the integration is set up, so the scheduling
+# core in .core can be imported by the CLI and the tools without loading it.
+if TYPE_CHECKING:
+    from homeassistant.const import Platform
+    from homeassistant.core import HomeAssistant
+
+    from .data import ZonneplanBmsConfigEntry
+
+
+def _platforms() -> list[Platform]:
+    """The platforms of this integration; imports Platform only once an entry is set up."""
+    from homeassistant.const import Platform
+
+    return [Platform.SENSOR]
 
-PLATFORMS: list[Platform] = [
-    Platform.SENSOR,
-]
 
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ZonneplanBmsConfigEntry
 ) -> bool:
     """Set up this integration using UI."""
+    from .data import ZonneplanBmsData
+
     entry.runtime_data = ZonneplanBmsData(
         integration=entry.version, # Placeholder or actual integration object if needed
     )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, _platforms())
     
     return True
 
@@ -27,4 +40,13 @@ async def async_unload_entry(
     entry: ZonneplanBmsConfigEntry
 ) -> bool:
     """Handle removal of an entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
\ No newline at end of file
+    return await hass.config_entries.async_unload_platforms(entry, _platforms())
+
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: ZonneplanBmsConfigEntry
+) -> None:
+    """Remove the stored schedule of a deleted entry."""
+    from homeassistant.helpers.storage import Store
+
+    await Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}").async_remove()
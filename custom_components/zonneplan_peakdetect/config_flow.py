@@ -16,14 +16,21 @@ from .const import (
     CONF_MIN_PROFIT,
     CONF_RTE_PERCENT,
     CONF_ALGORITHM,
+    CONF_BACKEND,
     ALGORITHM_WHSS,
     ALGORITHM_HSWAS,
+    ALGORITHM_SOC_DP,
+    ALGORITHM_PAIRING,
+    BACKEND_AUTO,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
     DEFAULT_CENTS,
     DEFAULT_CHARGE_QUARTERS,
     DEFAULT_DISCHARGE_QUARTERS,
     DEFAULT_FORECAST_ENTITY,
     DEFAULT_PERCENTAGE,
     DEFAULT_ALGORITHM,
+    DEFAULT_BACKEND,
     DOMAIN,
 )
 
@@ -55,7 +62,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Required(
                 CONF_ALGORITHM,
                 default=user_input.get(CONF_ALGORITHM, DEFAULT_ALGORITHM)
-            ): vol.In([ALGORITHM_WHSS, ALGORITHM_HSWAS]),
+            ): vol.In([ALGORITHM_WHSS, ALGORITHM_HSWAS, ALGORITHM_SOC_DP, ALGORITHM_PAIRING]),
             vol.Required(
                 CONF_RTE_PERCENT, 
                 default=user_input.get(CONF_RTE_PERCENT, DEFAULT_PERCENTAGE)
@@ -76,6 +83,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_FORECAST_ENTITY, 
                 default=user_input.get(CONF_FORECAST_ENTITY, DEFAULT_FORECAST_ENTITY)
             ): cv.string,
+            vol.Required(
+                CONF_BACKEND,
+                default=user_input.get(CONF_BACKEND, DEFAULT_BACKEND)
+            ): vol.In([BACKEND_AUTO, BACKEND_PYTHON, BACKEND_NUMPY]),
         })
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> FlowResult:
@@ -16,10 +16,18 @@ CONF_RTE_PERCENT = "price_delta_percent"
 CONF_MIN_PROFIT = "min_profit_c_kwh"
 CONF_FORECAST_ENTITY = "forecast_entity"
 CONF_ALGORITHM = "algorithm_type"
+CONF_BACKEND = "strategy_backend"
 
 # Algorithm types
 ALGORITHM_WHSS = "whss"
 ALGORITHM_HSWAS = "hswas"
+ALGORITHM_SOC_DP = "soc_dp"
+ALGORITHM_PAIRING = "pairing"
+
+# Strategy calculation backends
+BACKEND_AUTO = "auto"
+BACKEND_PYTHON = "python"
+BACKEND_NUMPY = "numpy"
 
 # Standaardwaarden (optioneel)
 DEFAULT_PERCENTAGE = 20
@@ -30,8 +38,57 @@ DEFAULT_CHARGE_QUARTERS = 8
 DEFAULT_DISCHARGE_QUARTERS = 8
 DEFAULT_FORECAST_ENTITY = "sensor.zonneplan_current_quarter_hourly_electricity_tariff"
 DEFAULT_ALGORITHM = ALGORITHM_WHSS
+DEFAULT_BACKEND = BACKEND_AUTO
+
+# Look-ahead of the HSWAS wave search; set in time so it covers the same period at any resolution
+HSWAS_HORIZON_HOURS = 24
+
+# Feeds with slots shorter than FINE_RESOLUTION_MINUTES are planned coarse-to-fine by HSWAS:
+# waves are searched on prices averaged to COARSE_SLOT_MINUTES, slots are picked at full resolution
+FINE_RESOLUTION_MINUTES = 15
+COARSE_SLOT_MINUTES = 60
+
+# Upper bound on the SOC-DP battery levels; lcm(charge, discharge) of nearly coprime slot counts is rounded down to it
+SOC_DP_MAX_LEVELS = 512
+
+# Number of recent forecast plans kept per sensor
+PLAN_CACHE_SIZE = 8
+
+# Seconds to wait for a burst of forecast updates to settle before re-planning
+FORECAST_DEBOUNCE_SECONDS = 2.0
+
+# Minimum seconds between warnings about malformed forecast items; repeats are logged at debug level
+MALFORMED_FORECAST_WARNING_SECONDS = 3600
+
+# Persisted last plan per config entry, restored on startup
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.plan"
+STORAGE_SAVE_DELAY_SECONDS = 10
+
+# Number of recent planning runs kept for the diagnostics download
+PLANNING_TRACE_SIZE = 20
+
+# Service capturing a cProfile of the next re-plans
+SERVICE_PROFILE_REPLANS = "profile_replans"
+ATTR_COUNT = "count"
+SERVICE_GET_SCHEDULE = "get_schedule"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_ACTION = "action"
+ATTR_INTERVAL_ID = "interval_id"
+ATTR_OUTPUT = "output"
+OUTPUT_SLOTS = "slots"
+OUTPUT_SPANS = "spans"
+DEFAULT_PROFILE_REPLANS = 5
+MAX_PROFILE_REPLANS = 50
 
 # State definitions
 ACTION_CHARGE = "Charge"
 ACTION_DISCHARGE = "Discharge"
 ACTION_STOP = "Stop"
+
+# Compact action codes used inside the slot timeline
+ACTION_CODE_STOP = 0
+ACTION_CODE_CHARGE = 1
+ACTION_CODE_DISCHARGE = 2
+ACTION_NAMES = (ACTION_STOP, ACTION_CHARGE, ACTION_DISCHARGE)
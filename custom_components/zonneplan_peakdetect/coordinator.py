@@ -0,0 +1,129 @@
+"""Forecast coordinator shared by all optimizers planning the same forecast entity."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+from .core.forecast import forecast_fingerprint, prepare_timeline
+from .core.timeline import SlotTimeline
+
+
+@callback
+def async_get_forecast_coordinator(hass: HomeAssistant, forecast_entity_id: str) -> ForecastCoordinator:
+    """Returns the coordinator of a forecast entity, creating it on first use."""
+    coordinators: dict[str, ForecastCoordinator] = hass.data.setdefault(DOMAIN, {})
+    coordinator = coordinators.get(forecast_entity_id)
+    if coordinator is None:
+        coordinator = coordinators[forecast_entity_id] = ForecastCoordinator(hass, forecast_entity_id)
+    return coordinator
+
+
+class ForecastCoordinator:
+    """
+    Parses and prepares the forecast of one entity once for all config entries using it.
+
+    There is a single state listener per forecast entity, fanned out to the optimizers.
+    The fingerprint and the prepared timeline are computed once per forecast: all
+    optimizers reading the same state get the same attribute list, so the latest one is
+    recognized by identity. Optimizers plan an `unplanned()` view of the shared timeline
+    and only pay for their own strategy run. The coordinator removes itself from
+    `hass.data` when its last listener is removed.
+    """
+
+    def __init__(self, hass: HomeAssistant, forecast_entity_id: str) -> None:
+        """Initialize the coordinator of forecast_entity_id."""
+        self.hass = hass
+        self.forecast_entity_id = forecast_entity_id
+        self._listeners: list[Callable[[Event], None]] = []
+        self._unsub_state: CALLBACK_TYPE | None = None
+        # Forecast list the fingerprint and the prepared timeline belong to
+        self._forecast_data: list[dict[str, Any]] | None = None
+        self._fingerprint: int | None = None
+        self._prepared: asyncio.Future[SlotTimeline] | None = None
+        # Duration of the last preparation, recorded as ingest time by the optimizers
+        self.ingest_seconds = 0.0
+
+    @callback
+    def async_add_listener(self, listener: Callable[[Event], None]) -> CALLBACK_TYPE:
+        """Calls listener on every state change of the forecast entity; returns its remover."""
+        if self._unsub_state is None:
+            self._unsub_state = async_track_state_change_event(
+                self.hass, self.forecast_entity_id, self._handle_state_change
+            )
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+            if not self._listeners:
+                self._async_shutdown()
+
+        return remove_listener
+
+    @callback
+    def _handle_state_change(self, event: Event) -> None:
+        for listener in list(self._listeners):
+            listener(event)
+
+    @callback
+    def _async_shutdown(self) -> None:
+        if self._unsub_state is not None:
+            self._unsub_state()
+            self._unsub_state = None
+        self._forecast_data = self._prepared = None
+        coordinators = self.hass.data.get(DOMAIN, {})
+        if coordinators.get(self.forecast_entity_id) is self:
+            del coordinators[self.forecast_entity_id]
+
+    def _select(self, forecast_data: list[dict[str, Any]]) -> None:
+        if forecast_data is not self._forecast_data:
+            self._forecast_data = forecast_data
+            self._fingerprint = forecast_fingerprint(forecast_data)
+            self._prepared = None
+
+    def fingerprint(self, forecast_data: list[dict[str, Any]]) -> int | None:
+        """Fingerprint of the forecast, computed once per forecast list."""
+        self._select(forecast_data)
+        return self._fingerprint
+
+    async def async_prepare(self, forecast_data: list[dict[str, Any]]) -> SlotTimeline:
+        """
+        The prepared, unplanned timeline of the forecast; never modify it.
+
+        The first caller prepares it in the executor, concurrent callers for the same
+        forecast wait for that result.
+        """
+        self._select(forecast_data)
+        prepared = self._prepared
+        if prepared is None:
+            prepared = self._prepared = self.hass.loop.create_future()
+            try:
+                timeline = await self.hass.async_add_executor_job(self._prepare, forecast_data)
+            except Exception as err:
+                prepared.set_exception(err)
+                # Retrieved here, so waiters are optional and the next caller retries
+                prepared.exception()
+                if self._prepared is prepared:
+                    self._prepared = None
+                raise
+            prepared.set_result(timeline)
+            return timeline
+        return await asyncio.shield(prepared)
+
+    def _prepare(self, forecast_data: list[dict[str, Any]]) -> SlotTimeline:
+        started = time.perf_counter()
+        timeline = prepare_timeline(forecast_data, dt_util.parse_datetime)
+        self.ingest_seconds = time.perf_counter() - started
+        LOGGER.debug(
+            "Prepared %d forecast slots of %s in %.1f ms",
+            len(timeline), self.forecast_entity_id, self.ingest_seconds * 1000.0,
+        )
+        return timeline
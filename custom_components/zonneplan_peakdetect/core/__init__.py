@@ -0,0 +1,8 @@
+"""
+Home-Assistant-free scheduling core: forecast preparation, the slot timeline and the
+arbitrage strategies.
+
+Nothing in this package imports Home Assistant, so the CLI and the development tools
+run exactly the production code path without loading it. The modules are imported
+directly (`core.forecast`, `core.planner`, ...) to keep this package import cheap.
+"""
@@ -0,0 +1,209 @@
+"""Forecast parsing and timeline preparation, shared by the sensor and the CLI tools."""
+
+from __future__ import annotations
+
+import time
+from array import array
+from collections.abc import Callable
+from hashlib import blake2b
+from datetime import datetime
+from itertools import accumulate, repeat
+from operator import truediv
+from typing import Any
+
+from ..const import LOGGER, MALFORMED_FORECAST_WARNING_SECONDS
+from .timeline import SlotTimeline, modal_duration, slot_durations
+
+# Parser for start times that are not ISO 8601, returning None when it cannot parse them either
+DatetimeParser = Callable[[str], datetime | None]
+
+# Raw forecast prices are in deci-micro-euro per kWh
+PRICE_SCALE = 10_000_000.0
+
+# Monotonic time of the last malformed-forecast warning
+_malformed_warned_at: float | None = None
+
+
+def parse_datetime(val: Any, fallback: DatetimeParser | None = None) -> datetime | None:
+    """
+    Safely parse a datetime object or ISO 8601 string.
+
+    Strings that are not ISO 8601 go to fallback when given; the integration passes Home
+    Assistant's dt_util.parse_datetime, which also accepts e.g. single-digit fields.
+    """
+    if isinstance(val, datetime):
+        return val
+    if isinstance(val, str):
+        try:
+            return datetime.fromisoformat(val)
+        except ValueError:
+            # Also accept a space instead of the 'T' separator
+            try:
+                return datetime.fromisoformat(val.strip().replace(" ", "T", 1))
+            except ValueError:
+                return fallback(val) if fallback is not None else None
+    return None
+
+
+def convert_price(price_int: int) -> float:
+    """
+    Converts the raw integer price to €/kWh.
+
+    The raw integer is typically in a scaled unit (e.g., deci-micro-euro)
+    and must be divided by 10,000,000.0 to get the price in Euro/kWh (€/kWh).
+    """
+    return price_int / PRICE_SCALE
+
+
+def forecast_fingerprint(forecast_data: list[dict[str, Any]]) -> int | None:
+    """
+    Cheap fingerprint of the fields of a forecast that influence the plan.
+
+    The fingerprint is stable across restarts (unlike hash() of strings), so a persisted
+    plan can be matched against the forecast after a restart. Returns None when the
+    forecast holds unhashable values, which disables caching for it.
+    """
+    try:
+        key = tuple(
+            (
+                item.get('start_date'),
+                item.get('datetime'),
+                item.get('price_eur_kwh'),
+                item.get('electricity_price'),
+                item['price_tax_included'].get('amount') if isinstance(item.get('price_tax_included'), dict) else None,
+            )
+            for item in forecast_data
+        )
+        hash(key)
+    except (AttributeError, TypeError):
+        return None
+    return int.from_bytes(blake2b(repr(key).encode(), digest_size=8).digest(), "big")
+
+
+def prepare_timeline(
+    forecast_data: list[dict[str, Any]], parse_fallback: DatetimeParser | None = None
+) -> SlotTimeline:
+    """
+    Builds the unplanned slot timeline of a forecast.
+
+    Supports the standard day-ahead schema (`datetime` / `electricity_price`), the nested
+    Zonneplan schema (`start_date` / `price_tax_included.amount`) and prices already in
+    €/kWh (`price_eur_kwh`). Items without a datetime or price are skipped and reported
+    in one summary warning. Start times that are not ISO 8601 go to parse_fallback.
+    """
+    decoded = _decode_uniform(forecast_data)
+    datetimes, prices = decoded if decoded is not None else _decode_items(forecast_data)
+    starts = _parse_datetimes(datetimes, parse_fallback)
+    # Price relative to the lowest price so far
+    multipliers = array('d', [
+        round(price / running_min, 2) if running_min > 0
+        else round(1.0 + price / -running_min, 2) if running_min else 1.0
+        for price, running_min in zip(prices, accumulate(prices, min))
+    ])
+
+    # Slot counts scale with the most common slot duration, so a mixed feed follows its dominant resolution
+    durations = slot_durations(starts)
+    interval_minutes = max(1, modal_duration(durations) // 60)
+    return SlotTimeline(datetimes, prices, multipliers, starts, interval_minutes, durations)
+
+
+def _decode_uniform(forecast_data: list[dict[str, Any]]) -> tuple[list[Any], array] | None:
+    """
+    Decodes a forecast whose items all have the keys of the first item (in the same order),
+    column by column.
+
+    The schema is detected once from the first item, after which the datetimes and prices
+    are extracted and converted in bulk. Returns None when any item deviates (other keys,
+    a missing datetime, a missing or non-numeric price), leaving it to `_decode_items`.
+    """
+    if not forecast_data or not isinstance(forecast_data[0], dict):
+        return None
+    keys = tuple(forecast_data[0])
+    datetime_key = 'start_date' if 'start_date' in keys else 'datetime' if 'datetime' in keys else None
+    if datetime_key is None:
+        return None
+    try:
+        # Items decoded from one payload list their keys in the same order, comparing tuples is cheapest
+        if list(map(tuple, forecast_data)).count(keys) != len(forecast_data):
+            return None
+        datetimes = [item[datetime_key] for item in forecast_data]
+        if None in datetimes:
+            return None
+        if 'price_eur_kwh' in keys:
+            prices = array('d', [item['price_eur_kwh'] for item in forecast_data])
+        elif 'price_tax_included' in keys:
+            raw_prices = [item['price_tax_included']['amount'] for item in forecast_data]
+            prices = array('d', map(truediv, raw_prices, repeat(PRICE_SCALE)))
+        elif 'electricity_price' in keys:
+            raw_prices = [item['electricity_price'] for item in forecast_data]
+            prices = array('d', map(truediv, raw_prices, repeat(PRICE_SCALE)))
+        else:
+            return None
+    except (AttributeError, KeyError, TypeError):
+        return None
+    return datetimes, prices
+
+
+def _decode_items(forecast_data: list[dict[str, Any]]) -> tuple[list[Any], array]:
+    """Decodes a forecast item by item, for feeds mixing schemas or holding incomplete items."""
+    datetimes: list[Any] = []
+    prices = array('d')
+    missing_datetime = missing_price = 0
+    first_malformed: tuple[int, Any] | None = None
+    for idx, item in enumerate(forecast_data):
+        # Backwards-compatible format extraction (supporting both old and new schema)
+        raw_dt = item.get('start_date')
+        if raw_dt is None:
+            raw_dt = item.get('datetime')
+
+        raw_price = None
+        price_tax_included = item.get('price_tax_included')
+        if isinstance(price_tax_included, dict):
+            raw_price = price_tax_included.get('amount')
+        if raw_price is None:
+            raw_price = item.get('electricity_price')
+
+        if raw_dt is None:
+            missing_datetime += 1
+        elif 'price_eur_kwh' in item:
+            datetimes.append(raw_dt)
+            prices.append(item['price_eur_kwh'])
+            continue
+        elif raw_price is not None:
+            datetimes.append(raw_dt)
+            prices.append(convert_price(raw_price))
+            continue
+        else:
+            missing_price += 1
+        if first_malformed is None:
+            first_malformed = (idx, item)
+
+    if first_malformed is not None:
+        _report_malformed(missing_datetime, missing_price, len(forecast_data), first_malformed)
+    return datetimes, prices
+
+
+def _report_malformed(missing_datetime: int, missing_price: int, total: int, first: tuple[int, Any]) -> None:
+    """Logs one summary of the skipped items; repeats within the warning interval go to debug."""
+    global _malformed_warned_at
+    now = time.monotonic()
+    if _malformed_warned_at is None or now - _malformed_warned_at >= MALFORMED_FORECAST_WARNING_SECONDS:
+        _malformed_warned_at = now
+        log = LOGGER.warning
+    else:
+        log = LOGGER.debug
+    log(
+        "Skipped %d of %d forecast items (%d missing datetime, %d missing price), first at index %d: %s",
+        missing_datetime + missing_price, total, missing_datetime, missing_price, first[0], first[1],
+    )
+
+
+def _parse_datetimes(datetimes: list[Any], fallback: DatetimeParser | None = None) -> list[datetime | None]:
+    """Parses the slot start times, in bulk when they are all ISO 8601 strings."""
+    if datetimes and isinstance(datetimes[0], str):
+        try:
+            return list(map(datetime.fromisoformat, datetimes))
+        except (TypeError, ValueError):
+            pass
+    return [parse_datetime(val, fallback) for val in datetimes]
+
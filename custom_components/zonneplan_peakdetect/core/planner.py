@@ -0,0 +1,93 @@
+"""Runs a configured strategy over a forecast: the complete planning path of the sensor."""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any
+
+from ..const import BACKEND_AUTO
+from .forecast import prepare_timeline
+from .stats import PHASE_INGEST, PHASE_STRATEGY, PlanningStats
+from .strategies import get_arbitrage_strategy, plan_incrementally
+from .timeline import SlotTimeline, quarters_to_slots
+
+
+def plan_forecast(
+    forecast_data: list[dict[str, Any]],
+    algorithm_type: str,
+    charge_quarters: float,
+    discharge_quarters: float,
+    price_delta_percent: float,
+    min_profit_eur_kwh: float,
+    backend: str = BACKEND_AUTO,
+    previous: SlotTimeline | None = None,
+    now: datetime | None = None,
+    stats: PlanningStats | None = None,
+) -> SlotTimeline:
+    """
+    Main logic to segment and determine the optimal action schedule.
+
+    When the previous plan is given, its waves are reused for the parts of the
+    forecast that did not change and only the remainder is re-planned. With stats,
+    the forecast ingest and the strategy run are timed.
+    """
+    if not forecast_data:
+        return SlotTimeline.empty()
+
+    with stats.measure(PHASE_INGEST) if stats is not None else nullcontext():
+        timeline = prepare_timeline(forecast_data)
+    return plan_timeline(
+        timeline,
+        algorithm_type,
+        charge_quarters,
+        discharge_quarters,
+        price_delta_percent,
+        min_profit_eur_kwh,
+        backend,
+        previous,
+        now,
+        stats,
+    )
+
+
+def plan_timeline(
+    timeline: SlotTimeline,
+    algorithm_type: str,
+    charge_quarters: float,
+    discharge_quarters: float,
+    price_delta_percent: float,
+    min_profit_eur_kwh: float,
+    backend: str = BACKEND_AUTO,
+    previous: SlotTimeline | None = None,
+    now: datetime | None = None,
+    stats: PlanningStats | None = None,
+) -> SlotTimeline:
+    """
+    Plans an already prepared, unplanned timeline; the strategy half of plan_forecast.
+
+    The timeline is planned in place, so pass `unplanned()` of a prepared timeline that
+    is shared with other planners.
+    """
+    if not len(timeline):
+        return timeline
+
+    rte_factor = 1.0 - (price_delta_percent / 100.0)
+    if stats is not None:
+        stats.forecast_slots = len(timeline)
+    charge_slots_count = quarters_to_slots(charge_quarters, timeline.interval_minutes)
+    discharge_slots_count = quarters_to_slots(discharge_quarters, timeline.interval_minutes)
+
+    # Execute the chosen algorithm strategy polymorphically
+    strategy = get_arbitrage_strategy(algorithm_type, backend)
+    with stats.measure(PHASE_STRATEGY) if stats is not None else nullcontext():
+        return plan_incrementally(
+            strategy,
+            timeline,
+            previous,
+            charge_slots_count,
+            discharge_slots_count,
+            rte_factor,
+            min_profit_eur_kwh,
+            now if now is not None else datetime.now(timezone.utc),
+        )
@@ -0,0 +1,69 @@
+"""Low-overhead timing and work counters of the planning pipeline."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Planning phases that are timed
+PHASE_INGEST = "ingest"
+PHASE_STRATEGY = "strategy"
+PHASE_ATTRIBUTES = "attributes"
+PHASES = (PHASE_INGEST, PHASE_STRATEGY, PHASE_ATTRIBUTES)
+
+# Number of recent durations per phase the rolling percentile is taken over
+STATS_WINDOW = 100
+
+
+class PlanningStats:
+    """
+    Durations of the recent runs of every planning phase plus work counters.
+
+    Recording is a perf_counter call and a deque append, cheap enough to stay enabled
+    in production. Phases are recorded from the executor thread and read from the event
+    loop; appends to a bounded deque are atomic, so no locking is needed.
+    """
+
+    __slots__ = ("_durations", "_recomputes", "cache_hits", "forecast_slots")
+
+    def __init__(self, window: int = STATS_WINDOW) -> None:
+        self._durations: dict[str, deque[float]] = {phase: deque(maxlen=window) for phase in PHASES}
+        # Monotonic times of the recent strategy runs, for the hourly rate
+        self._recomputes: deque[float] = deque(maxlen=10_000)
+        self.cache_hits = 0
+        self.forecast_slots = 0
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Adds one measured duration of a phase."""
+        self._durations[phase].append(seconds)
+        if phase == PHASE_STRATEGY:
+            self._recomputes.append(time.monotonic())
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Times the enclosed block as one run of phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def last_ms(self, phase: str) -> float | None:
+        """Duration of the latest run of phase in milliseconds."""
+        durations = self._durations[phase]
+        return round(durations[-1] * 1000.0, 3) if durations else None
+
+    def p95_ms(self, phase: str) -> float | None:
+        """95th percentile (nearest rank) of the recent durations of phase in milliseconds."""
+        durations = sorted(self._durations[phase])
+        if not durations:
+            return None
+        rank = max(0, -(-95 * len(durations) // 100) - 1)
+        return round(durations[rank] * 1000.0, 3)
+
+    def recomputes_per_hour(self) -> int:
+        """Number of strategy runs during the last hour."""
+        horizon = time.monotonic() - 3600.0
+        return sum(1 for moment in self._recomputes if moment >= horizon)
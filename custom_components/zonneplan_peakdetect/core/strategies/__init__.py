@@ -1,18 +1,26 @@
 from .base import ArbitrageStrategy
 from .wave_heuristic import WhssStrategy
 from .sliding_window import HswasStrategy
-from ..const import (
+from .dynamic_programming import SocDpStrategy
+from .pairing import PairingStrategy
+from .incremental import plan_incrementally
+from ...const import (
     ALGORITHM_WHSS,
     ALGORITHM_HSWAS,
+    ALGORITHM_SOC_DP,
+    ALGORITHM_PAIRING,
+    BACKEND_AUTO,
 )
 
 # Registry mapping configuration keys to strategy classes
 STRATEGIES: dict[str, type[ArbitrageStrategy]] = {
     ALGORITHM_WHSS: WhssStrategy,
     ALGORITHM_HSWAS: HswasStrategy,
+    ALGORITHM_SOC_DP: SocDpStrategy,
+    ALGORITHM_PAIRING: PairingStrategy,
 }
 
-def get_arbitrage_strategy(algorithm_type: str) -> ArbitrageStrategy:
+def get_arbitrage_strategy(algorithm_type: str, backend: str = BACKEND_AUTO) -> ArbitrageStrategy:
     """Polymorphically retrieves and instantiates the chosen BESS arbitrage strategy."""
     strategy_class = STRATEGIES.get(algorithm_type, WhssStrategy)
-    return strategy_class()
+    return strategy_class(backend)
@@ -0,0 +1,303 @@
+from operator import ne
+
+from ...const import (
+    BACKEND_AUTO,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
+    LOGGER,
+)
+from .selection import select_slots, select_slots_array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ships with Home Assistant, but keep the pure-Python path usable without it
+    np = None
+
+class PythonKernels:
+    """
+    Pure-Python numeric kernels used by the arbitrage strategies.
+
+    Strategies only call these for their array-shaped work (window averages,
+    range tables, window pair sweeps and slot picking); the sequential wave
+    logic itself stays in the strategy.
+    """
+
+    name = BACKEND_PYTHON
+
+    def window_averages(self, prices: list[float], width: int) -> list[float]:
+        """
+        Returns the average of every window of `width` consecutive prices, indexed by window start.
+
+        Each window is summed on its own rather than as a difference of prefix sums: window
+        pairs are compared on exact equality, and prefix differences round differently per
+        window, which breaks ties between equal-priced windows.
+        """
+        return [sum(prices[i : i + width]) / width for i in range(len(prices) - width + 1)]
+
+    def extrema_levels(self, values: list[float]) -> tuple[list[list[float]], list[list[float]]]:
+        """Builds sparse-table levels of range minima and maxima over windows of 1, 2, 4, ... values."""
+        min_levels = [values]
+        max_levels = [values]
+        width = 1
+        while width * 2 <= len(values):
+            prev_min = min_levels[-1]
+            prev_max = max_levels[-1]
+            min_levels.append(list(map(min, prev_min[:-width], prev_min[width:])))
+            max_levels.append(list(map(max, prev_max[:-width], prev_max[width:])))
+            width *= 2
+        return min_levels, max_levels
+
+    def best_pair_profit(
+        self,
+        avg_charge: list[float],
+        avg_discharge: list[float],
+        first_j: int,
+        last_j: int,
+        charge_slots_count: int,
+        rte_factor: float,
+    ) -> float:
+        """
+        Best profit over all (charge window, discharge window) pairs whose discharge window
+        starts in [first_j, last_j] and whose charge window starts at or after
+        first_j - charge_slots_count and ends before the discharge window.
+        """
+        best_profit = -float('inf')
+        running_min = float('inf')
+        for j in range(first_j, last_j + 1):
+            if avg_charge[j - charge_slots_count] < running_min:
+                running_min = avg_charge[j - charge_slots_count]
+
+            profit = avg_discharge[j] * rte_factor - running_min
+            if profit > best_profit:
+                best_profit = profit
+        return best_profit
+
+    def earliest_pair(
+        self,
+        avg_charge: list[float],
+        avg_discharge: list[float],
+        first_j: int,
+        last_j: int,
+        charge_slots_count: int,
+        rte_factor: float,
+        profit: float,
+    ) -> tuple[int, int]:
+        """
+        Returns the first (charge, discharge) window pair in (i, j) order that yields
+        exactly `profit`. Different charge averages can round to the same profit, in which
+        case the earliest charge window wins, just like a full pairwise scan would pick.
+        """
+        # Best discharge value reachable from each discharge start onwards
+        best_after = [0.0] * (last_j - first_j + 2)
+        best_after[-1] = -float('inf')
+        for j in range(last_j, first_j - 1, -1):
+            best_after[j - first_j] = max(avg_discharge[j] * rte_factor, best_after[j - first_j + 1])
+
+        for i in range(first_j - charge_slots_count, last_j - charge_slots_count + 1):
+            if best_after[i + charge_slots_count - first_j] - avg_charge[i] == profit:
+                for j in range(i + charge_slots_count, last_j + 1):
+                    if avg_discharge[j] * rte_factor - avg_charge[i] == profit:
+                        return i, j
+        raise AssertionError("profit must be reachable inside the search window")
+
+    def cheapest_slots(
+        self,
+        prices: list[float],
+        start: int,
+        stop: int,
+        limit: int,
+        peak_value: float,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> list[int]:
+        """
+        Indices in [start, stop) cheap enough to charge against peak_value,
+        cheapest first (earliest first on equal prices), at most `limit` of them.
+        """
+        peak = peak_value * rte_factor
+        return select_slots(prices, [k for k in range(start, stop) if peak - prices[k] >= min_profit_eur_kwh], limit)
+
+    def priciest_slots(
+        self,
+        prices: list[float],
+        start: int,
+        stop: int,
+        limit: int,
+        valley_value: float,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> list[int]:
+        """
+        Indices in [start, stop) expensive enough to discharge against valley_value,
+        most expensive first (earliest first on equal prices), at most `limit` of them.
+        """
+        return select_slots(
+            prices,
+            [k for k in range(start, stop) if prices[k] * rte_factor - valley_value >= min_profit_eur_kwh],
+            limit,
+            highest=True,
+        )
+
+    def soc_decisions(
+        self,
+        prices: list[float],
+        charge_step: int,
+        discharge_step: int,
+        levels: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> tuple[list[float], bytearray]:
+        """
+        Forward pass of the state-of-charge dynamic program.
+
+        Charging a slot adds charge_step levels at the slot price, discharging removes
+        discharge_step levels at the RTE-adjusted price minus the minimum profit. Only the
+        current value row is kept. Returns the best profit at every level 0..levels after
+        the last slot (-inf if unreachable) and, per slot, two rows of levels + 1 flags:
+        whether charging into a level beats standing by, and whether discharging into it
+        beats both. Ties therefore go to standing by, then to charging.
+        """
+        neg = -float('inf')
+        value = [0.0] + [neg] * levels
+        decisions = bytearray()
+        kept = levels + 1 - discharge_step
+        for price in prices:
+            cost = price * charge_step
+            gain = (price * rte_factor - min_profit_eur_kwh) * discharge_step
+            # Best of standing by and charging into each level, then of that and discharging into it
+            held = value[:charge_step] + [
+                c if (c := v - cost) > w else w for w, v in zip(value[charge_step:], value)
+            ]
+            best = [d if (d := v + gain) > h else h for h, v in zip(held, value[discharge_step:])] + held[kept:]
+            decisions.extend(map(ne, value, held))
+            decisions.extend(map(ne, held, best))
+            value = best
+        return value, decisions
+
+class NumpyKernels(PythonKernels):
+    """
+    NumPy implementation of the strategy kernels.
+
+    Every kernel performs the same IEEE-754 operations in the same order as the
+    pure-Python version (elementwise min/max, identical profit expressions), so both
+    backends produce identical schedules. Window averages are inherited, since NumPy
+    cannot reproduce the rounding of the builtin sum().
+    """
+
+    name = BACKEND_NUMPY
+
+    def extrema_levels(self, values: list[float]) -> tuple[list[list[float]], list[list[float]]]:
+        min_levels = [values]
+        max_levels = [values]
+        prev_min = prev_max = np.asarray(values, dtype=np.float64)
+        width = 1
+        while width * 2 <= len(values):
+            prev_min = np.minimum(prev_min[:-width], prev_min[width:])
+            prev_max = np.maximum(prev_max[:-width], prev_max[width:])
+            min_levels.append(prev_min.tolist())
+            max_levels.append(prev_max.tolist())
+            width *= 2
+        return min_levels, max_levels
+
+    def best_pair_profit(
+        self,
+        avg_charge: list[float],
+        avg_discharge: list[float],
+        first_j: int,
+        last_j: int,
+        charge_slots_count: int,
+        rte_factor: float,
+    ) -> float:
+        if last_j < first_j:
+            return -float('inf')
+        charge = np.asarray(avg_charge[first_j - charge_slots_count : last_j - charge_slots_count + 1])
+        discharge = np.asarray(avg_discharge[first_j : last_j + 1])
+        return float((discharge * rte_factor - np.minimum.accumulate(charge)).max())
+
+    def earliest_pair(
+        self,
+        avg_charge: list[float],
+        avg_discharge: list[float],
+        first_j: int,
+        last_j: int,
+        charge_slots_count: int,
+        rte_factor: float,
+        profit: float,
+    ) -> tuple[int, int]:
+        first_i = first_j - charge_slots_count
+        discharge_value = np.asarray(avg_discharge[first_j : last_j + 1]) * rte_factor
+        best_after = np.maximum.accumulate(discharge_value[::-1])[::-1]
+        charge = np.asarray(avg_charge[first_i : last_j - charge_slots_count + 1])
+        hits = np.flatnonzero(best_after[: len(charge)] - charge == profit)
+        if not len(hits):
+            raise AssertionError("profit must be reachable inside the search window")
+        i = first_i + int(hits[0])
+        j_offset = i + charge_slots_count - first_j
+        j = first_j + j_offset + int(np.argmax(discharge_value[j_offset:] - avg_charge[i] == profit))
+        return i, j
+
+    def cheapest_slots(
+        self,
+        prices: list[float],
+        start: int,
+        stop: int,
+        limit: int,
+        peak_value: float,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> list[int]:
+        values = np.asarray(prices[start:stop], dtype=np.float64)
+        candidates = np.flatnonzero(peak_value * rte_factor - values >= min_profit_eur_kwh)
+        return (select_slots_array(values, candidates, limit) + start).tolist()
+
+    def priciest_slots(
+        self,
+        prices: list[float],
+        start: int,
+        stop: int,
+        limit: int,
+        valley_value: float,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> list[int]:
+        values = np.asarray(prices[start:stop], dtype=np.float64)
+        candidates = np.flatnonzero(values * rte_factor - valley_value >= min_profit_eur_kwh)
+        return (select_slots_array(values, candidates, limit, highest=True) + start).tolist()
+
+    def soc_decisions(
+        self,
+        prices: list[float],
+        charge_step: int,
+        discharge_step: int,
+        levels: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> tuple[list[float], bytearray]:
+        decisions = bytearray(len(prices) * 2 * (levels + 1))
+        flags = np.frombuffer(decisions, dtype=np.bool_).reshape(len(prices), 2, levels + 1)
+        value = np.full(levels + 1, -np.inf)
+        value[0] = 0.0
+        charged = np.full(levels + 1, -np.inf)
+        discharged = np.full(levels + 1, -np.inf)
+        for t, price in enumerate(prices):
+            cost = price * charge_step
+            gain = (price * rte_factor - min_profit_eur_kwh) * discharge_step
+            np.subtract(value[:-charge_step], cost, out=charged[charge_step:])
+            np.add(value[discharge_step:], gain, out=discharged[:-discharge_step])
+            held = np.maximum(value, charged)
+            best = np.maximum(held, discharged)
+            np.not_equal(value, held, out=flags[t, 0])
+            np.not_equal(held, best, out=flags[t, 1])
+            value = best
+        return value.tolist(), decisions
+
+
+def get_kernels(backend: str = BACKEND_AUTO) -> PythonKernels:
+    """Resolves the configured backend to a kernel implementation, falling back to pure Python."""
+    if backend == BACKEND_PYTHON:
+        return PythonKernels()
+    if np is None:
+        if backend == BACKEND_NUMPY:
+            LOGGER.warning("NumPy backend requested but NumPy is not available, using pure Python")
+        return PythonKernels()
+    return NumpyKernels()
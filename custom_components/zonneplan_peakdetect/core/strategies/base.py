@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from collections.abc import Container
+from datetime import datetime
+
+from ...const import BACKEND_AUTO
+from ..timeline import SlotTimeline
+from .backends import get_kernels
+
+class ArbitrageStrategy(ABC):
+    """Abstract base class for all BESS arbitrage scheduling strategies."""
+
+    # Strategies that scan chronologically can resume from a recorded wave boundary
+    supports_resume: bool = False
+
+    def __init__(self, backend: str = BACKEND_AUTO) -> None:
+        """Selects the numeric kernels (NumPy when available, pure Python otherwise)."""
+        self.kernels = get_kernels(backend)
+
+    @abstractmethod
+    def calculate_schedule(
+        self,
+        timeline: SlotTimeline,
+        charge_slots_count: int,
+        discharge_slots_count: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+        now: datetime,
+        start_idx: int = 0,
+        first_interval_id: int = 0,
+        stop_at: Container[int] = (),
+    ) -> SlotTimeline:
+        """
+        Calculates the action schedule and returns the timeline with its
+        'actions' and 'interval_ids' columns assigned.
+
+        Strategies with supports_resume start scanning at start_idx (a recorded
+        wave boundary), number new intervals from first_interval_id and stop early
+        once a wave ends on a scan position in stop_at.
+        """
+        pass
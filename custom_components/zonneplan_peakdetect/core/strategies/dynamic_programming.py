@@ -0,0 +1,97 @@
+from collections.abc import Container
+from datetime import datetime
+from math import lcm
+
+from ...const import (
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+    ACTION_CODE_STOP,
+    LOGGER,
+    SOC_DP_MAX_LEVELS,
+)
+from ..timeline import SlotTimeline
+from .base import ArbitrageStrategy
+
+class SocDpStrategy(ArbitrageStrategy):
+    """
+    Exact (SOC-DP) - Dynamic programming over the battery state of charge.
+
+    Discretizes the battery into lcm(charge, discharge) levels, so that a full charge
+    takes exactly charge_slots_count slots and a full discharge discharge_slots_count
+    slots, and finds the charge/stop/discharge sequence with the maximum RTE-adjusted
+    profit. Every discharged unit of energy must earn min_profit_eur_kwh on top.
+    At most SOC_DP_MAX_LEVELS levels are used; beyond that, full charges stay exact and
+    the discharge step is rounded.
+    """
+
+    def calculate_schedule(
+        self,
+        timeline: SlotTimeline,
+        charge_slots_count: int,
+        discharge_slots_count: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+        now: datetime,
+        start_idx: int = 0,
+        first_interval_id: int = 0,
+        stop_at: Container[int] = (),
+    ) -> SlotTimeline:
+        """Calculates the BESS schedule using the Exact (SOC-DP) dynamic program."""
+        prices = timeline.prices
+        n = len(timeline)
+        if n == 0 or charge_slots_count <= 0 or discharge_slots_count <= 0:
+            return timeline
+
+        levels = lcm(charge_slots_count, discharge_slots_count)
+        charge_step = levels // charge_slots_count
+        discharge_step = levels // discharge_slots_count
+        if levels > SOC_DP_MAX_LEVELS:
+            # Nearly coprime slot counts need very many levels; keep full charges exact and round discharges
+            charge_step = max(1, SOC_DP_MAX_LEVELS // charge_slots_count)
+            levels = charge_step * charge_slots_count
+            discharge_step = max(1, round(levels / discharge_slots_count))
+            LOGGER.debug(
+                "SOC-DP needs %d levels for %d charge and %d discharge slots, using %d levels "
+                "(a full discharge takes %d slots)",
+                lcm(charge_slots_count, discharge_slots_count), charge_slots_count, discharge_slots_count,
+                levels, -(-levels // discharge_step),
+            )
+        final, decisions = self.kernels.soc_decisions(
+            prices, charge_step, discharge_step, levels, rte_factor, min_profit_eur_kwh
+        )
+
+        # End in the most profitable level, preferring the emptiest battery on ties
+        level = max(range(levels + 1), key=lambda s: (final[s], -s))
+
+        # Walk back through the recorded moves; standing by wins whenever it is just as profitable
+        actions = timeline.actions
+        width = levels + 1
+        for t in range(n - 1, -1, -1):
+            row = 2 * t * width
+            if decisions[row + width + level]:
+                actions[t] = ACTION_CODE_DISCHARGE
+                level += discharge_step
+            elif decisions[row + level]:
+                actions[t] = ACTION_CODE_CHARGE
+                level -= charge_step
+
+        # A cycle runs from its first charge slot to the last slot before charging resumes after a discharge
+        interval_count = first_interval_id
+        cycle_start = cycle_end = -1
+        discharged = False
+        for t in range(n):
+            code = actions[t]
+            if code == ACTION_CODE_STOP:
+                continue
+            if code == ACTION_CODE_CHARGE and (cycle_start < 0 or discharged):
+                if cycle_start >= 0:
+                    timeline.fill_interval(cycle_start, cycle_end + 1, interval_count)
+                    interval_count += 1
+                cycle_start = t
+                discharged = False
+            discharged = discharged or code == ACTION_CODE_DISCHARGE
+            cycle_end = t
+        if cycle_start >= 0:
+            timeline.fill_interval(cycle_start, cycle_end + 1, interval_count)
+
+        return timeline
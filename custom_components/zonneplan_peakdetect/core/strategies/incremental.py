@@ -0,0 +1,119 @@
+"""Incremental re-planning that reuses the waves of the previous plan."""
+
+from dataclasses import replace
+from datetime import datetime
+
+from ...const import LOGGER
+from ..timeline import SlotTimeline, WaveRecord
+from .base import ArbitrageStrategy
+
+
+def _unchanged_prefix(previous: SlotTimeline, timeline: SlotTimeline, offset: int) -> int:
+    """Number of leading slots of timeline that match previous[offset:] in start time and price."""
+    limit = min(len(timeline), len(previous) - offset)
+    same = 0
+    while (
+        same < limit
+        and timeline.starts[same] == previous.starts[offset + same]
+        and timeline.prices[same] == previous.prices[offset + same]
+    ):
+        same += 1
+    return same
+
+
+def plan_incrementally(
+    strategy: ArbitrageStrategy,
+    timeline: SlotTimeline,
+    previous: SlotTimeline | None,
+    charge_slots_count: int,
+    discharge_slots_count: int,
+    rte_factor: float,
+    min_profit_eur_kwh: float,
+    now: datetime,
+) -> SlotTimeline:
+    """
+    Plans a timeline, reusing the waves of the previous plan whose inputs did not change.
+
+    The new forecast is aligned with the previous timeline by slot start time. A previous
+    wave is reusable when every price it read is unchanged (and, if it read up to the end
+    of the forecast, the forecast still ends at the same slot). The strategy runs from the
+    head of the new forecast until it lands on a scan position of a reusable wave, the run
+    of consecutive reusable waves is copied over, and only the remaining suffix is planned
+    again. The result equals a full re-plan (HSWAS window averages may differ in the last
+    bit, which can only flip exact ties); whenever the waves cannot be aligned the
+    strategy simply plans the whole timeline.
+    """
+    params = (charge_slots_count, discharge_slots_count, rte_factor, min_profit_eur_kwh, now)
+
+    if (
+        not strategy.supports_resume
+        or previous is None
+        or not previous.waves
+        or not len(timeline)
+        or previous.interval_minutes != timeline.interval_minutes
+        or timeline.starts[0] is None
+    ):
+        return strategy.calculate_schedule(timeline, *params)
+
+    try:
+        offset = previous.starts.index(timeline.starts[0])
+    except ValueError:
+        return strategy.calculate_schedule(timeline, *params)
+
+    same = _unchanged_prefix(previous, timeline, offset)
+    same_end = same == len(timeline) == len(previous) - offset
+
+    def reusable(wave: WaveRecord) -> bool:
+        return (
+            wave.last_state >= offset
+            and wave.read_end - offset <= same
+            and (wave.read_end < len(previous) or same_end)
+        )
+
+    # Scan positions (in new indices) from which a previous wave can be taken over as is
+    entry_waves: dict[int, int] = {}
+    for wave_idx, wave in enumerate(previous.waves):
+        if reusable(wave):
+            for state in range(max(wave.first_state, offset), wave.last_state + 1):
+                entry_waves[state - offset] = wave_idx
+
+    if not entry_waves:
+        return strategy.calculate_schedule(timeline, *params)
+
+    resume_state = 0
+    if 0 not in entry_waves:
+        timeline = strategy.calculate_schedule(timeline, *params, stop_at=entry_waves)
+        if not timeline.waves or timeline.waves[-1].end not in entry_waves:
+            # The strategy never met a reusable wave and planned the whole timeline
+            return timeline
+        resume_state = timeline.waves[-1].end
+
+    next_interval_id = timeline.interval_count()
+    first_state = resume_state
+    reused = 0
+    for wave in previous.waves[entry_waves[resume_state]:]:
+        if not reusable(wave) or (reused and wave.first_state - offset != first_state):
+            break
+        # Slots before the wave's scan position belong to the head run (or have elapsed)
+        timeline.actions[first_state : wave.end - offset] = previous.actions[first_state + offset : wave.end]
+        interval_id = -1
+        if wave.interval_id >= 0:
+            interval_id = next_interval_id
+            next_interval_id += 1
+            timeline.fill_interval(wave.start - offset, wave.end - offset, interval_id)
+        timeline.waves.append(replace(
+            wave,
+            first_state=first_state,
+            last_state=wave.last_state - offset,
+            read_end=wave.read_end - offset,
+            start=wave.start - offset,
+            end=wave.end - offset,
+            interval_id=interval_id,
+        ))
+        first_state = wave.end - offset
+        reused += 1
+
+    LOGGER.debug("Reused %d planned waves, re-planning from slot %d of %d", reused, first_state, len(timeline))
+    return strategy.calculate_schedule(
+        timeline, *params, start_idx=first_state, first_interval_id=next_interval_id
+    )
@@ -0,0 +1,129 @@
+from collections.abc import Container
+from datetime import datetime
+from heapq import heappop, heappush
+
+from ...const import (
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+)
+from ..timeline import SlotTimeline
+from .base import ArbitrageStrategy
+
+# Kinds of heap entries; on equal cost, moving an earlier sale is preferred over a new buy
+_REGRET = 0
+_SWAP = 1
+_BUY = 2
+
+class PairingStrategy(ArbitrageStrategy):
+    """
+    Pairing (BLSH) - Buy Low, Sell High pairing with regret.
+
+    Walks the forecast once, matching every slot that is expensive enough to the cheapest
+    earlier slot on a min-heap. A sale also leaves a "regret" entry priced at its own
+    value, so a later, more expensive slot can still take the sale over. This handles
+    any number of price cycles per day in O(n log n).
+
+    Negative prices with RTE losses make a slot worth more sold than bought. Such a sale
+    also leaves a "swap" entry, so a later sale can turn it into a buy (releasing the
+    slot it was paired with), and a slot whose sale is taken over can be bought again.
+    """
+
+    def _match_pairs(self, prices: list[float], rte_factor: float, min_profit_eur_kwh: float) -> dict[int, int]:
+        """Greedy heap pairing; returns the buy slot of every sell slot."""
+        heap: list[tuple[float, int, int]] = []
+        bought_for: dict[int, int] = {}
+        # Flags of the slots currently bought for a sale
+        bought = bytearray(len(prices))
+        for j, price in enumerate(prices):
+            value = price * rte_factor - min_profit_eur_kwh
+            while heap and heap[0][0] < value:
+                _, slot, kind = heappop(heap)
+                if slot in bought_for:
+                    if kind == _BUY:
+                        # A sold slot gives up its sale through its regret or swap entry only;
+                        # its buy entry is pushed again once the sale is taken over
+                        continue
+                    buy_idx = bought_for.pop(slot)
+                    if kind == _REGRET:
+                        # Take over the sale of an earlier slot, which is then simply held through
+                        heappush(heap, (prices[slot], slot, _BUY))
+                    else:
+                        # Buy at the earlier sale slot instead, releasing the slot it was paired with
+                        bought[buy_idx] = 0
+                        heappush(heap, (prices[buy_idx], buy_idx, _BUY))
+                        buy_idx = slot
+                elif kind == _BUY and not bought[slot]:
+                    buy_idx = slot
+                else:
+                    # Entry of a sale that has already been taken over, or of a slot already bought
+                    continue
+                bought[buy_idx] = 1
+                bought_for[j] = buy_idx
+                heappush(heap, (value, j, _REGRET))
+                if value > price:
+                    heappush(heap, (price + value - prices[buy_idx], j, _SWAP))
+                break
+            heappush(heap, (price, j, _BUY))
+        return bought_for
+
+    def calculate_schedule(
+        self,
+        timeline: SlotTimeline,
+        charge_slots_count: int,
+        discharge_slots_count: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+        now: datetime,
+        start_idx: int = 0,
+        first_interval_id: int = 0,
+        stop_at: Container[int] = (),
+    ) -> SlotTimeline:
+        """Calculates the BESS schedule using the Pairing (BLSH) heap strategy."""
+        prices = timeline.prices
+        n = len(timeline)
+        # Every pair moves one slot's worth of energy, so the battery holds at most this many pairs
+        capacity = min(charge_slots_count, discharge_slots_count)
+        if n == 0 or capacity <= 0:
+            return timeline
+
+        bought_for = self._match_pairs(prices, rte_factor, min_profit_eur_kwh)
+        sold_at = {buy_idx: sell_idx for sell_idx, buy_idx in bought_for.items()}
+
+        # Enforce the capacity chronologically: when more pairs hold energy than fits in the
+        # battery, drop the least profitable of them (lazily removed from the heap once sold).
+        by_profit: list[tuple[float, int]] = []
+        holding: set[int] = set()
+        kept: set[int] = set()
+        for t in range(n):
+            if t in sold_at:
+                heappush(by_profit, (prices[sold_at[t]] * rte_factor - prices[t], t))
+                holding.add(t)
+                kept.add(t)
+                if len(holding) > capacity:
+                    while True:
+                        _, dropped = heappop(by_profit)
+                        if dropped in holding:
+                            break
+                    holding.discard(dropped)
+                    kept.discard(dropped)
+            elif bought_for.get(t) in holding:
+                holding.discard(bought_for[t])
+
+        # A cycle runs from a charge into an empty battery until the battery is empty again
+        interval_count = first_interval_id
+        stored = 0
+        cycle_start = -1
+        for t in range(n):
+            if t in kept:
+                timeline.actions[t] = ACTION_CODE_CHARGE
+                if stored == 0:
+                    cycle_start = t
+                stored += 1
+            elif bought_for.get(t) in kept:
+                timeline.actions[t] = ACTION_CODE_DISCHARGE
+                stored -= 1
+                if stored == 0:
+                    timeline.fill_interval(cycle_start, t + 1, interval_count)
+                    interval_count += 1
+
+        return timeline
@@ -0,0 +1,56 @@
+"""Top-k slot selection shared by the charge/discharge slot picking of every kernel backend."""
+
+from heapq import nlargest, nsmallest
+
+try:
+    import numpy as np
+except ImportError:  # Only the NumPy kernels call select_slots_array
+    np = None
+
+# Candidate pools above max(PARTIAL_SELECT_MIN_CANDIDATES, PARTIAL_SELECT_RATIO * limit) use
+# heap selection; below that a full C sort beats the Python-level heap of heapq
+PARTIAL_SELECT_MIN_CANDIDATES = 768
+PARTIAL_SELECT_RATIO = 36
+
+
+def uses_partial_selection(candidate_count: int, limit: int) -> bool:
+    """Whether select_slots picks `limit` of `candidate_count` candidates by partial selection."""
+    return candidate_count > max(PARTIAL_SELECT_MIN_CANDIDATES, PARTIAL_SELECT_RATIO * limit)
+
+
+def select_slots(prices: list[float], candidates: list[int], limit: int, highest: bool = False) -> list[int]:
+    """
+    Up to `limit` candidate indices with the lowest (or highest) prices, in that order.
+
+    Ties are broken by time: the earliest slot wins, exactly like a stable full sort.
+    Large candidate pools use heap selection, O(m log k) instead of O(m log m); both
+    paths return identical results.
+    """
+    if limit <= 0:
+        return []
+    if uses_partial_selection(len(candidates), limit):
+        return (nlargest if highest else nsmallest)(limit, candidates, key=prices.__getitem__)
+    return sorted(candidates, key=prices.__getitem__, reverse=highest)[:limit]
+
+
+def select_slots_array(
+    prices: "np.ndarray", candidates: "np.ndarray", limit: int, highest: bool = False
+) -> "np.ndarray":
+    """
+    NumPy form of select_slots with the same contract: up to `limit` of the candidate
+    positions in prices, lowest (or highest) price first and earliest first on ties.
+
+    Selects with argpartition in O(m), then sorts only the selected slots.
+    """
+    if limit <= 0 or not len(candidates):
+        return candidates[:0]
+    keys = -prices[candidates] if highest else prices[candidates]
+    if len(candidates) > limit:
+        # Partial selection, then resolve ties on the cut-off value by earliest index
+        cutoff = keys[np.argpartition(keys, limit - 1)[limit - 1]]
+        below = np.flatnonzero(keys < cutoff)
+        at_cutoff = np.flatnonzero(keys == cutoff)[: limit - len(below)]
+        keep = np.concatenate((below, at_cutoff))
+        candidates = candidates[keep]
+        keys = keys[keep]
+    return candidates[np.lexsort((candidates, keys))]
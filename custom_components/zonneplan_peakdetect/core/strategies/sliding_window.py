@@ -0,0 +1,343 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Container
+from datetime import datetime
+from itertools import accumulate
+
+from ...const import (
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+    COARSE_SLOT_MINUTES,
+    FINE_RESOLUTION_MINUTES,
+    HSWAS_HORIZON_HOURS,
+)
+from ..timeline import SlotTimeline, WaveRecord
+from .base import ArbitrageStrategy
+
+class HswasStrategy(ArbitrageStrategy):
+    """
+    Advanced (HSWAS) [β] - Hybrid SWA-Wave-Slot strategy.
+    
+    Uses sliding-window moving averages to robustly find wave boundaries,
+    then optimizes slot selection allowing non-contiguous slots within those waves.
+    Waves are searched within a look-ahead of HSWAS_HORIZON_HOURS; feeds finer than
+    FINE_RESOLUTION_MINUTES find their waves on hourly averages first (coarse-to-fine).
+    """
+
+    supports_resume = True
+
+    @staticmethod
+    def _horizon_limit(offsets: array | None, horizon_slots: int, idx: int, n: int) -> int:
+        """
+        Exclusive end of the slots starting within HSWAS_HORIZON_HOURS of slot idx.
+
+        Uniform feeds pass offsets=None and the number of slots in the horizon; mixed
+        feeds bisect the slot offsets.
+        """
+        if offsets is None:
+            return min(n, idx + horizon_slots)
+        return bisect_left(offsets, offsets[idx] + HSWAS_HORIZON_HOURS * 3600, idx + 1, n)
+
+    @classmethod
+    def _horizon_end(cls, offsets: array | None, horizon_slots: int, idx: int, n: int, min_slots: int) -> int:
+        """
+        Exclusive end of the look-ahead from slot idx: the slots starting within
+        HSWAS_HORIZON_HOURS, but always at least min_slots (one window pair) where available.
+        """
+        return min(n, max(cls._horizon_limit(offsets, horizon_slots, idx, n), idx + min_slots))
+
+    def _find_next_wave(
+        self,
+        avg_charge: list[float],
+        avg_discharge: list[float],
+        offsets: array | None,
+        horizon_slots: int,
+        current_idx: int,
+        n: int,
+        charge_slots_count: int,
+        discharge_slots_count: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> tuple[int, int, int, int] | None:
+        """
+        Algorithm A: finds the most profitable (charge window, discharge window) pair
+        starting at or after current_idx, or None if no profitable pair remains.
+
+        Returns (charge_idx, discharge_idx, last_state, read_end): the pair, the scan
+        position the horizon had slid to when the pair was found and the exclusive end
+        of the horizon that was read.
+
+        Equivalent to evaluating every window pair per horizon, but each pass sweeps the
+        discharge windows once while keeping the cheapest charge window seen so far.
+        When a horizon holds no profitable pair, the horizon slides forward one slot at a
+        time and only the newly reachable discharge windows are evaluated against a
+        monotonic queue of charge windows, instead of rescanning the whole horizon.
+        """
+        last_start = n - (charge_slots_count + discharge_slots_count) + 1
+        if current_idx >= last_start:
+            return None
+
+        search_limit = self._horizon_end(
+            offsets, horizon_slots, current_idx, n, charge_slots_count + discharge_slots_count
+        )
+
+        # Full pass: for every discharge window j, pair it with the cheapest charge window ending before j
+        first_j = current_idx + charge_slots_count
+        best_profit = self.kernels.best_pair_profit(
+            avg_charge, avg_discharge, first_j, search_limit - discharge_slots_count,
+            charge_slots_count, rte_factor,
+        )
+        if best_profit >= min_profit_eur_kwh:
+            return *self.kernels.earliest_pair(
+                avg_charge, avg_discharge, first_j, search_limit - discharge_slots_count,
+                charge_slots_count, rte_factor, best_profit,
+            ), current_idx, search_limit
+
+        # Skip-ahead: every pair inside the current horizon is unprofitable, so after
+        # advancing by one slot only pairs using a newly reachable discharge window can
+        # qualify. Track the charge windows of the horizon in a monotonic queue.
+        charge_queue: deque[int] = deque()
+        for i in range(current_idx, search_limit - discharge_slots_count - charge_slots_count + 1):
+            while charge_queue and avg_charge[charge_queue[-1]] > avg_charge[i]:
+                charge_queue.pop()
+            charge_queue.append(i)
+
+        while True:
+            current_idx += 1
+            if current_idx >= last_start or search_limit >= n:
+                # The horizon can no longer grow, so no unseen pair remains
+                return None
+
+            # The horizon grows by a slot per step on uniform feeds, by more or less on mixed ones
+            profit = -float('inf')
+            horizon_limit = max(
+                self._horizon_limit(offsets, horizon_slots, current_idx, n),
+                current_idx + charge_slots_count + discharge_slots_count,
+            )
+            while search_limit < min(n, horizon_limit):
+                search_limit += 1
+                j = search_limit - discharge_slots_count
+                i = j - charge_slots_count
+                while charge_queue and avg_charge[charge_queue[-1]] > avg_charge[i]:
+                    charge_queue.pop()
+                charge_queue.append(i)
+                while charge_queue[0] < current_idx:
+                    charge_queue.popleft()
+                profit = max(profit, avg_discharge[j] * rte_factor - avg_charge[charge_queue[0]])
+
+            if profit >= min_profit_eur_kwh:
+                return *self.kernels.earliest_pair(
+                    avg_charge, avg_discharge, current_idx + charge_slots_count,
+                    search_limit - discharge_slots_count, charge_slots_count, rte_factor, profit,
+                ), current_idx, search_limit
+
+    def _find_next_wave_coarse(
+        self,
+        prices: list[float],
+        prefix: array,
+        offsets: array | None,
+        horizon_slots: int,
+        current_idx: int,
+        n: int,
+        factor: int,
+        charge_slots_count: int,
+        discharge_slots_count: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+    ) -> tuple[int, int, int, int] | None:
+        """
+        Coarse-to-fine variant of _find_next_wave for fine-grained feeds.
+
+        The horizon is averaged into buckets of `factor` slots and the best window pair is
+        searched on those buckets. The exact pair is then searched at full resolution, but
+        only within the span of the coarse pair widened by one bucket on either side, so
+        full-resolution window averages are only computed for those spans.
+        When that pair is unprofitable the horizon slides forward by one bucket. Buckets
+        are aligned to current_idx, so only a scan starting there leads to the same wave;
+        the coarse search only reads buckets that end inside the horizon.
+        """
+        first_state = current_idx
+        last_start = n - (charge_slots_count + discharge_slots_count) + 1
+        coarse_charge_count = -(-charge_slots_count // factor)
+        coarse_discharge_count = -(-discharge_slots_count // factor)
+        if current_idx >= last_start:
+            return None
+
+        # Bucket averages and price ranges from first_state on, extended as the horizon slides
+        coarse: list[float] = []
+        bucket_min: list[float] = []
+        bucket_max: list[float] = []
+        coarse_avg_charge: list[float] = []
+        coarse_avg_discharge: list[float] = []
+
+        bucket = 0
+        while current_idx < last_start:
+            search_limit = self._horizon_end(
+                offsets, horizon_slots, current_idx, n, charge_slots_count + discharge_slots_count
+            )
+            # Buckets read: those ending inside the horizon (the last one of the forecast may be partial)
+            if search_limit == n:
+                bucket_end = -(-(n - first_state) // factor)
+            else:
+                bucket_end = (search_limit - first_state) // factor
+            while len(coarse) < bucket_end:
+                b = first_state + len(coarse) * factor
+                e = min(b + factor, n)
+                coarse.append((prefix[e] - prefix[b]) / (e - b))
+                bucket_min.append(min(prices[b:e]))
+                bucket_max.append(max(prices[b:e]))
+            for averages, width in (
+                (coarse_avg_charge, coarse_charge_count),
+                (coarse_avg_discharge, coarse_discharge_count),
+            ):
+                for k in range(len(averages), len(coarse) - width + 1):
+                    averages.append(sum(coarse[k : k + width]) / width)
+
+            first_j = bucket + coarse_charge_count
+            last_j = bucket_end - coarse_discharge_count
+            if first_j <= last_j and (
+                max(bucket_max[bucket:bucket_end]) * rte_factor - min(bucket_min[bucket:bucket_end])
+                >= min_profit_eur_kwh
+            ):
+                coarse_profit = self.kernels.best_pair_profit(
+                    coarse_avg_charge, coarse_avg_discharge, first_j, last_j, coarse_charge_count, rte_factor,
+                )
+                charge_bucket, discharge_bucket = self.kernels.earliest_pair(
+                    coarse_avg_charge, coarse_avg_discharge, first_j, last_j,
+                    coarse_charge_count, rte_factor, coarse_profit,
+                )
+
+                # Refine at full resolution within the candidate wave
+                span_start = max(current_idx, first_state + (charge_bucket - 1) * factor)
+                span_end = min(search_limit, first_state + (discharge_bucket + coarse_discharge_count + 1) * factor)
+                fine_first_j = span_start + charge_slots_count
+                fine_last_j = span_end - discharge_slots_count
+                if fine_first_j <= fine_last_j:
+                    # Window averages of the span, indexed from span_start
+                    span_prices = prices[span_start:span_end]
+                    avg_charge = self.kernels.window_averages(span_prices, charge_slots_count)
+                    avg_discharge = self.kernels.window_averages(span_prices, discharge_slots_count)
+                    profit = self.kernels.best_pair_profit(
+                        avg_charge, avg_discharge, fine_first_j - span_start, fine_last_j - span_start,
+                        charge_slots_count, rte_factor,
+                    )
+                    if profit >= min_profit_eur_kwh:
+                        charge_idx, discharge_idx = self.kernels.earliest_pair(
+                            avg_charge, avg_discharge, fine_first_j - span_start, fine_last_j - span_start,
+                            charge_slots_count, rte_factor, profit,
+                        )
+                        return span_start + charge_idx, span_start + discharge_idx, first_state, search_limit
+
+            if search_limit >= n:
+                return None
+            current_idx += factor
+            bucket += 1
+        return None
+
+    def calculate_schedule(
+        self,
+        timeline: SlotTimeline,
+        charge_slots_count: int,
+        discharge_slots_count: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+        now: datetime,
+        start_idx: int = 0,
+        first_interval_id: int = 0,
+        stop_at: Container[int] = (),
+    ) -> SlotTimeline:
+        """Calculates the BESS schedule using the Advanced (HSWAS) [β] Sliding Window."""
+        prices = timeline.prices
+        n = len(timeline)
+        current_idx = start_idx
+        interval_count = first_interval_id
+        
+        if charge_slots_count > 0 and discharge_slots_count > 0:
+            # Uniform feeds cover the horizon with a fixed number of slots, mixed ones bisect slot offsets
+            durations = timeline.durations
+            offsets = None
+            horizon_slots = 1
+            if n and min(durations) == max(durations):
+                horizon_slots = max(1, -(-HSWAS_HORIZON_HOURS * 3600 // durations[0]))
+            else:
+                offsets = timeline.slot_offsets()
+
+            factor = 1
+            if timeline.interval_minutes < FINE_RESOLUTION_MINUTES:
+                factor = max(1, COARSE_SLOT_MINUTES // timeline.interval_minutes)
+            if factor > 1:
+                prefix = array('d', accumulate(prices, initial=0.0))
+            else:
+                # Window averages only depend on the window start, so compute them once
+                avg_charge = self.kernels.window_averages(prices, charge_slots_count)
+                avg_discharge = self.kernels.window_averages(prices, discharge_slots_count)
+
+            while current_idx == start_idx or current_idx not in stop_at:
+                if factor > 1:
+                    wave = self._find_next_wave_coarse(
+                        prices,
+                        prefix,
+                        offsets,
+                        horizon_slots,
+                        current_idx,
+                        n,
+                        factor,
+                        charge_slots_count,
+                        discharge_slots_count,
+                        rte_factor,
+                        min_profit_eur_kwh,
+                    )
+                else:
+                    wave = self._find_next_wave(
+                        avg_charge,
+                        avg_discharge,
+                        offsets,
+                        horizon_slots,
+                        current_idx,
+                        n,
+                        charge_slots_count,
+                        discharge_slots_count,
+                        rte_factor,
+                        min_profit_eur_kwh,
+                    )
+                if wave is None:
+                    break
+
+                best_charge_idx, best_discharge_idx, last_state, read_end = wave
+                segment_start = best_charge_idx
+                segment_end = best_discharge_idx + discharge_slots_count
+                
+                segment_prices = prices[segment_start : segment_end]
+                
+                local_valley_val = min(segment_prices)
+                local_peak_val = max(segment_prices)
+                
+                charge_slots = self.kernels.cheapest_slots(
+                    prices, segment_start, best_discharge_idx, charge_slots_count,
+                    local_peak_val, rte_factor, min_profit_eur_kwh,
+                )
+                discharge_slots = self.kernels.priciest_slots(
+                    prices, best_discharge_idx, segment_end, discharge_slots_count,
+                    local_valley_val, rte_factor, min_profit_eur_kwh,
+                )
+                
+                interval_id = -1
+                if charge_slots or discharge_slots:
+                    interval_id = interval_count
+                    timeline.fill_interval(segment_start, segment_end, interval_count)
+                        
+                    for k in charge_slots:
+                        timeline.actions[k] = ACTION_CODE_CHARGE
+                        
+                    for k in discharge_slots:
+                        timeline.actions[k] = ACTION_CODE_DISCHARGE
+                        
+                    interval_count += 1
+
+                timeline.waves.append(WaveRecord(
+                    current_idx, last_state, read_end, segment_start, segment_end, interval_id
+                ))
+                current_idx = segment_end
+
+        return timeline
@@ -0,0 +1,249 @@
+from bisect import bisect_right
+from collections.abc import Container
+from datetime import datetime
+
+from ...const import (
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+)
+from .backends import PythonKernels
+from ..timeline import SlotTimeline, WaveRecord
+from .base import ArbitrageStrategy
+
+class _RangeExtrema:
+    """
+    Sparse tables over a price list answering range minimum/maximum and threshold
+    searches in O(log n). Index lookups return the earliest index on ties.
+    """
+
+    def __init__(self, values: list[float], kernels: PythonKernels) -> None:
+        self.values = values
+        self.n = len(values)
+        self._min_levels, self._max_levels = kernels.extrema_levels(values)
+
+    def argmin(self, lo: int, hi: int) -> int:
+        """Earliest index of the minimum in values[lo..hi] (inclusive)."""
+        level = (hi - lo + 1).bit_length() - 1
+        table = self._min_levels[level]
+        return self.first_at_most(lo, min(table[lo], table[hi - (1 << level) + 1]))
+
+    def argmax(self, lo: int, hi: int) -> int:
+        """Earliest index of the maximum in values[lo..hi] (inclusive)."""
+        level = (hi - lo + 1).bit_length() - 1
+        table = self._max_levels[level]
+        return self.first_at_least(lo, max(table[lo], table[hi - (1 << level) + 1]))
+
+    def first_at_most(self, start: int, threshold: float) -> int:
+        """First index >= start whose value is <= threshold, or n if there is none."""
+        pos = start
+        for level in range(len(self._min_levels) - 1, -1, -1):
+            if pos + (1 << level) <= self.n and self._min_levels[level][pos] > threshold:
+                pos += 1 << level
+        return pos
+
+    def first_at_least(self, start: int, threshold: float) -> int:
+        """First index >= start whose value is >= threshold, or n if there is none."""
+        pos = start
+        for level in range(len(self._max_levels) - 1, -1, -1):
+            if pos + (1 << level) <= self.n and self._max_levels[level][pos] < threshold:
+                pos += 1 << level
+        return pos
+
+
+def _first_reaching(values: list[float], thresholds: list[float], rising: bool) -> list[int]:
+    """
+    For every i, the first j >= i where values[j] >= thresholds[i] (rising) or
+    values[j] <= thresholds[i] (falling), or n if there is none.
+
+    Walks backwards keeping a monotonic stack of the only indices that can ever be
+    "first" (the running maxima or minima seen from i), and binary searches it.
+    """
+    n = len(values)
+    sign = -1.0 if rising else 1.0
+    result = [n] * n
+    stack_keys: list[float] = []
+    stack_idx: list[int] = []
+    for i in range(n - 1, -1, -1):
+        key = sign * values[i]
+        while stack_keys and stack_keys[-1] >= key:
+            stack_keys.pop()
+            stack_idx.pop()
+        stack_keys.append(key)
+        stack_idx.append(i)
+        pos = bisect_right(stack_keys, sign * thresholds[i]) - 1
+        if pos >= 0:
+            result[i] = stack_idx[pos]
+    return result
+
+
+def _suffix_min(values: list[int]) -> list[int]:
+    """Running minimum taken from the end of the list towards the start."""
+    result = values[:]
+    for i in range(len(result) - 2, -1, -1):
+        if result[i + 1] < result[i]:
+            result[i] = result[i + 1]
+    return result
+
+
+class _TurningPoints:
+    """
+    One-time hysteresis pass over the price list.
+
+    For every start index it precomputes where the WHSS wave scans would stop:
+    - valley_exit[s]: first j >= s where the price recovers by min_profit above the running minimum.
+    - peak_exit[s]: first j >= s where the price drops by min_profit below the running maximum.
+    - recovery[s]: first j >= s where the price, and the next one (two-period lookahead),
+      recover by 0.33 * min_profit above the running minimum.
+    A value of n means the scan runs off the end of the forecast.
+
+    Events only look forward, so when resuming at `start` the pass covers prices[start:] only.
+    """
+
+    def __init__(
+        self, prices: list[float], min_profit_eur_kwh: float, kernels: PythonKernels, start: int = 0
+    ) -> None:
+        n = len(prices)
+        self.n = n
+        self.extrema = _RangeExtrema(prices, kernels)
+        self.recovery_margin = min_profit_eur_kwh * 0.33
+        tail = prices[start:]
+
+        def absolute(events: list[int]) -> list[int]:
+            return [n] * start + [event + start for event in events]
+
+        # A scan started at s stops at the earliest j that recovers from (or drops below)
+        # any price at or after s, hence the suffix minimum over the per-slot events.
+        self.valley_exit = absolute(_suffix_min(_first_reaching(
+            tail, [p + min_profit_eur_kwh for p in tail], rising=True
+        )))
+        self.peak_exit = absolute(_suffix_min(_first_reaching(
+            tail, [p - min_profit_eur_kwh for p in tail], rising=False
+        )))
+
+        # Lowest of each price and its successor, so one comparison covers the lookahead
+        sustained = list(map(min, tail[:-1], tail[1:])) + [tail[-1]]
+        self.recovery = absolute(_suffix_min(_first_reaching(
+            sustained, [p + self.recovery_margin for p in tail], rising=True
+        )))
+
+class WhssStrategy(ArbitrageStrategy):
+    """
+    Standard (WHSS) - Wave Heuristic Slot Scheduler strategy.
+    
+    Segments the pricing timeline chronologically into waves,
+    then performs slot-picking within each wave.
+    """
+
+    supports_resume = True
+
+    def calculate_schedule(
+        self,
+        timeline: SlotTimeline,
+        charge_slots_count: int,
+        discharge_slots_count: int,
+        rte_factor: float,
+        min_profit_eur_kwh: float,
+        now: datetime,
+        start_idx: int = 0,
+        first_interval_id: int = 0,
+        stop_at: Container[int] = (),
+    ) -> SlotTimeline:
+        """Calculates the BESS schedule using the WHSS Wave Heuristic."""
+        prices = timeline.prices
+        n = len(timeline)
+        current_idx = start_idx
+        interval_count = first_interval_id
+        turning_points = (
+            _TurningPoints(prices, min_profit_eur_kwh, self.kernels, start_idx) if n - start_idx > 1 else None
+        )
+        
+        while current_idx < n - 1:
+            if current_idx != start_idx and current_idx in stop_at:
+                break
+
+            # Step A: Find the NEXT local valley (dip) relative to current position.
+            # The scan stops once the price recovers significantly above its running minimum.
+            valley_idx = min(turning_points.valley_exit[current_idx], n - 1)
+            valley_min = prices[turning_points.extrema.argmin(current_idx, valley_idx)]
+            
+            # Step B: Find the NEXT local peak (hump) AFTER that specific valley.
+            # The scan stops once the price drops significantly (indicating start of next wave).
+            peak_idx = min(turning_points.peak_exit[valley_idx], n - 1)
+            peak_max = prices[turning_points.extrema.argmax(valley_idx, peak_idx)]
+            
+            # Step C: Find the next valley index where the next wave starts.
+            # Break if price recovers by 1/3 of min_profit, but only after dropping by at least 40% of wave height
+            # to avoid breaking prematurely during high evening peak variations. The recovery must be sustained
+            # for at least 2 periods to filter out transient spikes.
+            wave_height = peak_max - valley_min
+            scan_end = n - 1
+            drop_idx = turning_points.extrema.first_at_most(peak_idx, peak_max - 0.40 * wave_height)
+            if drop_idx < n:
+                # From the 40% drop onwards the running minimum only depends on prices after drop_idx
+                scan_end = min(turning_points.recovery[drop_idx], n - 1)
+            temp_min_idx = turning_points.extrema.argmin(peak_idx, scan_end)
+            
+            # Find the local minimum during the transition
+            local_min_idx = peak_idx
+            if temp_min_idx > peak_idx:
+                local_min_idx = turning_points.extrema.argmin(peak_idx, temp_min_idx - 1)
+            
+            # Find the local maximum (shoulder) before the next descent
+            boundary_idx = turning_points.extrema.argmax(local_min_idx, temp_min_idx)
+            
+            segment_end = boundary_idx
+            # Guard: If segment_end points to the last element of the dataset, extend it to n (exclusive)
+            # so that the last element is included in the current segment and not orphaned.
+            if segment_end >= n - 1:
+                segment_end = n
+            # Guard: Prevent infinite loops by ensuring current_idx always advances by at least 1.
+            if segment_end == current_idx:
+                segment_end = current_idx + 1
+
+            # Define the current wave segment [current_idx, segment_end)
+            if segment_end <= current_idx:
+                current_idx = segment_end
+                continue
+
+            interval_id = -1
+            # Process if profit threshold is met, taking round-trip efficiency into account
+            if (peak_max * rte_factor - valley_min) >= min_profit_eur_kwh:                
+                # CHARGE: Select cheapest hours in this wave before the valley.
+                # At least one slot is requested so that an empty candidate pool can be told apart from a zero quota.
+                charge_pool = self.kernels.cheapest_slots(
+                    prices, current_idx, min(valley_idx, segment_end), max(charge_slots_count, 1),
+                    peak_max, rte_factor, min_profit_eur_kwh,
+                )
+                                
+                # DISCHARGE: Select most expensive hours in this wave after the valley
+                discharge_pool = self.kernels.priciest_slots(
+                    prices, max(valley_idx, current_idx), segment_end, max(discharge_slots_count, 1),
+                    valley_min, rte_factor, min_profit_eur_kwh,
+                ) if charge_pool else []
+
+                if discharge_pool:
+                    # Balance charge and discharge slots
+                    num_slots = min(len(charge_pool), charge_slots_count, len(discharge_pool), discharge_slots_count)
+                    charge_slots = charge_pool[:num_slots]
+                    discharge_slots = discharge_pool[:num_slots]
+
+                    timeline.fill_interval(current_idx, segment_end, interval_count)
+
+                    for k in charge_slots:
+                        timeline.actions[k] = ACTION_CODE_CHARGE
+                                    
+                    for k in discharge_slots:
+                        timeline.actions[k] = ACTION_CODE_DISCHARGE
+                    
+                    interval_id = interval_count
+                    interval_count += 1
+
+            # Every read stays within scan_end plus the two-period lookahead
+            timeline.waves.append(WaveRecord(
+                current_idx, current_idx, min(scan_end + 2, n), current_idx, segment_end, interval_id
+            ))
+            
+            # Move index forward to the end of this wave
+            current_idx = segment_end
+
+        return timeline
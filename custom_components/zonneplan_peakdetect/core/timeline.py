@@ -0,0 +1,413 @@
+"""Compact slot timeline shared by the sensor and the arbitrage strategies."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Container, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate, groupby
+from operator import sub
+from typing import Any
+
+from ..const import ACTION_CODE_STOP, ACTION_NAMES
+
+@dataclass(slots=True)
+class WaveRecord:
+    """
+    Bookkeeping of one wave decided by a strategy, used to reuse unchanged waves when re-planning.
+
+    Starting the strategy at any scan position in [first_state, last_state] leads to
+    this wave, and the decision only read prices in [first_state, read_end). The wave
+    assigned slots in [start, end) and the scan continues at `end`. A read_end equal to
+    the timeline length means the decision also depended on where the forecast ends.
+    """
+
+    first_state: int
+    last_state: int
+    read_end: int
+    start: int
+    end: int
+    interval_id: int
+
+
+def slot_durations(starts: list[datetime | None], default_seconds: int = 3600) -> array:
+    """
+    Duration in seconds of every slot: the time until the next slot starts.
+
+    Working from actual start times keeps DST days (92 or 100 quarters) and feeds that
+    mix hourly and quarterly slots correct. Slots without a usable successor (the last
+    one, or around unparsable start times) repeat the preceding duration.
+    """
+    if len(starts) > 1 and None not in starts:
+        # Common case of a clean, increasing feed: subtract the shifted start times in bulk
+        seconds = [int(delta.total_seconds()) for delta in map(sub, starts[1:], starts)]
+        if min(seconds) > 0:
+            seconds.append(seconds[-1])
+            return array('i', seconds)
+
+    durations = array('i', [0]) * len(starts)
+    for idx in range(len(starts) - 1):
+        start, following = starts[idx], starts[idx + 1]
+        if start is not None and following is not None:
+            seconds = int((following - start).total_seconds())
+            if seconds > 0:
+                durations[idx] = seconds
+
+    known = next((seconds for seconds in durations if seconds > 0), default_seconds)
+    for idx, seconds in enumerate(durations):
+        if seconds > 0:
+            known = seconds
+        else:
+            durations[idx] = known
+    return durations
+
+
+def modal_duration(durations: array, default_seconds: int = 3600) -> int:
+    """Most common slot duration in seconds (the earliest one on ties)."""
+    if not durations:
+        return default_seconds
+    return Counter(durations).most_common(1)[0][0]
+
+
+def quarters_to_slots(quarters: float, interval_minutes: int) -> int:
+    """Number of slots of interval_minutes covering the configured quarters (at least one unless zero)."""
+    if quarters <= 0:
+        return 0
+    return max(1, int(round(quarters * 15.0 / interval_minutes)))
+
+
+class TimelineIndex:
+    """
+    Time lookups over a planned timeline using epoch seconds and binary search.
+
+    Holds the start and end of every slot with a known start time in chronological
+    order, plus the points in time where the action changes. Outside any slot the
+    action is Stop.
+    """
+
+    __slots__ = ("starts", "ends", "positions", "change_times", "change_actions")
+
+    def __init__(self, timeline: SlotTimeline) -> None:
+        slots = sorted(
+            (start.timestamp(), idx) for idx, start in enumerate(timeline.starts) if start is not None
+        )
+        self.starts = array('d', [start for start, _ in slots])
+        self.ends = array('d', [start + timeline.durations[idx] for start, idx in slots])
+        self.positions = array('i', [idx for _, idx in slots])
+
+        self.change_times = array('d')
+        self.change_actions = array('b')
+        current = ACTION_CODE_STOP
+        previous_end = None
+        for start, end, idx in zip(self.starts, self.ends, self.positions):
+            if previous_end is not None and start > previous_end and current != ACTION_CODE_STOP:
+                # Gap between two slots
+                current = ACTION_CODE_STOP
+                self.change_times.append(previous_end)
+                self.change_actions.append(current)
+            if timeline.actions[idx] != current:
+                current = timeline.actions[idx]
+                self.change_times.append(start)
+                self.change_actions.append(current)
+            previous_end = end if previous_end is None else max(previous_end, end)
+        if current != ACTION_CODE_STOP:
+            self.change_times.append(previous_end)
+            self.change_actions.append(ACTION_CODE_STOP)
+
+    def slot_at(self, timestamp: float) -> int:
+        """Index of the slot covering timestamp, or -1 if there is none."""
+        k = bisect_right(self.starts, timestamp) - 1
+        if k >= 0 and timestamp < self.ends[k]:
+            return self.positions[k]
+        return -1
+
+    def action_at(self, timestamp: float) -> str:
+        """Action name at timestamp."""
+        k = bisect_right(self.change_times, timestamp) - 1
+        return ACTION_NAMES[self.change_actions[k]] if k >= 0 else ACTION_NAMES[ACTION_CODE_STOP]
+
+    def positions_between(self, start: float | None = None, end: float | None = None) -> array:
+        """Indices of the slots overlapping [start, end) in epoch seconds (open-ended when None), in time order."""
+        first = 0 if start is None else bisect_right(self.ends, start)
+        last = len(self.starts) if end is None else bisect_left(self.starts, end)
+        return self.positions[first:max(first, last)]
+
+    def next_change(self, timestamp: float) -> float | None:
+        """Epoch time of the first slot boundary after timestamp where the action changes."""
+        k = bisect_right(self.change_times, timestamp)
+        return self.change_times[k] if k < len(self.change_times) else None
+
+
+class SlotTimeline:
+    """
+    Struct-of-arrays representation of a planned forecast.
+
+    Each slot is stored as one entry in parallel columns instead of one dict per slot:
+    prices and multipliers as `array('d')`, actions as small integer codes in
+    `array('b')` and interval ids in `array('i')`. Strategies read and write the
+    columns directly; dicts are only built at the attribute boundary.
+
+    A planned timeline does not depend on the current time: slots outside any
+    interval keep interval id -1 and are only split into passed (-1) and
+    upcoming (0) slots by `published_interval_ids`. Strategies that support
+    incremental re-planning also append a WaveRecord per decided wave to `waves`.
+    """
+
+    __slots__ = ("datetimes", "starts", "prices", "multipliers", "actions", "interval_ids", "durations", "interval_minutes", "waves", "_index")
+
+    def __init__(
+        self,
+        datetimes: list[Any],
+        prices: array,
+        multipliers: array,
+        starts: list[datetime | None] | None = None,
+        interval_minutes: int = 60,
+        durations: array | None = None,
+    ) -> None:
+        """
+        Initialize a timeline with every slot set to Stop and outside any interval.
+
+        Without explicit per-slot durations (in seconds) every slot lasts interval_minutes.
+        """
+        self.datetimes = datetimes
+        self.starts = starts if starts is not None else [None] * len(prices)
+        self.prices = prices
+        self.multipliers = multipliers
+        self.actions = array('b', bytes(len(prices)))
+        self.interval_ids = array('i', [-1]) * len(prices)
+        self.interval_minutes = interval_minutes
+        self.durations = durations if durations is not None else array('i', [interval_minutes * 60]) * len(prices)
+        self.waves: list[WaveRecord] = []
+        self._index: TimelineIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def unplanned(self) -> SlotTimeline:
+        """
+        A fresh, unplanned timeline over the same forecast.
+
+        The forecast columns (datetimes, start times, prices, multipliers and durations)
+        are shared rather than copied: strategies only write the plan columns, so one
+        prepared forecast can be planned by several strategies.
+        """
+        return SlotTimeline(
+            self.datetimes, self.prices, self.multipliers, self.starts, self.interval_minutes, self.durations
+        )
+
+    def slot_offsets(self) -> array:
+        """
+        Start of every slot in seconds after the first one, plus the end of the last slot.
+
+        Based on the slot durations, so time horizons (found by bisecting these offsets)
+        cover the same period at any resolution and across DST days.
+        """
+        return array('q', accumulate(self.durations, initial=0))
+
+    def fill_interval(self, start: int, stop: int, interval_id: int) -> None:
+        """Assigns interval_id to every slot in [start, stop)."""
+        self.interval_ids[start:stop] = array('i', [interval_id]) * (stop - start)
+
+    def action(self, idx: int) -> str:
+        """Returns the action name of a single slot."""
+        return ACTION_NAMES[self.actions[idx]]
+
+    def index(self) -> TimelineIndex:
+        """Time index of the planned timeline, built on first use."""
+        if self._index is None:
+            self._index = TimelineIndex(self)
+        return self._index
+
+    def published_interval_ids(self, now: datetime) -> array:
+        """
+        Interval ids as exposed in the attributes: slots outside any interval are
+        marked -1 once passed and 0 while still upcoming.
+        """
+        published = array('i', self.interval_ids)
+        for idx, start in enumerate(self.starts):
+            if published[idx] == -1 and not (start is not None and start < now):
+                published[idx] = 0
+        return published
+
+    def as_dicts(self, interval_ids: array | None = None) -> list[dict[str, Any]]:
+        """Materializes the whole timeline as the list of dicts exposed in the 'schedule' attribute."""
+        if interval_ids is None:
+            interval_ids = self.interval_ids
+        return [
+            {
+                'datetime': dt,
+                'price_eur_kwh': price,
+                'price_multiplier': multiplier,
+                'action': ACTION_NAMES[code],
+                'interval_id': interval_id,
+            }
+            for dt, price, multiplier, code, interval_id in zip(
+                self.datetimes, self.prices, self.multipliers, self.actions, interval_ids
+            )
+        ]
+
+    def as_spans(self, interval_ids: array | None = None) -> list[dict[str, Any]]:
+        """
+        Run-length encodes the timeline into spans of consecutive slots that share
+        the same action and interval id, each with its start and end time.
+        """
+        if interval_ids is None:
+            interval_ids = self.interval_ids
+        spans = []
+        for (code, interval_id), group in groupby(
+            range(len(self)), key=lambda idx: (self.actions[idx], interval_ids[idx])
+        ):
+            first = last = next(group)
+            for last in group:
+                pass
+            spans.append({
+                'start': self._slot_start_iso(first),
+                'end': self._slot_end_iso(last),
+                'action': ACTION_NAMES[code],
+                'interval_id': interval_id,
+            })
+        return spans
+
+    def find_slots(
+        self,
+        positions: Iterable[int],
+        action_codes: Container[int] | None = None,
+        interval_id: int | None = None,
+        interval_ids: array | None = None,
+    ) -> list[int]:
+        """The positions whose action is one of action_codes and whose interval id matches (None matches all)."""
+        if interval_ids is None:
+            interval_ids = self.interval_ids
+        actions = self.actions
+        return [
+            idx for idx in positions
+            if (action_codes is None or actions[idx] in action_codes)
+            and (interval_id is None or interval_ids[idx] == interval_id)
+        ]
+
+    def slot_dicts(self, positions: Iterable[int], interval_ids: array | None = None) -> list[dict[str, Any]]:
+        """Schedule items (as in the 'schedule' attribute) of the given slots only."""
+        if interval_ids is None:
+            interval_ids = self.interval_ids
+        return [
+            {
+                'datetime': self.datetimes[idx],
+                'price_eur_kwh': self.prices[idx],
+                'price_multiplier': self.multipliers[idx],
+                'action': ACTION_NAMES[self.actions[idx]],
+                'interval_id': interval_ids[idx],
+            }
+            for idx in positions
+        ]
+
+    def spans_of(self, positions: Iterable[int], interval_ids: array | None = None) -> list[dict[str, Any]]:
+        """
+        Merges the given slots into spans like `as_spans`: runs of adjacent slots sharing
+        the same action and interval id. A skipped slot always ends a span.
+        """
+        if interval_ids is None:
+            interval_ids = self.interval_ids
+        spans = []
+        first = last = None
+        for idx in positions:
+            if (
+                last is not None
+                and idx == last + 1
+                and self.actions[idx] == self.actions[last]
+                and interval_ids[idx] == interval_ids[last]
+            ):
+                last = idx
+                continue
+            if first is not None:
+                spans.append(self._span(first, last, interval_ids))
+            first = last = idx
+        if first is not None:
+            spans.append(self._span(first, last, interval_ids))
+        return spans
+
+    def _span(self, first: int, last: int, interval_ids: array) -> dict[str, Any]:
+        return {
+            'start': self._slot_start_iso(first),
+            'end': self._slot_end_iso(last),
+            'action': ACTION_NAMES[self.actions[first]],
+            'interval_id': interval_ids[first],
+        }
+
+    def interval_bounds(self) -> list[tuple[int, int, int]]:
+        """Slot ranges [start, end) of the planned intervals as (start, end, interval_id), in slot order."""
+        bounds = []
+        for interval_id, group in groupby(range(len(self)), key=self.interval_ids.__getitem__):
+            first = last = next(group)
+            for last in group:
+                pass
+            if interval_id >= 0:
+                bounds.append((first, last + 1, interval_id))
+        return bounds
+
+    def packed_prices(self, digits: int = 5) -> list[float]:
+        """Slot prices in €/kWh, rounded to keep the attribute small."""
+        return [round(price, digits) for price in self.prices]
+
+    def _slot_start_iso(self, idx: int) -> Any:
+        start = self.starts[idx]
+        return start.isoformat() if start is not None else self.datetimes[idx]
+
+    def _slot_end_iso(self, idx: int) -> Any:
+        start = self.starts[idx]
+        return (start + timedelta(seconds=self.durations[idx])).isoformat() if start is not None else None
+
+    def interval_count(self, interval_ids: array | None = None) -> int:
+        """Number of distinct non-negative interval ids."""
+        if interval_ids is None:
+            interval_ids = self.interval_ids
+        return len(set(interval_ids) - {-1})
+
+    @classmethod
+    def empty(cls) -> SlotTimeline:
+        """Returns a timeline without slots."""
+        return cls([], array('d'), array('d'))
+
+
+    def as_storage(self) -> dict[str, Any]:
+        """JSON-serializable form of the planned timeline, restored by `from_storage`."""
+        return {
+            "datetimes": [dt.isoformat() if isinstance(dt, datetime) else dt for dt in self.datetimes],
+            "starts": [start.isoformat() if start is not None else None for start in self.starts],
+            "prices": self.prices.tolist(),
+            "multipliers": self.multipliers.tolist(),
+            "actions": self.actions.tolist(),
+            "interval_ids": self.interval_ids.tolist(),
+            "durations": self.durations.tolist(),
+            "interval_minutes": self.interval_minutes,
+            "waves": [
+                [wave.first_state, wave.last_state, wave.read_end, wave.start, wave.end, wave.interval_id]
+                for wave in self.waves
+            ],
+        }
+
+    @classmethod
+    def from_storage(cls, data: dict[str, Any]) -> SlotTimeline:
+        """
+        Rebuilds a planned timeline from `as_storage` output.
+
+        Raises KeyError, TypeError or ValueError when the data is incomplete or its
+        columns do not line up.
+        """
+        timeline = cls(
+            data["datetimes"],
+            array('d', data["prices"]),
+            array('d', data["multipliers"]),
+            [datetime.fromisoformat(start) if start is not None else None for start in data["starts"]],
+            data["interval_minutes"],
+            array('i', data["durations"]),
+        )
+        timeline.actions = array('b', data["actions"])
+        timeline.interval_ids = array('i', data["interval_ids"])
+        timeline.waves = [WaveRecord(*wave) for wave in data["waves"]]
+        columns = (timeline.datetimes, timeline.starts, timeline.multipliers, timeline.actions, timeline.interval_ids, timeline.durations)
+        if any(len(column) != len(timeline) for column in columns):
+            raise ValueError("Stored timeline columns differ in length")
+        return timeline
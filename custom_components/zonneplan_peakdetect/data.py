@@ -9,6 +9,8 @@ if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.loader import Integration
 
+    from .sensor import BatteryOptimizerSensor
+
 
 type ZonneplanBmsConfigEntry = ConfigEntry[ZonneplanBmsData]
 
@@ -17,3 +19,5 @@ class ZonneplanBmsData:
     """Data for the Zonneplan BMS integration"""
 
     integration: Any
+    # Set by the sensor platform, read by the diagnostics download
+    optimizer: BatteryOptimizerSensor | None = None
@@ -0,0 +1,32 @@
+"""Diagnostics support for the Zonneplan Battery Optimizer."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import ZonneplanBmsConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ZonneplanBmsConfigEntry
+) -> dict[str, Any]:
+    """
+    Return the configuration, the current forecast and the recent planning traces.
+
+    The `forecast` key can be fed straight back into dry_run_swa.py to replay a plan.
+    """
+    diagnostics: dict[str, Any] = {"config": dict(entry.data)}
+    optimizer = getattr(entry.runtime_data, "optimizer", None)
+    if optimizer is None:
+        return diagnostics
+
+    state = hass.states.get(optimizer.forecast_entity_id)
+    return {
+        **diagnostics,
+        "forecast_entity": optimizer.forecast_entity_id,
+        "forecast": state.attributes.get("forecast") if state is not None else None,
+        **optimizer.diagnostics(),
+    }
@@ -1,31 +1,73 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import base64
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceResponse, SupportsResponse, callback
+from homeassistant.helpers import entity_platform
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.storage import Store
 from homeassistant.util import dt as dt_util
 
 from .const import (
     ACTION_CHARGE,
     ACTION_DISCHARGE,
+    ACTION_NAMES,
     ACTION_STOP,
+    ATTR_ACTION,
+    ATTR_COUNT,
+    ATTR_END,
+    ATTR_INTERVAL_ID,
+    ATTR_OUTPUT,
+    ATTR_START,
     CONF_CHARGE_QUARTERS,
     CONF_DISCHARGE_QUARTERS,
     CONF_FORECAST_ENTITY,
     CONF_MIN_PROFIT,
     CONF_RTE_PERCENT,
     CONF_ALGORITHM,
+    CONF_BACKEND,
     DEFAULT_ALGORITHM,
+    DEFAULT_BACKEND,
+    DEFAULT_PROFILE_REPLANS,
     DOMAIN,
+    FORECAST_DEBOUNCE_SECONDS,
     LOGGER,
+    MAX_PROFILE_REPLANS,
+    OUTPUT_SLOTS,
+    OUTPUT_SPANS,
+    PLAN_CACHE_SIZE,
+    PLANNING_TRACE_SIZE,
+    SERVICE_GET_SCHEDULE,
+    SERVICE_PROFILE_REPLANS,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY_SECONDS,
+    STORAGE_VERSION,
 )
-from .strategies import get_arbitrage_strategy
+from .coordinator import ForecastCoordinator, async_get_forecast_coordinator
+from .core.stats import PHASE_ATTRIBUTES, PHASE_INGEST, PHASE_STRATEGY, PlanningStats
+from .core.timeline import SlotTimeline
 
 SENSOR_DESCRIPTION = SensorEntityDescription(
     key="Action",
@@ -34,6 +76,68 @@ SENSOR_DESCRIPTION = SensorEntityDescription(
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class PlanningDiagnosticDescription(SensorEntityDescription):
+    """Describes a diagnostic sensor that reads one value from the planning stats."""
+
+    value_fn: Callable[[PlanningStats], float | int | None]
+
+
+def _phase_descriptions(phase: str, label: str) -> tuple[PlanningDiagnosticDescription, ...]:
+    """Last and rolling p95 duration sensors of one planning phase."""
+    common = {
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "entity_registry_enabled_default": False,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "native_unit_of_measurement": UnitOfTime.MILLISECONDS,
+        "suggested_display_precision": 2,
+        "icon": "mdi:timer-outline",
+    }
+    return (
+        PlanningDiagnosticDescription(
+            key=f"{phase}_duration", name=f"{label} duration", value_fn=lambda stats: stats.last_ms(phase), **common
+        ),
+        PlanningDiagnosticDescription(
+            key=f"{phase}_duration_p95", name=f"{label} duration p95", value_fn=lambda stats: stats.p95_ms(phase), **common
+        ),
+    )
+
+
+# Diagnostic sensors are disabled by default, like other noisy diagnostics in Home Assistant
+DIAGNOSTIC_DESCRIPTIONS: tuple[PlanningDiagnosticDescription, ...] = (
+    *_phase_descriptions(PHASE_INGEST, "Forecast ingest"),
+    *_phase_descriptions(PHASE_STRATEGY, "Strategy run"),
+    *_phase_descriptions(PHASE_ATTRIBUTES, "Attribute build"),
+    PlanningDiagnosticDescription(
+        key="recomputes_per_hour",
+        name="Recomputations per hour",
+        icon="mdi:refresh",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.recomputes_per_hour(),
+    ),
+    PlanningDiagnosticDescription(
+        key="plan_cache_hits",
+        name="Plan cache hits",
+        icon="mdi:cached",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.cache_hits,
+    ),
+    PlanningDiagnosticDescription(
+        key="forecast_slots",
+        name="Forecast slots",
+        icon="mdi:chart-timeline-variant",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.forecast_slots,
+    ),
+)
+
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: Any, async_add_entities: Any) -> None:
     """Set up the Battery Optimizer Sensor."""
     config = config_entry.data
@@ -52,34 +156,60 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: Any, async_add_en
     price_delta_percent = config.get(CONF_RTE_PERCENT)
     min_profit_c_kwh = config.get(CONF_MIN_PROFIT)
     algorithm_type = config.get(CONF_ALGORITHM, DEFAULT_ALGORITHM)
-
-    async_add_entities([
-        BatteryOptimizerSensor(
-            config_entry.entry_id,
-            forecast_entity_id,
-            charge_quarters,
-            discharge_quarters,
-            price_delta_percent,
-            min_profit_c_kwh,
-            algorithm_type,
-            SENSOR_DESCRIPTION
-        )
-    ], True)
-
-
-def _parse_datetime(val: Any) -> datetime | None:
-    """Safely parse a datetime object or string."""
-    if isinstance(val, datetime):
-        return val
-    if isinstance(val, str):
-        return dt_util.parse_datetime(val)
-    return None
+    backend = config.get(CONF_BACKEND, DEFAULT_BACKEND)
+
+    optimizer = BatteryOptimizerSensor(
+        config_entry.entry_id,
+        forecast_entity_id,
+        charge_quarters,
+        discharge_quarters,
+        price_delta_percent,
+        min_profit_c_kwh,
+        algorithm_type,
+        SENSOR_DESCRIPTION,
+        backend,
+    )
+    if getattr(config_entry, "runtime_data", None) is not None:
+        config_entry.runtime_data.optimizer = optimizer
+    # Not updated before adding: the optimizer restores its last plan and plans once when added
+    async_add_entities([optimizer])
+    async_add_entities(
+        PlanningDiagnosticSensor(config_entry.entry_id, optimizer, description)
+        for description in DIAGNOSTIC_DESCRIPTIONS
+    )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_PROFILE_REPLANS,
+        {
+            vol.Optional(ATTR_COUNT, default=DEFAULT_PROFILE_REPLANS): vol.All(
+                cv.positive_int, vol.Range(min=1, max=MAX_PROFILE_REPLANS)
+            ),
+        },
+        "async_profile_replans",
+    )
+    platform.async_register_entity_service(
+        SERVICE_GET_SCHEDULE,
+        {
+            vol.Optional(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_ACTION): vol.All(cv.ensure_list, [vol.In(ACTION_NAMES)]),
+            vol.Optional(ATTR_INTERVAL_ID): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(ATTR_OUTPUT, default=OUTPUT_SLOTS): vol.In([OUTPUT_SLOTS, OUTPUT_SPANS]),
+        },
+        "async_get_schedule",
+        supports_response=SupportsResponse.ONLY,
+    )
 
 
 class BatteryOptimizerSensor(SensorEntity, RestoreEntity):
     """Representation of the Battery Optimizer Sensor."""
 
     _attr_has_entity_name = True
+    # The action only changes at slot boundaries, which are tracked with a timer instead
+    _attr_should_poll = False
+    # The verbose per-slot schedule is kept out of the recorder, the compact encoding is recorded
+    _unrecorded_attributes = frozenset({"schedule"})
 
     def __init__(
         self,
@@ -90,28 +220,59 @@ class BatteryOptimizerSensor(SensorEntity, RestoreEntity):
         price_delta_percent: float,
         min_profit_c_kwh: float,
         algorithm_type: str,
-        description: SensorEntityDescription
+        description: SensorEntityDescription,
+        backend: str = DEFAULT_BACKEND,
     ) -> None:
         """Initialize the sensor."""
         self.entity_description = description
         self._attr_unique_id = f"{entry_id}_{description.key}"
         self._attr_name = description.key
+        self._entry_id = entry_id
         self._forecast_entity_id = forecast_entity_id
         self._charge_quarters = charge_quarters
         self._discharge_quarters = discharge_quarters
         self._price_delta_percent = price_delta_percent
         self._algorithm_type = algorithm_type
+        self._backend = backend
         # Convert minimal profit from cents/kWh to €/kWh
         self._min_profit_eur_kwh = min_profit_c_kwh / 100.0
         self._attr_native_value = ACTION_STOP
+        self._timeline = SlotTimeline.empty()
+        self._interval_ids = self._timeline.interval_ids
+        self._schedule: list[dict[str, Any]] | None = None
+        # Plan the slot-level attributes were last built from
+        self._published_timeline: SlotTimeline | None = None
+        # Bounded LRU of recent plans keyed on forecast fingerprint and strategy parameters
+        self._plan_cache: OrderedDict[tuple[Any, ...], SlotTimeline] = OrderedDict()
+        # Cache key of the published plan and the store it is persisted in
+        self._timeline_key: tuple[Any, ...] | None = None
+        self._store: Store[dict[str, Any]] | None = None
+        # Incremented per planning run so results of superseded forecasts can be dropped
+        self._plan_generation = 0
+        self._replan_debouncer: Debouncer | None = None
+        # Shared with the other optimizers of the forecast entity, set when added to hass
+        self._coordinator: ForecastCoordinator | None = None
+        self._unsub_slot_boundary: CALLBACK_TYPE | None = None
+        # Phase timings and work counters, shown by the diagnostic sensors
+        self.stats = PlanningStats()
+        self._stats_listeners: list[Callable[[], None]] = []
+        # Attribute build time of the last refresh, completed when the schedule is materialized
+        self._attribute_seconds = 0.0
+        # Recent planning runs and the on-demand profile, for the diagnostics download
+        self._traces: deque[dict[str, Any]] = deque(maxlen=PLANNING_TRACE_SIZE)
+        self._profiler: cProfile.Profile | None = None
+        self._profile_remaining = 0
+        self._profile_runs = 0
+        self._profile_result: dict[str, Any] | None = None
         self._attr_extra_state_attributes: dict[str, Any] = {
-            "schedule": [],
             "intervals": 0,
             "min_profit_required_eur_kwh": self._min_profit_eur_kwh,
             "charge_quarters": self._charge_quarters,
             "discharge_quarters": self._discharge_quarters,
             "price_delta_threshold_percent": self._price_delta_percent,
             "algorithm_type": self._algorithm_type,
+            "schedule_spans": [],
+            "schedule_prices": [],
         }
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry_id)},
@@ -125,145 +286,398 @@ class BatteryOptimizerSensor(SensorEntity, RestoreEntity):
         """Register listeners when entity is added."""
         await super().async_added_to_hass()
         
-        self.async_on_remove(
-            async_track_state_change_event(self.hass, self._forecast_entity_id, self._handle_forecast_update)
+        # Coalesce bursts of forecast updates into a single planning run
+        self._replan_debouncer = Debouncer(
+            self.hass,
+            LOGGER,
+            cooldown=FORECAST_DEBOUNCE_SECONDS,
+            immediate=False,
+            function=self._async_replan,
         )
-        await self.async_update()
+        self.async_on_remove(self._replan_debouncer.async_shutdown)
+        self.async_on_remove(self._cancel_slot_boundary_timer)
+        self._coordinator = async_get_forecast_coordinator(self.hass, self._forecast_entity_id)
+        self.async_on_remove(self._coordinator.async_add_listener(self._handle_forecast_update))
+
+        self._store = Store(self.hass, STORAGE_VERSION, f"{STORAGE_KEY}.{self._entry_id}")
+        if await self._async_restore_plan():
+            # The restored plan is published right away; re-planning does not hold up the setup
+            self.hass.async_create_task(self._async_replan())
+        else:
+            await self.async_update()
+
+    async def _async_restore_plan(self) -> bool:
+        """
+        Publishes the persisted plan if it was made with the current parameters.
+
+        Its cache key is seeded into the plan cache, so the first update only runs the
+        strategy when the forecast changed while Home Assistant was down.
+        """
+        data = await self._store.async_load()
+        if not data or data.get("parameters") != self._parameters():
+            return False
+        try:
+            timeline = SlotTimeline.from_storage(data["timeline"])
+        except (KeyError, TypeError, ValueError) as err:
+            LOGGER.warning("Ignoring the stored schedule of %s: %s", self.entity_id, err)
+            return False
+
+        cache_key = tuple(data["cache_key"]) if data.get("cache_key") else None
+        if cache_key is not None:
+            self._plan_cache[cache_key] = timeline
+        self._timeline = timeline
+        self._timeline_key = cache_key
+        self._refresh_current_action()
+        LOGGER.debug("Restored the stored schedule of %s", self.entity_id)
+        return True
+
+    def _storage_data(self) -> dict[str, Any]:
+        """The published plan with its cache key and parameters, as persisted."""
+        return {
+            "cache_key": list(self._timeline_key) if self._timeline_key is not None else None,
+            "parameters": self._parameters(),
+            "timeline": self._timeline.as_storage(),
+        }
 
     @callback
     def _handle_forecast_update(self, event: Any) -> None:
-        """Callback to force recalculation when forecast sensor changes."""
-        self.async_schedule_update_ha_state(force_refresh=True)
+        """Callback to schedule a (debounced) recalculation when forecast sensor changes."""
+        self._replan_debouncer.async_schedule_call()
+
+    @callback
+    def _handle_slot_boundary(self, now: datetime) -> None:
+        """Timer callback at the slot boundary where the planned action changes."""
+        self._unsub_slot_boundary = None
+        self._refresh_current_action(now)
+        self.async_write_ha_state()
+        self._notify_stats_listeners()
+
+    @callback
+    def _cancel_slot_boundary_timer(self) -> None:
+        """Cancels the pending slot boundary timer, if any."""
+        if self._unsub_slot_boundary is not None:
+            self._unsub_slot_boundary()
+            self._unsub_slot_boundary = None
+
+    async def _async_replan(self) -> None:
+        """Re-plans after the forecast settled and writes the state if the result is still current."""
+        if await self._async_update_plan():
+            self.async_write_ha_state()
+            self._notify_stats_listeners()
 
-    def _convert_price(self, price_int: int) -> float:
+    @callback
+    def async_add_stats_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Registers a callback run after the planning stats changed; returns its remover."""
+        self._stats_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._stats_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _notify_stats_listeners(self) -> None:
+        for listener in list(self._stats_listeners):
+            listener()
+
+    def _calculate_action_schedule(
+        self,
+        prepared: SlotTimeline,
+        previous: SlotTimeline | None = None,
+        profiler: cProfile.Profile | None = None,
+    ) -> SlotTimeline:
         """
-        Converts the raw integer price to €/kWh.
-        
-        The raw integer is typically in a scaled unit (e.g., deci-micro-euro)
-        and must be divided by 10,000,000.0 to get the price in Euro/kWh (€/kWh).
+        Plans the shared prepared forecast with the configured strategy (runs in the executor).
+
+        The planner, with the strategies and their numeric kernels, is only imported
+        here, so loading the integration does not import it on the event loop. With a
+        profiler, the planning run is added to its profile.
         """
-        return price_int / 10_000_000.0
+        from .core.planner import plan_timeline
+
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                LOGGER.warning("Another profiler is active, re-plan not profiled")
+                profiler = None
+        try:
+            return plan_timeline(
+                prepared.unplanned(),
+                self._algorithm_type,
+                self._charge_quarters,
+                self._discharge_quarters,
+                self._price_delta_percent,
+                self._min_profit_eur_kwh,
+                self._backend,
+                previous,
+                dt_util.now(),
+                self.stats,
+            )
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    def _parameters(self) -> dict[str, Any]:
+        """Strategy parameters of this sensor."""
+        return {
+            "algorithm_type": self._algorithm_type,
+            "backend": self._backend,
+            "charge_quarters": self._charge_quarters,
+            "discharge_quarters": self._discharge_quarters,
+            "price_delta_percent": self._price_delta_percent,
+            "min_profit_eur_kwh": self._min_profit_eur_kwh,
+        }
 
-    def _calculate_action_schedule(self, forecast_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """Main logic to segment and determine the optimal action schedule."""
-        if not forecast_data:
-            return []
-        
-        rte_factor = 1.0 - (self._price_delta_percent / 100.0)
-        
-        # 1. Prepare Data
-        now = dt_util.now()
-        prepared_data = []
-        running_min = float('inf')
-        for idx, item in enumerate(forecast_data):
-            # Backwards-compatible format extraction (supporting both old and new schema)
-            raw_dt = item.get('start_date')
-            if raw_dt is None:
-                raw_dt = item.get('datetime')
-
-            raw_price = None
-            price_tax_included = item.get('price_tax_included')
-            if isinstance(price_tax_included, dict):
-                raw_price = price_tax_included.get('amount')
-            if raw_price is None:
-                raw_price = item.get('electricity_price')
-            
-            if raw_dt is None:
-                LOGGER.warning("Incomplete forecast data (missing datetime) at index %d: %s", idx, item)
-                continue
-                
-            if 'price_eur_kwh' in item:
-                price = item['price_eur_kwh']
-            elif raw_price is not None:
-                price = self._convert_price(raw_price)
-            else:
-                LOGGER.warning("Incomplete forecast data (missing price) at index %d: %s", idx, item)
-                continue
-                
-            if price < running_min:
-                running_min = price
-            
-            dt = _parse_datetime(raw_dt)
-            is_passed = dt < now if dt else False
-
-            prepared_data.append({
-                'datetime': raw_dt,
-                'price_eur_kwh': price,
-                'price_multiplier': round(price / running_min, 2) if running_min > 0 else round(1.0 + price / abs(running_min), 2) if running_min != 0 else 1.0,
-                'action': ACTION_STOP,
-                'interval_id': -1 if is_passed else 0,
-                'sort_index': idx
-            })
-
-        # 2. Determine interval duration and slot counts from configured quarters
-        interval_minutes = 60
-        if len(prepared_data) > 1:
-            dt1 = _parse_datetime(prepared_data[0]['datetime'])
-            dt2 = _parse_datetime(prepared_data[1]['datetime'])
-            if dt1 and dt2:
-                diff = (dt2 - dt1).total_seconds() / 60.0
-                if diff > 0:
-                    interval_minutes = int(diff)
-
-        if self._charge_quarters > 0:
-            charge_slots_count = max(1, int(round(self._charge_quarters * 15.0 / interval_minutes)))
-        else:
-            charge_slots_count = 0
+    def _record_trace(self, cache_key: tuple[Any, ...] | None, timeline: SlotTimeline, cache_hit: bool) -> None:
+        """Adds a planning run with its inputs, timings and chosen intervals to the trace buffer."""
+        self._traces.append({
+            "time": dt_util.utcnow().isoformat(),
+            "fingerprint": cache_key[0] if cache_key is not None else None,
+            "cache_hit": cache_hit,
+            "forecast_slots": len(timeline),
+            "parameters": self._parameters(),
+            "timings_ms": None if cache_hit else {
+                phase: self.stats.last_ms(phase) for phase in (PHASE_INGEST, PHASE_STRATEGY)
+            },
+            "waves": [
+                {
+                    "interval_id": interval_id,
+                    "first_slot": start,
+                    "last_slot": end - 1,
+                    "start": timeline.datetimes[start],
+                    "last_slot_start": timeline.datetimes[end - 1],
+                }
+                for start, end, interval_id in timeline.interval_bounds()
+            ],
+        })
+
+    async def async_profile_replans(self, count: int = DEFAULT_PROFILE_REPLANS) -> None:
+        """Service: capture a cProfile of the next `count` strategy runs for the diagnostics download."""
+        LOGGER.info("Profiling the next %d re-plan(s) of %s", count, self.entity_id)
+        self._profiler = cProfile.Profile()
+        self._profile_remaining = count
+        self._profile_runs = 0
+
+    def _finish_profile(self) -> None:
+        """Turns the captured profile into a readable summary plus the raw pstats data."""
+        profiler, self._profiler = self._profiler, None
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+        self._profile_result = {
+            "captured": dt_util.utcnow().isoformat(),
+            "replans": self._profile_runs,
+            "top_cumulative": summary.getvalue(),
+            # Write the decoded bytes to a file to load it with pstats.Stats or snakeviz
+            "pstats_marshal_base64": base64.b64encode(marshal.dumps(stats.stats)).decode(),
+        }
+        LOGGER.info("Profile of %d re-plan(s) of %s captured", self._profile_runs, self.entity_id)
 
-        if self._discharge_quarters > 0:
-            discharge_slots_count = max(1, int(round(self._discharge_quarters * 15.0 / interval_minutes)))
-        else:
-            discharge_slots_count = 0
-
-        # Execute the chosen algorithm strategy polymorphically
-        strategy = get_arbitrage_strategy(self._algorithm_type)
-        schedule = strategy.calculate_schedule(
-            prepared_data,
-            charge_slots_count,
-            discharge_slots_count,
-            rte_factor,
+    async def async_get_schedule(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        action: list[str] | None = None,
+        interval_id: int | None = None,
+        output: str = OUTPUT_SLOTS,
+    ) -> ServiceResponse:
+        """
+        Service: the part of the schedule overlapping [start, end), optionally only the
+        given actions and one interval, as slots or merged spans.
+
+        Answered from the time index of the plan, so only the requested slots are
+        materialized. Naive times are taken as local time.
+        """
+        timeline = self._timeline
+        positions = timeline.index().positions_between(
+            dt_util.as_local(start).timestamp() if start is not None else None,
+            dt_util.as_local(end).timestamp() if end is not None else None,
+        )
+        if action is not None or interval_id is not None:
+            positions = timeline.find_slots(
+                positions,
+                {ACTION_NAMES.index(name) for name in action} if action is not None else None,
+                interval_id,
+            )
+        if output == OUTPUT_SPANS:
+            return {"schedule_spans": timeline.spans_of(positions, self._interval_ids)}
+        return {"schedule": timeline.slot_dicts(positions, self._interval_ids)}
+
+    @property
+    def forecast_entity_id(self) -> str:
+        """Entity providing the forecast."""
+        return self._forecast_entity_id
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Recent planning traces, stats and the last captured profile."""
+        return {
+            "parameters": self._parameters(),
+            "stats": {
+                "forecast_slots": self.stats.forecast_slots,
+                "cache_hits": self.stats.cache_hits,
+                "recomputes_per_hour": self.stats.recomputes_per_hour(),
+                "duration_ms": {
+                    phase: {"last": self.stats.last_ms(phase), "p95": self.stats.p95_ms(phase)}
+                    for phase in (PHASE_INGEST, PHASE_STRATEGY, PHASE_ATTRIBUTES)
+                },
+            },
+            "traces": list(self._traces),
+            "profile": self._profile_result,
+            "profile_pending": self._profile_remaining,
+        }
+
+    def _plan_cache_key(self, forecast_data: list[dict[str, Any]]) -> tuple[Any, ...] | None:
+        """Key of a plan in the cache: forecast fingerprint plus all strategy parameters."""
+        fingerprint = self._coordinator.fingerprint(forecast_data)
+        if fingerprint is None:
+            return None
+        return (
+            fingerprint,
+            len(forecast_data),
+            self._algorithm_type,
+            self._backend,
+            self._charge_quarters,
+            self._discharge_quarters,
+            self._price_delta_percent,
             self._min_profit_eur_kwh,
-            now
         )
-        
-        # Read total interval count directly from scheduled data attributes
-        intervals = len(set(h['interval_id'] for h in schedule if h.get('interval_id', -1) >= 0))
-        self._attr_extra_state_attributes['intervals'] = intervals
 
-        # Remove helper key before returning
-        for item in schedule: item.pop('sort_index', None)
-        return schedule
+    async def _async_update_plan(self) -> bool:
+        """
+        Plans the current forecast, running the strategy in the executor unless the plan is cached.
 
-    async def async_update(self) -> None:
-        """Get the latest forecast data and update the state."""
-        LOGGER.debug("Updating BESS Optimizer Sensor from %s", self._forecast_entity_id)
-        
+        Returns False when there is no forecast or when a newer run started while this
+        one was planning, in which case its result is discarded.
+        """
         state = self.hass.states.get(self._forecast_entity_id)
 
         if not state or "forecast" not in state.attributes:
             LOGGER.warning("Forecast entity %s or its forecast attribute not found", self._forecast_entity_id)
+            return False
+
+        forecast_data = state.attributes.get("forecast")
+        self._plan_generation += 1
+        generation = self._plan_generation
+
+        cache_key = self._plan_cache_key(forecast_data)
+        if cache_key is not None and cache_key in self._plan_cache:
+            self._plan_cache.move_to_end(cache_key)
+            LOGGER.debug("Forecast unchanged, reusing cached schedule")
+            self.stats.cache_hits += 1
+            timeline = self._plan_cache[cache_key]
+            self._record_trace(cache_key, timeline, True)
+        else:
+            prepared = await self._coordinator.async_prepare(forecast_data)
+            self.stats.record(PHASE_INGEST, self._coordinator.ingest_seconds)
+            profiler = self._profiler if self._profile_remaining > 0 else None
+            timeline = await self.hass.async_add_executor_job(
+                self._calculate_action_schedule, prepared, self._timeline, profiler
+            )
+            if profiler is not None and profiler is self._profiler:
+                self._profile_remaining -= 1
+                self._profile_runs += 1
+                if self._profile_remaining == 0:
+                    self._finish_profile()
+            if generation != self._plan_generation:
+                LOGGER.debug("Forecast changed while planning, discarding superseded schedule")
+                return False
+            if cache_key is not None:
+                self._plan_cache[cache_key] = timeline
+                if len(self._plan_cache) > PLAN_CACHE_SIZE:
+                    self._plan_cache.popitem(last=False)
+            self._record_trace(cache_key, timeline, False)
+
+        if timeline is not self._timeline:
+            self._timeline = timeline
+            self._timeline_key = cache_key
+            self._store.async_delay_save(self._storage_data, STORAGE_SAVE_DELAY_SECONDS)
+        self._refresh_current_action()
+        return True
+
+    def _refresh_current_action(self, now: datetime | None = None) -> None:
+        """
+        Updates the time-dependent parts of the state from the current plan and
+        schedules the next update at the slot boundary where the action changes.
+        """
+        started = time.perf_counter()
+        timeline = self._timeline
+        if now is None:
+            now = dt_util.now()
+        timestamp = now.timestamp()
+        index = timeline.index()
+
+        interval_ids = timeline.published_interval_ids(now)
+        # The slot-level attributes only change with the plan or when an interval passes,
+        # so a slot boundary refresh keeps the already materialized schedule
+        if timeline is not self._published_timeline or interval_ids != self._interval_ids:
+            self._published_timeline = timeline
+            self._interval_ids = interval_ids
+            # Read total interval count directly from the scheduled timeline
+            self._attr_extra_state_attributes['intervals'] = timeline.interval_count(interval_ids)
+            self._attr_extra_state_attributes['schedule_spans'] = timeline.as_spans(interval_ids)
+            self._attr_extra_state_attributes['schedule_prices'] = timeline.packed_prices()
+            self._schedule = None
+            self._attribute_seconds = time.perf_counter() - started
+        self._attr_native_value = index.action_at(timestamp)
+
+        self._cancel_slot_boundary_timer()
+        next_change = index.next_change(timestamp)
+        if next_change is not None:
+            self._unsub_slot_boundary = async_track_point_in_time(
+                self.hass, self._handle_slot_boundary, dt_util.utc_from_timestamp(next_change)
+            )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes, materializing the per-slot schedule once per plan or interval change."""
+        if self._schedule is None:
+            started = time.perf_counter()
+            self._schedule = self._timeline.as_dicts(self._interval_ids)
+            self.stats.record(PHASE_ATTRIBUTES, self._attribute_seconds + time.perf_counter() - started)
+        return {
+            "schedule": self._schedule,
+            **self._attr_extra_state_attributes,
+        }
+
+    async def async_update(self) -> None:
+        """Get the latest forecast data and update the state."""
+        LOGGER.debug("Updating BESS Optimizer Sensor from %s", self._forecast_entity_id)
+
+        if not await self._async_update_plan():
             return
 
-        schedule = self._calculate_action_schedule(state.attributes.get("forecast"))
-        self._attr_extra_state_attributes['schedule'] = schedule
+        LOGGER.debug("Current BESS action set to: %s", self._attr_native_value)
+        self._notify_stats_listeners()
 
-        if len(schedule) <= 0:
-            self._attr_native_value = ACTION_STOP
 
-        now = dt_util.now()
-        interval_minutes = 60
-        if len(schedule) > 1:
-            dt1 = _parse_datetime(schedule[0]["datetime"])
-            dt2 = _parse_datetime(schedule[1]["datetime"])
-            if dt1 and dt2:
-                diff = (dt2 - dt1).total_seconds() / 60.0
-                if diff > 0:
-                    interval_minutes = int(diff)
+class PlanningDiagnosticSensor(SensorEntity):
+    """Diagnostic sensor exposing one planning timing or work counter of the optimizer."""
 
-        for i in schedule:
-            dt = _parse_datetime(i["datetime"])
-            if dt and dt <= now < dt + timedelta(minutes=interval_minutes):
-                self._attr_native_value = i['action']
-                break
+    _attr_has_entity_name = True
+    # Updated by the optimizer after every re-plan and slot boundary
+    _attr_should_poll = False
+    entity_description: PlanningDiagnosticDescription
 
-        LOGGER.debug("Current BESS action set to: %s", self._attr_native_value)
+    def __init__(
+        self,
+        entry_id: str,
+        optimizer: BatteryOptimizerSensor,
+        description: PlanningDiagnosticDescription,
+    ) -> None:
+        """Initialize the diagnostic sensor on the optimizer's device."""
+        self.entity_description = description
+        self._optimizer = optimizer
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, entry_id)})
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the planning stats of the optimizer."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._optimizer.async_add_stats_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Current value read from the optimizer's planning stats."""
+        return self.entity_description.value_fn(self._optimizer.stats)
@@ -1,164 +1,105 @@
 #!/usr/bin/env python3
+"""
+Dry-runs the battery optimizer on exported forecasts, outside Home Assistant.
+
+    python dry_run_swa.py state.json
+    python dry_run_swa.py captures/ 'exports/*.jsonl' --jobs 8 --algorithm whss --format csv -o results.csv
+
+Accepts exported sensor states, diagnostics downloads or plain forecast lists as JSON,
+YAML or JSON Lines, price tables as CSV and NumPy .npz archives (arrays `start` and
+`price_eur_kwh`).
+Directories and glob patterns are expanded, and a JSON Lines file with one exported
+state per line yields one forecast per line. A single forecast is printed as a table;
+batches are written as JSONL or CSV with per-forecast interval counts, actions and timings.
+"""
+import argparse
+import csv
+import glob
 import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
 import yaml
-from datetime import datetime
-
-# Action constants
-ACTION_CHARGE = "Charge"
-ACTION_DISCHARGE = "Discharge"
-ACTION_STOP = "Stop"
-
-def _parse_datetime(val):
-    if isinstance(val, datetime):
-        return val
-    if isinstance(val, str):
-        if val.endswith("+00:00"):
-            val = val[:-6]
-        return datetime.fromisoformat(val)
-    return None
+
+from custom_components.zonneplan_peakdetect.const import (
+    ACTION_CHARGE,
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+    ACTION_DISCHARGE,
+    ALGORITHM_HSWAS,
+    BACKEND_AUTO,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
+)
+from custom_components.zonneplan_peakdetect.core.planner import plan_forecast
+from custom_components.zonneplan_peakdetect.core.strategies import STRATEGIES
+
+# Loader in C when PyYAML was built with libyaml, many times faster on multi-day exports
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+INPUT_SUFFIXES = (".json", ".jsonl", ".ndjson", ".yaml", ".yml", ".csv", ".npz")
+
+FORMAT_TABLE = "table"
+FORMAT_JSONL = "jsonl"
+FORMAT_CSV = "csv"
+
+# One letter per action code, for the compact actions column of batch results
+ACTION_LETTERS = ".CD"
+
+# Attributes of an exported sensor state that configure the dry run
+SETTING_ATTRIBUTES = {
+    'charge_quarters': 'charge_quarters',
+    'discharge_quarters': 'discharge_quarters',
+    'min_profit_required_eur_kwh': 'min_profit_eur_kwh',
+    'price_delta_threshold_percent': 'price_delta_percent',
+    'algorithm_type': 'algorithm_type',
+}
+
+DEFAULT_SETTINGS = {
+    'charge_quarters': 13,
+    'discharge_quarters': 11,
+    'min_profit_eur_kwh': 0.06,
+    'price_delta_percent': 20.0,
+    'algorithm_type': ALGORITHM_HSWAS,
+}
+
 
 def calculate_hybrid_schedule(
     forecast_data,
     charge_quarters=13,
     discharge_quarters=11,
     min_profit_eur_kwh=0.06,
-    price_delta_percent=20.0
+    price_delta_percent=20.0,
+    algorithm_type=ALGORITHM_HSWAS,
 ):
     """
-    Hybrid SWA-Wave-Slot Algorithm (HSWAS) for BESS Arbitrage.
-    
-    1. ALGORITHM A (Wave Finder): Uses Chronological Sliding Window averages to safely 
-       and robustly identify macro-wave boundaries, completely immune to transient spikes.
-    2. ALGORITHM B (Slot Selector): Discards the rigid contiguous window constraint 
-       within the identified wave boundaries, selecting the absolute cheapest quarters 
-       to charge and most expensive quarters to discharge (allowing gaps/non-contiguous slots).
+    Runs the production planner (Hybrid SWA-Wave-Slot by default) on a forecast.
+
+    Slots before the first forecast slot do not exist, so every slot outside an
+    interval is reported as upcoming (interval id 0).
     """
     if not forecast_data:
         return [], 0
 
-    first_dt = None
-    if forecast_data:
-        first_raw = forecast_data[0].get('datetime') or forecast_data[0].get('start_date')
-        if first_raw:
-            first_dt = _parse_datetime(first_raw)
-            
-    now = first_dt if first_dt else datetime.fromisoformat("2026-07-28T18:00:00")
-    prepared_data = []
-    running_min = float('inf')
-    
-    for idx, item in enumerate(forecast_data):
-        raw_dt = item.get('start_date') or item.get('datetime')
-        raw_price = item.get('electricity_price')
-        if raw_price is None and 'price_tax_included' in item:
-            raw_price = item['price_tax_included'].get('amount')
-        
-        if 'price_eur_kwh' in item:
-            price = item['price_eur_kwh']
-        elif raw_price is not None:
-            price = raw_price / 10_000_000.0
-        else:
-            continue
-            
-        if price < running_min:
-            running_min = price
-        
-        dt = _parse_datetime(raw_dt)
-        is_passed = dt < now if dt else False
-
-        prepared_data.append({
-            'datetime': raw_dt,
-            'price_eur_kwh': price,
-            'price_multiplier': round(price / running_min, 2) if running_min > 0 else 1.0,
-            'action': ACTION_STOP,
-            'interval_id': -1 if is_passed else 0,
-            'sort_index': idx
-        })
+    timeline = plan_forecast(
+        forecast_data,
+        algorithm_type,
+        charge_quarters,
+        discharge_quarters,
+        price_delta_percent,
+        min_profit_eur_kwh,
+    )
+    interval_ids = _published_interval_ids(timeline)
+    return timeline.as_dicts(interval_ids), timeline.interval_count(interval_ids)
 
-    n = len(prepared_data)
-    rte_factor = 1.0 - (price_delta_percent / 100.0)
-    
-    current_idx = 0
-    interval_count = 1
-    
-    # Forward sequential scan to find waves (Algorithm A)
-    while current_idx < n - (charge_quarters + discharge_quarters) + 1:
-        best_profit = -float('inf')
-        best_charge_idx = -1
-        best_discharge_idx = -1
-        
-        # Lookahead horizon to find the optimal next wave boundary
-        search_limit = min(n, current_idx + 96)  # limit search window to next 24 hours
-        
-        for i in range(current_idx, search_limit - charge_quarters + 1):
-            charge_slice = range(i, i + charge_quarters)
-            avg_charge = sum(prepared_data[k]['price_eur_kwh'] for k in charge_slice) / charge_quarters
-            
-            for j in range(i + charge_quarters, search_limit - discharge_quarters + 1):
-                discharge_slice = range(j, j + discharge_quarters)
-                avg_discharge = sum(prepared_data[k]['price_eur_kwh'] for k in discharge_slice) / discharge_quarters
-                
-                # Check sliding window profit under RTE
-                profit = avg_discharge * rte_factor - avg_charge
-                
-                if profit > best_profit:
-                    best_profit = profit
-                    best_charge_idx = i
-                    best_discharge_idx = j
-                    
-        # If a profitable wave segment is found, boundary-lock it and run Slot Selector (Algorithm B)
-        if best_profit >= min_profit_eur_kwh and best_charge_idx != -1 and best_discharge_idx != -1:
-            segment_start = best_charge_idx
-            segment_end = best_discharge_idx + discharge_quarters
-            
-            segment = prepared_data[segment_start : segment_end]
-            segment_prices = [h['price_eur_kwh'] for h in segment]
-            
-            # Find local valley (minimum price in this wave segment)
-            local_valley_val = min(segment_prices)
-            
-            # Find local peak (maximum price in this wave segment)
-            local_peak_val = max(segment_prices)
-            
-            # Define pools based on the optimal SWA windows:
-            # - Charge pool: from segment_start up to best_discharge_idx (exclusive)
-            # - Discharge pool: from best_discharge_idx to segment_end
-            charge_pool = prepared_data[segment_start : best_discharge_idx]
-            discharge_pool = prepared_data[best_discharge_idx : segment_end]
-            
-            # Select charge/discharge candidates within the wave boundaries (Algorithm B)
-            charge_cands = [h for h in charge_pool if local_peak_val * rte_factor - h['price_eur_kwh'] >= min_profit_eur_kwh]
-            charge_cands.sort(key=lambda x: x['price_eur_kwh'])
-            charge_slots = charge_cands[:charge_quarters]
-            
-            discharge_cands = [h for h in discharge_pool if h['price_eur_kwh'] * rte_factor - local_valley_val >= min_profit_eur_kwh]
-            discharge_cands.sort(key=lambda x: x['price_eur_kwh'], reverse=True)
-            discharge_slots = discharge_cands[:discharge_quarters]
-            
-            if charge_slots or discharge_slots:
-                # Assign actions and interval IDs
-                for s in segment:
-                    s['interval_id'] = interval_count
-                    
-                for s in charge_slots:
-                    s['action'] = ACTION_CHARGE
-                    
-                for s in discharge_slots:
-                    s['action'] = ACTION_DISCHARGE
-                    
-                interval_count += 1
-                
-            # Advance our sequential timeline past the end of this wave
-            current_idx = segment_end
-        else:
-            # Advance timeline by 1 step if no waves are found
-            current_idx += 1
 
-    # Clean up temporary internal keys
-    for item in prepared_data:
-        item.pop('sort_index', None)
-        
-    return prepared_data, interval_count - 1
+def _published_interval_ids(timeline):
+    """Interval ids as the sensor publishes them when planning at the first forecast slot."""
+    now = next((start for start in timeline.starts if start is not None), None)
+    return timeline.published_interval_ids(now) if now is not None else timeline.interval_ids
 
 
 # Default forecast data fallback
@@ -173,73 +114,156 @@ forecast_data = [
     {"datetime": "2026-07-28T19:45:00+00:00", "price_eur_kwh": 0.372969},
 ]
 
-def main():
-    data = forecast_data
-    charge_quarters = 13
-    discharge_quarters = 11
-    min_profit = 0.06
-    price_delta_percent = 20.0
 
-    if len(sys.argv) > 1:
-        filepath = sys.argv[1]
+def expand_inputs(patterns):
+    """Expands files, directories (recursively) and glob patterns into a sorted list of input files."""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.extend(os.path.join(root, name) for name in names if name.endswith(INPUT_SUFFIXES))
+        elif glob.has_magic(pattern):
+            files.extend(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            files.append(pattern)
+    return sorted(dict.fromkeys(files))
+
+
+def _unwrap(parsed):
+    """Extracts the forecast list and any settings from an exported state, a dict or a plain list."""
+    settings = {}
+    if isinstance(parsed, dict) and isinstance(parsed.get('data'), dict) and 'forecast' in parsed['data']:
+        # Diagnostics download of the integration
+        parsed = parsed['data']
+        settings = {key: value for key, value in parsed.get('parameters', {}).items() if key in DEFAULT_SETTINGS}
+    if isinstance(parsed, dict):
+        if 'attributes' in parsed and isinstance(parsed['attributes'], dict):
+            attrs = parsed['attributes']
+            settings = {key: attrs[name] for name, key in SETTING_ATTRIBUTES.items() if name in attrs}
+            parsed = attrs.get('schedule', attrs.get('forecast'))
+        elif 'schedule' in parsed:
+            parsed = parsed['schedule']
+        elif 'forecast' in parsed:
+            parsed = parsed['forecast']
+        else:
+            parsed = [parsed]
+    if not isinstance(parsed, list):
+        raise ValueError("Expected a list of items.")
+    return parsed, settings
+
+
+def _is_forecast_item(item):
+    return isinstance(item, dict) and ('datetime' in item or 'start_date' in item)
+
+
+def load_forecasts(path):
+    """
+    Loads every forecast in a file as (name, forecast_data, settings).
+
+    JSON is tried before YAML, since parsing YAML is far slower.
+    """
+    if path.endswith(".npz"):
+        import numpy as np
+
+        with np.load(path) as archive:
+            starts = archive['start']
+            prices = archive['price_eur_kwh']
+            if np.issubdtype(starts.dtype, np.datetime64):
+                starts = starts.astype('datetime64[s]').astype('int64')
+            data = [
+                {'datetime': datetime.fromtimestamp(int(start), timezone.utc).isoformat(), 'price_eur_kwh': float(price)}
+                for start, price in zip(starts.tolist(), prices.tolist())
+            ]
+        return [(path, data, {})]
+
+    if path.endswith(".csv"):
+        with open(path, newline='', encoding='utf-8') as f:
+            data = []
+            for row in csv.DictReader(f):
+                item = {key: row[key] for key in ('datetime', 'start_date') if row.get(key)}
+                if row.get('price_eur_kwh'):
+                    item['price_eur_kwh'] = float(row['price_eur_kwh'])
+                elif row.get('electricity_price'):
+                    item['electricity_price'] = int(row['electricity_price'])
+                data.append(item)
+        return [(path, data, {})]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if path.endswith((".jsonl", ".ndjson")):
+        lines = [(number, json.loads(line)) for number, line in enumerate(content.splitlines(), 1) if line.strip()]
+        if lines and all(_is_forecast_item(item) for _, item in lines):
+            # One forecast item per line
+            return [(path, [item for _, item in lines], {})]
+        return [(f"{path}:{number}", *_unwrap(parsed)) for number, parsed in lines]
+
+    try:
+        parsed = json.loads(content)
+    except json.JSONDecodeError:
+        parsed = yaml.load(content, Loader=_YAML_LOADER)
+    if parsed is None:
+        raise ValueError("Failed to parse file as JSON or YAML.")
+    return [(path, *_unwrap(parsed))]
+
+
+def run_file(path, overrides):
+    """Plans every forecast in one file and returns a result record per forecast."""
+    started = time.perf_counter()
+    try:
+        forecasts = load_forecasts(path)
+    except Exception as e:
+        return [{'file': path, 'error': f"{type(e).__name__}: {e}"}]
+    load_ms = (time.perf_counter() - started) * 1000.0 / max(1, len(forecasts))
+
+    results = []
+    for name, data, settings in forecasts:
+        settings = {**DEFAULT_SETTINGS, **settings, **overrides}
+        backend = settings.pop('backend', BACKEND_AUTO)
+        started = time.perf_counter()
         try:
-            with open(filepath, 'r') as f:
-                content = f.read()
-            
-            parsed = None
-            try:
-                parsed = json.loads(content)
-            except json.JSONDecodeError:
-                parsed = yaml.safe_load(content)
-            
-            if parsed is None:
-                raise ValueError("Failed to parse file as JSON or YAML.")
-            
-            if isinstance(parsed, dict):
-                if 'attributes' in parsed and isinstance(parsed['attributes'], dict):
-                    attrs = parsed['attributes']
-                    if 'schedule' in attrs:
-                        parsed = attrs['schedule']
-                    elif 'forecast' in attrs:
-                        parsed = attrs['forecast']
-                    if 'charge_quarters' in attrs:
-                        charge_quarters = attrs['charge_quarters']
-                    if 'discharge_quarters' in attrs:
-                        discharge_quarters = attrs['discharge_quarters']
-                    if 'min_profit_required_eur_kwh' in attrs:
-                        min_profit = attrs['min_profit_required_eur_kwh']
-                    if 'price_delta_threshold_percent' in attrs:
-                        price_delta_percent = attrs['price_delta_threshold_percent']
-                elif 'schedule' in parsed:
-                    parsed = parsed['schedule']
-                elif 'forecast' in parsed:
-                    parsed = parsed['forecast']
-                else:
-                    parsed = [parsed]
-            
-            if not isinstance(parsed, list):
-                raise ValueError("Expected a list of items.")
-            
-            data = parsed
-            print(f"Successfully loaded {len(data)} items from {filepath}")
+            timeline = plan_forecast(data, backend=backend, **settings)
         except Exception as e:
-            print(f"Error loading {filepath}: {e}")
-            print("Falling back to built-in forecast_data.")
-            data = forecast_data
-
-    schedule, intervals = calculate_hybrid_schedule(
-        data, 
-        charge_quarters=charge_quarters, 
-        discharge_quarters=discharge_quarters, 
-        min_profit_eur_kwh=min_profit,
-        price_delta_percent=price_delta_percent
-    )
-    
+            results.append({'file': name, 'error': f"{type(e).__name__}: {e}"})
+            continue
+        plan_ms = (time.perf_counter() - started) * 1000.0
+        results.append({
+            'file': name,
+            'algorithm_type': settings['algorithm_type'],
+            'slots': len(timeline),
+            'intervals': timeline.interval_count(_published_interval_ids(timeline)),
+            'charge_slots': timeline.actions.count(ACTION_CODE_CHARGE),
+            'discharge_slots': timeline.actions.count(ACTION_CODE_DISCHARGE),
+            'actions': ''.join(ACTION_LETTERS[code] for code in timeline.actions),
+            'load_ms': round(load_ms, 3),
+            'plan_ms': round(plan_ms, 3),
+        })
+    return results
+
+
+def run_batch(files, overrides, jobs=1):
+    """Plans all files, spread over `jobs` worker processes, yielding results in input order."""
+    if jobs <= 1 or len(files) <= 1:
+        for path in files:
+            yield from run_file(path, overrides)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(files) // (4 * jobs))
+        for results in executor.map(run_file, files, [overrides] * len(files), chunksize=chunksize):
+            yield from results
+
+
+def print_table(schedule, intervals, settings):
+    """Prints a planned schedule as a colored table."""
     print("\n" + "=" * 80)
-    print(" BESS HYBRID SWA-WAVE-SLOT (HSWAS) - TEST RESULTS")
+    print(f" BESS {settings['algorithm_type'].upper()} - TEST RESULTS")
     print("=" * 80)
     print(f"Total Intervals Segmented: {intervals}")
-    print(f"Configuration: charge_quarters={charge_quarters}, discharge_quarters={discharge_quarters}, min_profit={min_profit}, price_delta_percent={price_delta_percent}")
+    print(
+        f"Configuration: algorithm_type={settings['algorithm_type']}, charge_quarters={settings['charge_quarters']}, "
+        f"discharge_quarters={settings['discharge_quarters']}, min_profit={settings['min_profit_eur_kwh']}, "
+        f"price_delta_percent={settings['price_delta_percent']}"
+    )
     print("-" * 80)
     print(f"{'Datetime':<30} | {'Price (€/kWh)':<14} | {'Action':<10} | {'Interval ID':<11}")
     print("-" * 80)
@@ -258,5 +282,79 @@ def main():
         )
     print("=" * 80 + "\n")
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="*", help="files, directories or glob patterns")
+    parser.add_argument("--algorithm", choices=sorted(STRATEGIES), help="strategy to run (default: from the export, else hswas)")
+    parser.add_argument("--backend", choices=[BACKEND_AUTO, BACKEND_PYTHON, BACKEND_NUMPY])
+    parser.add_argument("--charge-quarters", type=int)
+    parser.add_argument("--discharge-quarters", type=int)
+    parser.add_argument("--min-profit", type=float, help="minimum profit in €/kWh")
+    parser.add_argument("--price-delta-percent", type=float)
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="worker processes for batches")
+    parser.add_argument("--format", choices=[FORMAT_TABLE, FORMAT_JSONL, FORMAT_CSV], help="default: table for one forecast, jsonl otherwise")
+    parser.add_argument("--output", "-o", help="write batch results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        key: value
+        for key, value in (
+            ('algorithm_type', args.algorithm),
+            ('backend', args.backend),
+            ('charge_quarters', args.charge_quarters),
+            ('discharge_quarters', args.discharge_quarters),
+            ('min_profit_eur_kwh', args.min_profit),
+            ('price_delta_percent', args.price_delta_percent),
+        )
+        if value is not None
+    }
+    files = expand_inputs(args.inputs)
+    output_format = args.format or (FORMAT_TABLE if len(files) <= 1 else FORMAT_JSONL)
+
+    if output_format == FORMAT_TABLE:
+        if len(files) > 1:
+            parser.error("the table format shows a single forecast, use --format jsonl or csv for batches")
+        data, settings = forecast_data, {}
+        if files:
+            try:
+                (_, data, settings), *_ = load_forecasts(files[0])
+                print(f"Successfully loaded {len(data)} items from {files[0]}")
+            except Exception as e:
+                print(f"Error loading {files[0]}: {e}")
+                print("Falling back to built-in forecast_data.")
+                data, settings = forecast_data, {}
+        settings = {**DEFAULT_SETTINGS, **settings, **overrides}
+        settings.pop('backend', None)
+        schedule, intervals = calculate_hybrid_schedule(data, **settings)
+        print_table(schedule, intervals, settings)
+        return 0
+
+    started = time.perf_counter()
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    failed = count = 0
+    try:
+        writer = None
+        for result in run_batch(files, overrides, args.jobs):
+            count += 1
+            failed += 'error' in result
+            if output_format == FORMAT_JSONL:
+                out.write(json.dumps(result) + "\n")
+                continue
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=[
+                    'file', 'algorithm_type', 'slots', 'intervals', 'charge_slots', 'discharge_slots',
+                    'actions', 'load_ms', 'plan_ms', 'error',
+                ])
+                writer.writeheader()
+            writer.writerow(result)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Planned {count - failed} forecast(s) from {len(files)} file(s) in {time.perf_counter() - started:.2f} s"
+          + (f", {failed} failed" if failed else ""), file=sys.stderr)
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
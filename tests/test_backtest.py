@@ -0,0 +1,62 @@
+from array import array
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from custom_components.zonneplan_peakdetect.const import ALGORITHM_PAIRING, ALGORITHM_SOC_DP
+from tools.backtest import BacktestConfig, build_tasks, run_backtest, simulate_day
+from tools.price_generators import generate_prices
+
+TZ = "Europe/Amsterdam"
+
+
+def _history(days: int, resolution_minutes: int = 60) -> tuple[list[datetime], array]:
+    start = datetime(2025, 3, 1, tzinfo=ZoneInfo(TZ))
+    prices = array('d', generate_prices("duck", days, resolution_minutes))
+    return [start + timedelta(minutes=resolution_minutes * slot) for slot in range(len(prices))], prices
+
+
+def test_build_tasks_extends_the_window_once_prices_are_published():
+    """Re-plans before the publish hour see today, later ones also see tomorrow."""
+    starts, prices = _history(3)
+    tasks = build_tasks(starts, prices, BacktestConfig(ALGORITHM_SOC_DP, replan_minutes=60, publish_hour=13, timezone=TZ))
+
+    assert [task.day.day for task in tasks] == [1, 2, 3]
+    first = tasks[0]
+    assert len(first.replans) == 24
+    assert first.replans[12] == (12, 0, 24)
+    assert first.replans[13] == (13, 0, 48)
+    # No tomorrow in the history for the last day
+    assert tasks[-1].replans[-1] == (23, 0, 24)
+
+
+def test_simulate_day_buys_low_and_sells_high():
+    """A single cycle on a day with one cheap and one expensive block earns the RTE-adjusted spread."""
+    tz = ZoneInfo(TZ)
+    start = datetime(2025, 3, 1, tzinfo=tz)
+    prices = array('d', [0.20] * 24)
+    prices[2:4] = array('d', [0.10, 0.10])
+    prices[18:20] = array('d', [0.40, 0.40])
+    starts = [start + timedelta(hours=hour) for hour in range(24)]
+    config = BacktestConfig(ALGORITHM_SOC_DP, charge_quarters=8, discharge_quarters=8, rte_percent=20, min_profit_c_kwh=6, timezone=TZ)
+
+    (task,) = build_tasks(starts, prices, config)
+    result = simulate_day(task, config)
+
+    assert result.charged_kwh == 1.0
+    assert result.discharged_kwh == 1.0
+    assert result.stranded_kwh == 0.0
+    assert abs(result.profit_eur - (0.40 * 0.8 - 0.10)) < 1e-9
+    assert len(result.latencies_ms) == 24
+
+
+def test_run_backtest_is_the_same_in_parallel():
+    """Days are independent, so spreading them over worker processes does not change the result."""
+    starts, prices = _history(4, 15)
+    config = BacktestConfig(ALGORITHM_PAIRING, timezone=TZ)
+
+    sequential = run_backtest(starts, prices, config, workers=1)
+    parallel = run_backtest(starts, prices, config, workers=2)
+
+    assert sequential["days"] == parallel["days"] == 4
+    for key in ("profit_eur", "charged_kwh", "discharged_kwh", "cycles", "replans"):
+        assert sequential[key] == parallel[key]
@@ -0,0 +1,33 @@
+from tools.benchmark import find_regressions
+from tools.price_generators import SHAPES, build_timeline, generate_prices
+
+
+def _document(wall_ms: float, peak_kib: float) -> dict:
+    return {"results": {"whss": {"duck/1d/15m": {"slots": 96, "wall_ms": wall_ms, "peak_kib": peak_kib}}}}
+
+
+def test_price_generators_are_deterministic():
+    """Every shape yields one price per slot and the same series for the same seed."""
+    for shape in SHAPES:
+        prices = generate_prices(shape, 2, 15)
+        assert len(prices) == 2 * 96
+        assert prices == generate_prices(shape, 2, 15)
+
+    timeline = build_timeline(generate_prices("duck", 1, 5), 5)
+    assert len(timeline) == 288
+
+
+def test_find_regressions_respects_tolerance():
+    """Only slowdowns beyond both the percentage and the absolute noise floor are reported."""
+    baseline = _document(wall_ms=10.0, peak_kib=100.0)
+
+    assert find_regressions(baseline, _document(12.0, 100.0), tolerance_percent=25.0) == []
+    assert find_regressions(baseline, _document(14.0, 100.0), tolerance_percent=25.0) != []
+    assert find_regressions(baseline, _document(14.0, 100.0), tolerance_percent=25.0, min_delta_ms=5.0) == []
+    assert find_regressions(baseline, _document(10.0, 200.0), tolerance_percent=25.0) != []
+
+
+def test_find_regressions_skips_strategies_without_baseline():
+    """A newly registered strategy cannot fail the gate before it has a baseline."""
+    current = {"results": {"pairing": {"duck/1d/15m": {"slots": 96, "wall_ms": 99.0, "peak_kib": 999.0}}}}
+    assert find_regressions(_document(1.0, 1.0), current) == []
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+from custom_components.zonneplan_peakdetect.const import ACTION_CHARGE, ACTION_CODE_CHARGE, ALGORITHM_HSWAS, ALGORITHM_WHSS, LOGGER
+from custom_components.zonneplan_peakdetect.core import forecast
+from custom_components.zonneplan_peakdetect.core.forecast import forecast_fingerprint, parse_datetime, prepare_timeline
+from custom_components.zonneplan_peakdetect.core.planner import plan_forecast, plan_timeline
+from custom_components.zonneplan_peakdetect.core.stats import PHASE_ATTRIBUTES, PHASE_INGEST, PHASE_STRATEGY, PlanningStats
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline
+
+
+def test_core_does_not_import_home_assistant():
+    """The planner and everything it uses can be imported without Home Assistant."""
+    code = (
+        "import sys\n"
+        "import custom_components.zonneplan_peakdetect.core.planner\n"
+        "assert not any(name.split('.')[0] == 'homeassistant' for name in sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[1])
+
+
+def test_prepare_timeline_accepts_every_schema():
+    """Old and new forecast schemas yield the same prices; items without price or datetime are skipped."""
+    forecast = [
+        {"start_date": "2026-07-25T14:00:00+02:00", "price_tax_included": {"amount": 2800000}},
+        {"datetime": "2026-07-25T14:15:00+02:00", "electricity_price": 1800000},
+        {"datetime": "2026-07-25T14:30:00+02:00", "price_eur_kwh": 0.2},
+        {"datetime": "2026-07-25T14:45:00+02:00"},
+        {"price_eur_kwh": 0.3},
+    ]
+    timeline = prepare_timeline(forecast)
+
+    assert list(timeline.prices) == [0.28, 0.18, 0.2]
+    assert timeline.interval_minutes == 15
+    assert timeline.starts[1] == parse_datetime("2026-07-25T14:15:00+02:00")
+    assert parse_datetime("not a date") is None
+
+
+def test_parse_datetime_fallback():
+    """Start times that are not ISO 8601 are only parsed through the given fallback parser."""
+    iso = parse_datetime("2026-07-25T14:00:00+02:00")
+    assert parse_datetime("2026-7-25T14:00:00+02:00") is None
+    assert parse_datetime("2026-7-25T14:00:00+02:00", lambda val: iso) == iso
+
+    items = [
+        {"datetime": "2026-7-25T14:00:00+02:00", "price_eur_kwh": 0.2},
+        {"datetime": "2026-7-25T14:15:00+02:00", "price_eur_kwh": 0.3},
+    ]
+    fallback = {item["datetime"]: iso + timedelta(minutes=15 * idx) for idx, item in enumerate(items)}.get
+    assert prepare_timeline(items).starts == [None, None]
+    assert prepare_timeline(items, fallback).starts == [iso, iso + timedelta(minutes=15)]
+
+
+
+def test_uniform_forecast_takes_bulk_decoder(july29_forecast):
+    """A single-schema forecast decodes in bulk to the same timeline as item by item decoding."""
+    nested = [
+        {"start_date": item["datetime"], "price_tax_included": {"amount": round(item["price_eur_kwh"] * 10_000_000)}}
+        for item in july29_forecast
+    ]
+    for data in (july29_forecast, nested):
+        decoded = forecast._decode_uniform(data)
+        assert decoded is not None
+        assert decoded[0] == forecast._decode_items(data)[0]
+        assert list(decoded[1]) == list(forecast._decode_items(data)[1])
+
+    # Any deviating item falls back to the per-item decoder with its schema precedence
+    mixed = nested[:3] + [{"start_date": nested[3]["start_date"], "price_tax_included": {"amount": None}, "electricity_price": 1}]
+    assert forecast._decode_uniform(mixed) is None
+    assert prepare_timeline(mixed).prices[3] == 1e-7
+
+
+def test_malformed_forecast_items_are_summarized(caplog, monkeypatch):
+    """Skipped items are reported in one warning per forecast, repeats within the interval only at debug level."""
+    monkeypatch.setattr(forecast, "_malformed_warned_at", None)
+    data = [
+        {"datetime": "2026-07-25T14:00:00+02:00", "price_eur_kwh": 0.2},
+        {"datetime": "2026-07-25T14:15:00+02:00"},
+        {"price_eur_kwh": 0.3},
+        {"datetime": "2026-07-25T14:30:00+02:00"},
+    ]
+    with caplog.at_level(logging.DEBUG, logger=LOGGER.name):
+        prepare_timeline(data)
+        prepare_timeline(data)
+
+    records = [record for record in caplog.records if "forecast items" in record.getMessage()]
+    assert [record.levelno for record in records] == [logging.WARNING, logging.DEBUG]
+    assert "Skipped 3 of 4 forecast items (1 missing datetime, 2 missing price), first at index 1" in records[0].getMessage()
+
+def test_plan_forecast_matches_fixture(july29_forecast):
+    """The planner is deterministic and its fingerprint ignores unrelated keys."""
+    first = plan_forecast(july29_forecast, ALGORITHM_HSWAS, 13, 11, 20, 0.06)
+    second = plan_forecast(july29_forecast, ALGORITHM_HSWAS, 13, 11, 20, 0.06)
+    assert first.as_dicts() == second.as_dicts()
+    assert first.interval_count() > 0
+
+    decorated = [{**item, "note": "ignored"} for item in july29_forecast]
+    assert forecast_fingerprint(decorated) == forecast_fingerprint(july29_forecast)
+    assert plan_forecast([], ALGORITHM_WHSS, 8, 8, 20, 0.06).interval_count() == 0
+
+
+def test_planning_stats_time_every_phase(july29_forecast):
+    """Planning with stats records the ingest and strategy phases and the forecast size."""
+    stats = PlanningStats(window=10)
+    assert stats.last_ms(PHASE_STRATEGY) is None
+
+    for _ in range(3):
+        plan_forecast(july29_forecast, ALGORITHM_WHSS, 13, 11, 20, 0.06, stats=stats)
+
+    assert stats.forecast_slots == len(july29_forecast)
+    assert stats.recomputes_per_hour() == 3
+    assert stats.last_ms(PHASE_INGEST) >= 0.0
+    assert stats.p95_ms(PHASE_STRATEGY) >= 0.0
+
+    for seconds in range(1, 21):
+        stats.record(PHASE_ATTRIBUTES, seconds / 1000.0)
+    # Only the last 10 durations (11..20 ms) are kept; the nearest-rank p95 of those is 20 ms
+    assert stats.last_ms(PHASE_ATTRIBUTES) == 20.0
+    assert stats.p95_ms(PHASE_ATTRIBUTES) == 20.0
+
+
+def test_interval_bounds(july29_forecast):
+    """Interval bounds cover exactly the slots carrying each interval id."""
+    timeline = plan_forecast(july29_forecast, ALGORITHM_WHSS, 13, 11, 20, 0.06)
+    bounds = timeline.interval_bounds()
+
+    assert len(bounds) == timeline.interval_count()
+    for start, end, interval_id in bounds:
+        assert set(timeline.interval_ids[start:end]) == {interval_id}
+
+
+def test_shared_prepared_timeline(july29_forecast):
+    """Several strategies can plan one prepared timeline; it stays unplanned and results match plan_forecast."""
+    prepared = prepare_timeline(july29_forecast)
+    for algorithm in (ALGORITHM_WHSS, ALGORITHM_HSWAS):
+        planned = plan_timeline(prepared.unplanned(), algorithm, 13, 11, 20, 0.06)
+        expected = plan_forecast(july29_forecast, algorithm, 13, 11, 20, 0.06)
+        assert planned.as_dicts() == expected.as_dicts()
+        assert planned.prices is prepared.prices
+
+    assert set(prepared.actions) == {0}
+    assert set(prepared.interval_ids) == {-1}
+    assert not prepared.waves
+
+
+def test_timeline_storage_round_trip(july29_forecast):
+    """A planned timeline survives JSON storage with its actions, intervals and waves."""
+    timeline = plan_forecast(july29_forecast, ALGORITHM_HSWAS, 13, 11, 20, 0.06)
+    restored = SlotTimeline.from_storage(json.loads(json.dumps(timeline.as_storage())))
+
+    assert restored.as_dicts() == timeline.as_dicts()
+    assert restored.as_spans() == timeline.as_spans()
+    assert restored.waves == timeline.waves
+    assert list(restored.durations) == list(timeline.durations)
+
+
+def test_forecast_fingerprint_is_stable_across_processes(july29_forecast):
+    """The fingerprint does not depend on string hash randomization, so stored plans match after a restart."""
+    code = (
+        "import json, sys\n"
+        "from custom_components.zonneplan_peakdetect.core.forecast import forecast_fingerprint\n"
+        "print(forecast_fingerprint(json.load(sys.stdin)))\n"
+    )
+    for seed in ("1", "2"):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            input=json.dumps(july29_forecast, default=str),
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parents[1],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+        )
+        assert int(result.stdout) == forecast_fingerprint(json.loads(json.dumps(july29_forecast, default=str)))
+
+
+def test_timeline_window_queries(july29_forecast):
+    """Windowed and filtered queries return the matching slots and spans of the full schedule."""
+    timeline = plan_forecast(july29_forecast, ALGORITHM_WHSS, 13, 11, 20, 0.06)
+    index = timeline.index()
+    everything = index.positions_between()
+    assert timeline.slot_dicts(everything) == timeline.as_dicts()
+    assert timeline.spans_of(everything) == timeline.as_spans()
+
+    # A window starting mid-slot includes that slot and stops before the slot starting at its end
+    start, end = index.starts[10] + 60, index.starts[20]
+    assert list(index.positions_between(start, end)) == list(range(10, 20))
+    assert list(index.positions_between(end, start)) == []
+
+    charging = timeline.find_slots(everything, {ACTION_CODE_CHARGE})
+    assert charging and all(item["action"] == ACTION_CHARGE for item in timeline.slot_dicts(charging))
+    interval_id = timeline.interval_ids[charging[0]]
+    first_interval = timeline.find_slots(everything, interval_id=interval_id)
+    assert timeline.spans_of(first_interval) == [
+        span for span in timeline.as_spans() if span["interval_id"] == interval_id
+    ]
@@ -0,0 +1,69 @@
+import base64
+import marshal
+
+from homeassistant.const import Platform
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from custom_components.zonneplan_peakdetect.const import (
+    DOMAIN,
+    ALGORITHM_WHSS,
+    ATTR_COUNT,
+    CONF_ALGORITHM,
+    CONF_FORECAST_ENTITY,
+    CONF_MIN_PROFIT,
+    CONF_RTE_PERCENT,
+    SERVICE_PROFILE_REPLANS,
+)
+from custom_components.zonneplan_peakdetect.diagnostics import async_get_config_entry_diagnostics
+
+async def test_diagnostics_traces_and_profile(hass, freezer, july29_forecast):
+    """
+    Test Diagnostics: Verifies the download holds the forecast, the planning traces and a profile.
+
+    1. Every planning run is traced with its fingerprint, parameters, timings and waves.
+    2. The profile service captures the requested number of re-plans.
+    3. The captured pstats data can be decoded again.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            CONF_ALGORITHM: ALGORITHM_WHSS,
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+    hass.states.async_set("sensor.zonneplan_forecast", "0.25", {"forecast": july29_forecast})
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = er.async_get(hass).async_get_entity_id(Platform.SENSOR, DOMAIN, "test_optimizer_entry_Action")
+    await hass.services.async_call(DOMAIN, SERVICE_PROFILE_REPLANS, {"entity_id": entity_id, ATTR_COUNT: 1}, blocking=True)
+
+    # A changed forecast runs the strategy again, under the profiler
+    changed_forecast = [dict(item) for item in july29_forecast]
+    changed_forecast[-1]["price_eur_kwh"] += 0.01
+    optimizer = config_entry.runtime_data.optimizer
+    hass.states.async_set("sensor.zonneplan_forecast", "0.26", {"forecast": changed_forecast})
+    await optimizer.async_update()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+    assert diagnostics["forecast"] == changed_forecast
+    assert len(diagnostics["traces"]) == 2
+    trace = diagnostics["traces"][-1]
+    assert trace["cache_hit"] is False
+    assert trace["parameters"]["algorithm_type"] == ALGORITHM_WHSS
+    assert trace["timings_ms"]["strategy"] >= 0.0
+    assert len(trace["waves"]) == 2
+    assert all(wave["first_slot"] <= wave["last_slot"] for wave in trace["waves"])
+
+    profile = diagnostics["profile"]
+    assert profile["replans"] == 1
+    assert "plan_timeline" in profile["top_cumulative"]
+    assert marshal.loads(base64.b64decode(profile["pstats_marshal_base64"]))
+    assert diagnostics["profile_pending"] == 0
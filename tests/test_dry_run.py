@@ -0,0 +1,45 @@
+import json
+
+from custom_components.zonneplan_peakdetect.const import ALGORITHM_HSWAS, ALGORITHM_PAIRING
+from dry_run_swa import calculate_hybrid_schedule, expand_inputs, load_forecasts, run_batch
+
+
+def test_batch_formats_agree(tmp_path, july29_forecast):
+    """The same forecast planned from JSON, JSON Lines and CSV gives identical actions and table-mode interval counts."""
+    (tmp_path / "state.json").write_text(json.dumps({"attributes": {"forecast": july29_forecast}}))
+    (tmp_path / "items.jsonl").write_text("".join(json.dumps(item) + "\n" for item in july29_forecast))
+    (tmp_path / "prices.csv").write_text(
+        "datetime,price_eur_kwh\n" + "".join(f"{item['datetime']},{item['price_eur_kwh']}\n" for item in july29_forecast)
+    )
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    files = expand_inputs([str(tmp_path)])
+    assert [path.rsplit("/", 1)[-1] for path in files] == ["items.jsonl", "prices.csv", "state.json"]
+
+    results = list(run_batch(files, {"algorithm_type": ALGORITHM_HSWAS}, jobs=2))
+    assert len(results) == 3
+    assert len({result["actions"] for result in results}) == 1
+    assert all(result["slots"] == len(july29_forecast) and result["intervals"] > 0 for result in results)
+    _, intervals = calculate_hybrid_schedule(july29_forecast, algorithm_type=ALGORITHM_HSWAS)
+    assert {result["intervals"] for result in results} == {intervals}
+
+    # Without any interval, every slot is upcoming (published interval 0) in both modes
+    flat = [{**item, "price_eur_kwh": 0.25} for item in july29_forecast]
+    (flat_path := tmp_path / "flat.json").write_text(json.dumps(flat))
+    assert [result["intervals"] for result in run_batch([str(flat_path)], {})] == [calculate_hybrid_schedule(flat)[1]]
+
+
+def test_jsonl_of_exported_states(tmp_path, july29_forecast):
+    """Every line of exported states is its own forecast, with the settings of that export."""
+    lines = [{"attributes": {"forecast": july29_forecast[offset:], "algorithm_type": ALGORITHM_PAIRING}} for offset in (0, 8)]
+    path = tmp_path / "states.jsonl"
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    forecasts = load_forecasts(str(path))
+    assert [name for name, _, _ in forecasts] == [f"{path}:1", f"{path}:2"]
+    assert forecasts[1][2] == {"algorithm_type": ALGORITHM_PAIRING}
+
+    (bad := tmp_path / "bad.json").write_text("{")
+    results = list(run_batch([str(path), str(bad)], {}))
+    assert [result.get("algorithm_type") for result in results] == [ALGORITHM_PAIRING, ALGORITHM_PAIRING, None]
+    assert "error" in results[2]
@@ -1,13 +1,26 @@
 import pytest
-from homeassistant.const import Platform
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from datetime import timedelta
+from unittest.mock import patch
+from homeassistant.const import EntityCategory, Platform
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
 from custom_components.zonneplan_peakdetect.const import (
     DOMAIN,
+    ACTION_CHARGE,
     ACTION_STOP,
+    FORECAST_DEBOUNCE_SECONDS,
+    SERVICE_GET_SCHEDULE,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY_SECONDS,
     CONF_MIN_PROFIT,
     CONF_RTE_PERCENT,
     CONF_FORECAST_ENTITY,
+    CONF_ALGORITHM,
+    ALGORITHM_WHSS,
+    ALGORITHM_PAIRING,
 )
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline
 
 async def test_sensor_empty_forecast(hass):
     """Test sensor behavior with an empty forecast dataset."""
@@ -46,3 +59,630 @@ async def test_sensor_empty_forecast(hass):
     assert state is not None
     assert state.state == ACTION_STOP
     assert state.attributes.get("intervals") == 0
+
+async def test_sensor_reuses_plan_for_unchanged_forecast(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies an unchanged forecast is served from the plan cache.
+    
+    A state change of the tariff sensor that keeps the forecast attribute identical
+    must not run the strategy again, while a changed forecast must.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+
+    with patch(
+        "custom_components.zonneplan_peakdetect.core.strategies.wave_heuristic.WhssStrategy.calculate_schedule",
+        autospec=True,
+        side_effect=lambda self, timeline, *args, **kwargs: timeline,
+    ) as calculate_schedule:
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        assert calculate_schedule.call_count == 1
+
+        # Quarterly state update with an identical forecast hits the cache
+        hass.states.async_set(
+            "sensor.zonneplan_forecast",
+            "0.26",
+            {"forecast": [dict(item) for item in july29_forecast]}
+        )
+        freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert calculate_schedule.call_count == 1
+
+        # A changed price invalidates the fingerprint
+        changed_forecast = [dict(item) for item in july29_forecast]
+        changed_forecast[-1]["price_eur_kwh"] += 0.01
+        hass.states.async_set(
+            "sensor.zonneplan_forecast",
+            "0.27",
+            {"forecast": changed_forecast}
+        )
+        freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert calculate_schedule.call_count == 2
+
+async def test_sensor_coalesces_forecast_bursts(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies a burst of forecast updates is planned once, with the latest forecast.
+    
+    Updates arriving within the debounce window must not run the strategy until the
+    forecast settles, and the published schedule must reflect the last update.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    with patch(
+        "custom_components.zonneplan_peakdetect.core.strategies.wave_heuristic.WhssStrategy.calculate_schedule",
+        autospec=True,
+        side_effect=lambda self, timeline, *args, **kwargs: timeline,
+    ) as calculate_schedule:
+        for step in range(3):
+            burst_forecast = [dict(item) for item in july29_forecast[step:]]
+            hass.states.async_set(
+                "sensor.zonneplan_forecast",
+                f"0.2{step}",
+                {"forecast": burst_forecast}
+            )
+            await hass.async_block_till_done()
+        assert calculate_schedule.call_count == 0
+
+        freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert calculate_schedule.call_count == 1
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    state = hass.states.get(entity_id)
+    assert len(state.attributes.get("schedule")) == len(july29_forecast) - 2
+
+async def test_sensor_switches_action_at_slot_boundary(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies the action changes exactly at the next slot boundary without polling.
+    
+    The sensor schedules a timer at the first slot whose action differs from the current one,
+    so moving time to that slot start must publish the new action.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    state = hass.states.get(entity_id)
+    schedule = state.attributes.get("schedule")
+    next_slot = next(item for item in schedule if item["action"] != state.state)
+
+    # Just before the boundary nothing changes
+    freezer.move_to(dt_util.parse_datetime(next_slot["datetime"]) - timedelta(seconds=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == state.state
+
+    freezer.move_to(dt_util.parse_datetime(next_slot["datetime"]))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == next_slot["action"]
+
+async def test_sensor_reuses_schedule_attribute_until_plan_changes(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies the full 'schedule' attribute is only rebuilt when it can change.
+    
+    1. A forecast update served from the plan cache keeps the materialized schedule.
+    2. A slot boundary rebuilds it only when a passed slot outside any interval is marked -1.
+    3. A new plan rebuilds it, still covering every slot of the forecast.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+
+    with patch.object(
+        SlotTimeline, "as_dicts", autospec=True, side_effect=SlotTimeline.as_dicts
+    ) as as_dicts:
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        entity_id = next(
+            (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+            None
+        )
+        state = hass.states.get(entity_id)
+        schedule = state.attributes.get("schedule")
+        assert len(schedule) == len(july29_forecast)
+        builds = as_dicts.call_count
+
+        # Identical forecast: same plan and interval ids, no rebuild
+        hass.states.async_set(
+            "sensor.zonneplan_forecast",
+            "0.26",
+            {"forecast": [dict(item) for item in july29_forecast]}
+        )
+        freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert as_dicts.call_count == builds
+        assert hass.states.get(entity_id).attributes["schedule"] == schedule
+
+        # Slot boundary: rebuilt only if a passed slot flips from 0 to -1
+        next_slot = next(item for item in schedule if item["action"] != state.state)
+        boundary = dt_util.parse_datetime(next_slot["datetime"])
+        passed_free = [
+            idx for idx, item in enumerate(schedule)
+            if item["interval_id"] == 0 and dt_util.parse_datetime(item["datetime"]) < boundary
+        ]
+        freezer.move_to(boundary)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        state = hass.states.get(entity_id)
+        assert state.state == next_slot["action"]
+        assert as_dicts.call_count == builds + (1 if passed_free else 0)
+        schedule = state.attributes["schedule"]
+        assert len(schedule) == len(july29_forecast)
+        assert all(schedule[idx]["interval_id"] == -1 for idx in passed_free)
+        builds = as_dicts.call_count
+
+        # A changed price yields a new plan and a rebuilt schedule
+        changed_forecast = [dict(item) for item in july29_forecast]
+        changed_forecast[-1]["price_eur_kwh"] += 0.01
+        hass.states.async_set(
+            "sensor.zonneplan_forecast",
+            "0.27",
+            {"forecast": changed_forecast}
+        )
+        freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert as_dicts.call_count == builds + 1
+        assert len(hass.states.get(entity_id).attributes["schedule"]) == len(july29_forecast)
+
+async def test_sensor_mixed_resolution_feed(hass, freezer):
+    """
+    Test Live Sensor: Verifies hourly slots keep their action for the full hour in a mostly quarterly feed.
+    
+    Slot durations come from consecutive start times, so an hourly slot followed by
+    quarterly slots must still be the active slot half an hour after it started.
+    """
+    freezer.move_to("2026-08-12T05:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_quarters": 4,
+            "discharge_quarters": 4,
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    start = dt_util.parse_datetime("2026-08-12T06:00:00+00:00")
+    hourly_prices = [0.05, 0.05, 0.50, 0.50, 0.05, 0.50]
+    forecast = [
+        {"datetime": (start + timedelta(hours=hour)).isoformat(), "price_eur_kwh": price}
+        for hour, price in enumerate(hourly_prices)
+    ]
+    quarters_start = start + timedelta(hours=len(hourly_prices))
+    forecast += [
+        {"datetime": (quarters_start + timedelta(minutes=15 * quarter)).isoformat(), "price_eur_kwh": 0.25}
+        for quarter in range(24)
+    ]
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    schedule = hass.states.get(entity_id).attributes.get("schedule")
+    assert len(schedule) == len(forecast)
+    assert any(item["action"] != ACTION_STOP for item in schedule[:len(hourly_prices)])
+
+    for item in schedule[:len(hourly_prices)]:
+        freezer.move_to(dt_util.parse_datetime(item["datetime"]) + timedelta(minutes=30))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert hass.states.get(entity_id).state == item["action"]
+
+async def test_sensor_accepts_non_iso_start_times(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies start times outside ISO 8601 still go through Home Assistant's parser.
+
+    Single-digit months are rejected by datetime.fromisoformat but accepted by dt_util, so
+    such a feed must plan like its ISO 8601 form.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    forecast = [{**item, "datetime": item["datetime"].replace("-07-", "-7-")} for item in july29_forecast]
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    state = hass.states.get(entity_id)
+    schedule = state.attributes.get("schedule")
+    assert len(schedule) == len(forecast)
+    assert any(item["action"] != ACTION_STOP for item in schedule)
+    assert state.state == schedule[0]["action"]
+
+async def test_sensor_compact_schedule_attributes(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies the run-length encoded schedule matches the per-slot schedule.
+    
+    Every slot must fall in exactly one span carrying its action and interval id, the packed
+    prices must follow the slots, and the verbose schedule must be excluded from the recorder.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    attributes = hass.states.get(entity_id).attributes
+    schedule = attributes.get("schedule")
+    spans = attributes.get("schedule_spans")
+
+    assert len(spans) < len(schedule)
+    assert attributes.get("schedule_prices") == [round(item["price_eur_kwh"], 5) for item in schedule]
+
+    slots = iter(schedule)
+    for span in spans:
+        span_end = dt_util.parse_datetime(span["end"])
+        item = next(slots)
+        assert dt_util.parse_datetime(item["datetime"]) == dt_util.parse_datetime(span["start"])
+        while True:
+            assert (item["action"], item["interval_id"]) == (span["action"], span["interval_id"])
+            if dt_util.parse_datetime(item["datetime"]) + timedelta(minutes=15) == span_end:
+                break
+            item = next(slots)
+    assert next(slots, None) is None
+
+    entity = hass.data["entity_components"]["sensor"].get_entity(entity_id)
+    assert "schedule" in entity._unrecorded_attributes
+    assert "schedule_spans" not in entity._unrecorded_attributes
+
+async def test_sensor_diagnostic_entities(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies the planning diagnostics are registered on the optimizer device.
+
+    The diagnostic sensors are disabled by default; once enabled they report the phase
+    timings, cache hits and forecast slot count of the optimizer.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    # Enable the diagnostics up front, as a user would from the device page
+    for key in ("strategy_duration", "forecast_slots", "plan_cache_hits"):
+        registry.async_get_or_create(
+            Platform.SENSOR, DOMAIN, f"test_optimizer_entry_{key}", disabled_by=None
+        )
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entry = registry.async_get(registry.async_get_entity_id(Platform.SENSOR, DOMAIN, "test_optimizer_entry_ingest_duration_p95"))
+    assert entry.entity_category == EntityCategory.DIAGNOSTIC
+    assert entry.disabled_by is not None
+
+    def value(key):
+        entity_id = registry.async_get_entity_id(Platform.SENSOR, DOMAIN, f"test_optimizer_entry_{key}")
+        return hass.states.get(entity_id).state
+
+    assert int(value("forecast_slots")) == len(july29_forecast)
+    assert float(value("strategy_duration")) >= 0.0
+    assert int(value("plan_cache_hits")) == 0
+
+    # An identical forecast is served from the cache
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.26",
+        {"forecast": [dict(item) for item in july29_forecast]}
+    )
+    freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert int(value("plan_cache_hits")) == 1
+
+async def test_sensor_entries_share_forecast_coordinator(hass, freezer, july29_forecast):
+    """
+    Test Shared Forecast: Verifies entries on the same forecast entity prepare it once.
+
+    1. Two entries with different algorithms share one coordinator and one prepared timeline.
+    2. A forecast change is prepared once and re-planned by both entries.
+    3. The coordinator is removed with the last entry using it.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    hass.states.async_set("sensor.zonneplan_forecast", "0.25", {"forecast": july29_forecast})
+    entries = []
+    for algorithm in (ALGORITHM_WHSS, ALGORITHM_PAIRING):
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+                CONF_ALGORITHM: algorithm,
+                "charge_hours": 3.25,      # 13 quarters
+                "discharge_hours": 2.75,   # 11 quarters
+                CONF_RTE_PERCENT: 20.0,
+                CONF_MIN_PROFIT: 6.0,      # 6 cents
+            },
+            entry_id=f"test_optimizer_{algorithm}",
+        )
+        config_entry.add_to_hass(hass)
+        entries.append(config_entry)
+
+    from custom_components.zonneplan_peakdetect import coordinator
+
+    with patch.object(coordinator, "prepare_timeline", wraps=coordinator.prepare_timeline) as prepare_timeline:
+        for config_entry in entries:
+            await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        assert prepare_timeline.call_count == 1
+        assert list(hass.data[DOMAIN]) == ["sensor.zonneplan_forecast"]
+
+        changed_forecast = [dict(item) for item in july29_forecast]
+        changed_forecast[-1]["price_eur_kwh"] += 0.01
+        hass.states.async_set("sensor.zonneplan_forecast", "0.26", {"forecast": changed_forecast})
+        freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert prepare_timeline.call_count == 2
+
+    registry = er.async_get(hass)
+    for config_entry in entries:
+        entity_id = registry.async_get_entity_id(Platform.SENSOR, DOMAIN, f"{config_entry.entry_id}_Action")
+        state = hass.states.get(entity_id)
+        assert state.attributes["schedule"][-1]["price_eur_kwh"] == changed_forecast[-1]["price_eur_kwh"]
+        assert state.attributes["intervals"] > 0
+        assert config_entry.runtime_data.optimizer.stats.recomputes_per_hour() == 2
+
+    for config_entry in entries:
+        await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert not hass.data[DOMAIN]
+
+async def test_sensor_restores_stored_schedule(hass, hass_storage, freezer, july29_forecast):
+    """
+    Test Restart: Verifies the last schedule is persisted and restored without re-planning.
+
+    1. A new plan is written to storage after the save delay.
+    2. After a reload the stored schedule is published even before the forecast is available.
+    3. Once the unchanged forecast returns, the strategy is not run again.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+    hass.states.async_set("sensor.zonneplan_forecast", "0.25", {"forecast": july29_forecast})
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    freezer.tick(timedelta(seconds=STORAGE_SAVE_DELAY_SECONDS))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert f"{STORAGE_KEY}.test_optimizer_entry" in hass_storage
+
+    entity_id = er.async_get(hass).async_get_entity_id(Platform.SENSOR, DOMAIN, "test_optimizer_entry_Action")
+    planned = hass.states.get(entity_id)
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    with patch(
+        "custom_components.zonneplan_peakdetect.core.strategies.wave_heuristic.WhssStrategy.calculate_schedule",
+        autospec=True,
+        side_effect=lambda self, timeline, *args, **kwargs: timeline,
+    ) as calculate_schedule:
+        hass.states.async_remove("sensor.zonneplan_forecast")
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        restored = hass.states.get(entity_id)
+        assert restored.state == planned.state
+        assert restored.attributes["schedule"] == planned.attributes["schedule"]
+        assert restored.attributes["intervals"] == planned.attributes["intervals"]
+
+        hass.states.async_set("sensor.zonneplan_forecast", "0.25", {"forecast": july29_forecast})
+        freezer.tick(timedelta(seconds=FORECAST_DEBOUNCE_SECONDS))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert calculate_schedule.call_count == 0
+        assert hass.states.get(entity_id).attributes["schedule"] == planned.attributes["schedule"]
+
+
+async def test_sensor_get_schedule_service(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor: Verifies the get_schedule service answers windowed and filtered queries.
+
+    A window returns exactly the slots of the schedule attribute overlapping it, an action
+    filter drops the other actions and the spans output merges the selected slots.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    schedule = hass.states.get(entity_id).attributes.get("schedule")
+
+    async def get_schedule(**data):
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_GET_SCHEDULE, {"entity_id": entity_id, **data}, blocking=True, return_response=True
+        )
+        return response[entity_id]
+
+    assert (await get_schedule())["schedule"] == schedule
+
+    window = await get_schedule(start=schedule[8]["datetime"], end=schedule[16]["datetime"])
+    assert window["schedule"] == schedule[8:16]
+
+    charging = (await get_schedule(action=ACTION_CHARGE))["schedule"]
+    assert charging == [item for item in schedule if item["action"] == ACTION_CHARGE]
+
+    spans = (await get_schedule(action=[ACTION_CHARGE], output="spans"))["schedule_spans"]
+    assert spans and {span["action"] for span in spans} == {ACTION_CHARGE}
+    assert dt_util.parse_datetime(spans[0]["start"]) == dt_util.parse_datetime(charging[0]["datetime"])
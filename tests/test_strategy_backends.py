@@ -0,0 +1,94 @@
+import pytest
+from array import array
+from heapq import nsmallest
+from custom_components.zonneplan_peakdetect.const import (
+    ALGORITHM_WHSS,
+    ALGORITHM_HSWAS,
+    ACTION_CODE_CHARGE,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
+)
+from custom_components.zonneplan_peakdetect.core.strategies import get_arbitrage_strategy
+from custom_components.zonneplan_peakdetect.core.strategies.backends import NumpyKernels, np
+from custom_components.zonneplan_peakdetect.core.strategies import selection
+from custom_components.zonneplan_peakdetect.core.strategies.selection import (
+    select_slots,
+    select_slots_array,
+    uses_partial_selection,
+)
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline
+
+def _prepare(forecast):
+    """Builds the slot timeline the sensor hands to the strategies."""
+    return SlotTimeline(
+        [item['datetime'] for item in forecast],
+        array('d', [item['price_eur_kwh'] for item in forecast]),
+        array('d', [1.0] * len(forecast)),
+    )
+
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+@pytest.mark.parametrize("algorithm_type", [ALGORITHM_WHSS, ALGORITHM_HSWAS])
+@pytest.mark.parametrize("fixture_name", ["july_baseline_forecast", "august_extremes_forecast", "july29_forecast"])
+def test_numpy_backend_matches_python_backend(request, algorithm_type, fixture_name):
+    """
+    Test Strategy Backends: Verifies the NumPy kernels schedule exactly like the pure-Python kernels.
+    
+    Both backends must assign identical 'action' and 'interval_id' values on every shipped fixture.
+    """
+    forecast = request.getfixturevalue(fixture_name)
+
+    numpy_strategy = get_arbitrage_strategy(algorithm_type, BACKEND_NUMPY)
+    python_strategy = get_arbitrage_strategy(algorithm_type, BACKEND_PYTHON)
+    assert isinstance(numpy_strategy.kernels, NumpyKernels)
+    assert not isinstance(python_strategy.kernels, NumpyKernels)
+
+    for charge_slots, discharge_slots in [(13, 11), (8, 8), (1, 20)]:
+        expected = python_strategy.calculate_schedule(_prepare(forecast), charge_slots, discharge_slots, 0.8, 0.06, None)
+        actual = numpy_strategy.calculate_schedule(_prepare(forecast), charge_slots, discharge_slots, 0.8, 0.06, None)
+
+        assert actual.actions == expected.actions
+        assert actual.interval_ids == expected.interval_ids
+
+@pytest.mark.parametrize("count", [40, 5000])
+@pytest.mark.parametrize("highest", [False, True])
+def test_select_slots_matches_full_sort(count, highest):
+    """
+    Test Slot Selection: Verifies the shared selection kernels equal a stable full sort.
+
+    Covers the full-sort path (small pools) and the partial selection path (large pools)
+    of the pure-Python kernel and the NumPy kernel, with many equal prices so that ties
+    must be broken by the earliest slot.
+    """
+    prices = [round(((k * 7919) % 101) / 100.0, 2) for k in range(count)]
+    candidates = [k for k in range(count) if k % 3]
+    for limit in (0, 1, 13, 39, len(candidates) + 1):
+        expected = sorted(candidates, key=prices.__getitem__, reverse=highest)[:limit]
+        assert select_slots(prices, candidates, limit, highest) == expected
+        if np is not None:
+            selected = select_slots_array(np.asarray(prices), np.asarray(candidates), limit, highest)
+            assert selected.tolist() == expected
+    assert uses_partial_selection(len(candidates), 13) == (count == 5000)
+
+def test_whss_long_wave_uses_partial_selection(monkeypatch):
+    """
+    Test Slot Selection: Verifies a long WHSS wave picks its slots by partial selection.
+
+    A week of 5-minute slots that never recovers far enough to end the valley forms one
+    wave with thousands of charge candidates; the heap path must be taken and schedule
+    exactly like a full sort.
+    """
+    valley = [round(0.10 + ((k * 7919) % 11) / 1000.0, 3) for k in range(2000)]
+    prices = valley + [0.50] * 40 + [0.10] * 20
+    timeline = lambda: SlotTimeline([None] * len(prices), array('d', prices), array('d', [1.0] * len(prices)))
+    strategy = get_arbitrage_strategy(ALGORITHM_WHSS, BACKEND_PYTHON)
+
+    calls = []
+    monkeypatch.setattr(selection, "nsmallest", lambda *args, **kwargs: calls.append(args[0]) or nsmallest(*args, **kwargs))
+    partial = strategy.calculate_schedule(timeline(), 13, 13, 0.8, 0.06, None)
+    assert calls == [13]
+
+    monkeypatch.setattr(selection, "PARTIAL_SELECT_MIN_CANDIDATES", len(prices))
+    full = strategy.calculate_schedule(timeline(), 13, 13, 0.8, 0.06, None)
+    assert calls == [13]
+    assert partial.actions == full.actions
+    assert partial.actions.count(ACTION_CODE_CHARGE) == 13
@@ -0,0 +1,156 @@
+import pytest
+import random
+import tracemalloc
+from array import array
+from itertools import product
+from homeassistant.const import Platform
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from custom_components.zonneplan_peakdetect.const import (
+    DOMAIN,
+    ACTION_CHARGE,
+    ACTION_DISCHARGE,
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+    CONF_MIN_PROFIT,
+    CONF_RTE_PERCENT,
+    CONF_FORECAST_ENTITY,
+    CONF_ALGORITHM,
+    ALGORITHM_SOC_DP,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
+    SOC_DP_MAX_LEVELS,
+)
+from custom_components.zonneplan_peakdetect.core.strategies import get_arbitrage_strategy
+from custom_components.zonneplan_peakdetect.core.strategies.backends import np
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline
+from tools.price_generators import build_timeline, generate_prices
+
+async def test_sensor_algorithm_soc_dp_august_extremes(hass, freezer, august_extremes_forecast):
+    """
+    Test Live Sensor (SOC-DP): Verifies behavior on August 12/13 extreme-price dataset.
+    
+    Ensures that when configured to run the SOC-DP algorithm:
+    1. The entity calculates exactly 2 intervals, one full battery cycle per day.
+    2. Each interval charges 13 quarters and discharges 11 quarters.
+    3. The state of charge never drops below empty or exceeds the full battery.
+    """
+    freezer.move_to("2026-08-12T05:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            CONF_ALGORITHM: ALGORITHM_SOC_DP,
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.13",
+        {"forecast": august_extremes_forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    state = hass.states.get(entity_id)
+    assert state is not None
+    assert state.attributes.get("intervals") == 2
+    assert state.attributes.get("algorithm_type") == ALGORITHM_SOC_DP
+
+    schedule = state.attributes.get("schedule")
+    assert len(schedule) == len(august_extremes_forecast)
+
+    for interval_id in (0, 1):
+        interval_slots = [item for item in schedule if item.get("interval_id") == interval_id]
+        assert len([item for item in interval_slots if item["action"] == ACTION_CHARGE]) == 13
+        assert len([item for item in interval_slots if item["action"] == ACTION_DISCHARGE]) == 11
+
+    # Battery levels in units of 1/143: a charge quarter adds 11, a discharge quarter removes 13
+    level = 0
+    for item in schedule:
+        if item["action"] == ACTION_CHARGE:
+            level += 11
+        elif item["action"] == ACTION_DISCHARGE:
+            level -= 13
+        assert 0 <= level <= 143
+
+def test_soc_dp_matches_exhaustive_search():
+    """
+    Test SOC-DP: Verifies the schedule is optimal by comparing it with every possible action sequence.
+    
+    On short random forecasts (including negative prices), the profit of the returned
+    schedule must equal the best profit of all feasible charge/stop/discharge sequences.
+    """
+    rng = random.Random(42)
+    strategy = get_arbitrage_strategy(ALGORITHM_SOC_DP)
+
+    for _ in range(50):
+        prices = [round(rng.uniform(-0.05, 0.40), 3) for _ in range(rng.randint(1, 7))]
+        charge_slots, discharge_slots = rng.randint(1, 3), rng.randint(1, 3)
+        rte_factor, min_profit = rng.choice([1.0, 0.8]), rng.choice([0.0, 0.02])
+
+        def profit(actions):
+            level, total = 0, 0.0
+            for action, price in zip(actions, prices):
+                if action == ACTION_CODE_CHARGE:
+                    level += discharge_slots
+                    total -= price * discharge_slots
+                elif action == ACTION_CODE_DISCHARGE:
+                    level -= charge_slots
+                    total += (price * rte_factor - min_profit) * charge_slots
+                if not 0 <= level <= charge_slots * discharge_slots:
+                    return None
+            return total
+
+        best = max(
+            value for actions in product(range(3), repeat=len(prices))
+            if (value := profit(actions)) is not None
+        )
+        timeline = SlotTimeline(
+            [None] * len(prices), array('d', prices), array('d', [1.0] * len(prices)), interval_minutes=15
+        )
+        result = strategy.calculate_schedule(timeline, charge_slots, discharge_slots, rte_factor, min_profit, None)
+        assert profit(result.actions) == pytest.approx(best)
+
+def test_soc_dp_caps_levels_for_coprime_slot_counts(caplog):
+    """
+    Test SOC-DP: Verifies coprime slot counts are planned on at most SOC_DP_MAX_LEVELS levels.
+
+    97 charge and 96 discharge slots would need lcm = 9312 levels. The level count is capped
+    (and logged), full charges stay exact, and only the decisions are stored per slot, so
+    a week of 5-minute slots stays well below the memory of a full value table.
+    """
+    prices = generate_prices("duck", 7, 5)
+    caplog.set_level("DEBUG")
+    backends = [BACKEND_PYTHON] + ([BACKEND_NUMPY] if np is not None else [])
+    schedules = []
+    for backend in backends:
+        strategy = get_arbitrage_strategy(ALGORITHM_SOC_DP, backend)
+        tracemalloc.start()
+        timeline = strategy.calculate_schedule(build_timeline(prices, 5), 97, 96, 0.8, 0.06, None)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert peak < 4 * 1024 * 1024
+        schedules.append(list(timeline.actions))
+    assert "SOC-DP needs 9312 levels for 97 charge and 96 discharge slots" in caplog.text
+    assert all(schedule == schedules[0] for schedule in schedules)
+
+    # Battery levels on the capped grid: a charge slot adds 5 of 485 levels, a discharge slot removes 5
+    charge_step = SOC_DP_MAX_LEVELS // 97
+    level = 0
+    for action in schedules[0]:
+        if action == ACTION_CODE_CHARGE:
+            level += charge_step
+        elif action == ACTION_CODE_DISCHARGE:
+            level -= round(charge_step * 97 / 96)
+        assert 0 <= level <= charge_step * 97
+    assert schedules[0].count(ACTION_CODE_CHARGE) >= 97
@@ -1,3 +1,5 @@
+import random
+
 import pytest
 from homeassistant.const import Platform
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -10,7 +12,11 @@ from custom_components.zonneplan_peakdetect.const import (
     CONF_FORECAST_ENTITY,
     CONF_ALGORITHM,
     ALGORITHM_HSWAS,
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
 )
+from custom_components.zonneplan_peakdetect.core.strategies import get_arbitrage_strategy, plan_incrementally
+from tools.price_generators import SHAPES, build_timeline, generate_prices
 
 async def test_sensor_algorithm_hswas_august_extremes(hass, freezer, august_extremes_forecast):
     """
@@ -265,3 +271,128 @@ async def test_hswas_hourly_tariff(hass, freezer):
     
     assert len(charge_slots) == 3
     assert len(discharge_slots) == 3
+
+def test_hswas_horizon_is_set_in_time():
+    """
+    Test HSWAS Horizon: Verifies the wave search looks 24 hours ahead at any resolution.
+
+    A dip and a peak 40 hours apart must not be paired, neither on an hourly nor on a
+    quarterly feed, while the same spread within a day is.
+    """
+    strategy = get_arbitrage_strategy(ALGORITHM_HSWAS)
+    for minutes in (60, 15):
+        per_hour = 60 // minutes
+        for peak_hour, intervals in ((40, 0), (20, 1)):
+            prices = [0.25] * (72 * per_hour)
+            prices[2 * per_hour : 5 * per_hour] = [0.16] * (3 * per_hour)
+            prices[peak_hour * per_hour : (peak_hour + 3) * per_hour] = [0.35] * (3 * per_hour)
+            timeline = strategy.calculate_schedule(
+                build_timeline(prices, minutes), 3 * per_hour, 3 * per_hour, 0.8, 0.06, None
+            )
+            assert timeline.interval_count() == intervals
+
+@pytest.mark.parametrize("forecast_name", ["july_baseline_forecast", "august_extremes_forecast", "july29_forecast"])
+def test_hswas_five_minute_feed_matches_quarterly(request, forecast_name):
+    """
+    Test HSWAS Coarse-to-Fine: Verifies a 5-minute feed is planned like its quarterly source.
+
+    Splitting every quarter into three 5-minute slots must charge and discharge in the
+    same quarters, although the waves are found on hourly averages first.
+    """
+    forecast = request.getfixturevalue(forecast_name)
+    strategy = get_arbitrage_strategy(ALGORITHM_HSWAS)
+    prices = [item["price_eur_kwh"] for item in forecast]
+    quarterly = strategy.calculate_schedule(build_timeline(prices, 15), 13, 11, 0.8, 0.06, None)
+    five_minute = strategy.calculate_schedule(
+        build_timeline([price for price in prices for _ in range(3)], 5), 39, 33, 0.8, 0.06, None
+    )
+
+    assert five_minute.interval_count() == quarterly.interval_count()
+    assert list(five_minute.actions[::3]) == list(quarterly.actions)
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_hswas_five_minute_incremental_replan(shape):
+    """
+    Test HSWAS Coarse-to-Fine: Verifies incremental re-planning of a 5-minute feed matches a full plan.
+    """
+    strategy = get_arbitrage_strategy(ALGORITHM_HSWAS)
+    prices = generate_prices(shape, 3, 5)
+    previous = strategy.calculate_schedule(build_timeline(prices[:-120], 5), 24, 24, 0.8, 0.02, None)
+    updated = build_timeline(prices[7:], 5, build_timeline(prices, 5).starts[7])
+    expected = strategy.calculate_schedule(build_timeline(prices[7:], 5, updated.starts[0]), 24, 24, 0.8, 0.02, None)
+    actual = plan_incrementally(strategy, updated, previous, 24, 24, 0.8, 0.02, updated.starts[0])
+
+    assert actual.actions == expected.actions
+    assert actual.interval_ids == expected.interval_ids
+
+def _pairwise_hswas(prices, charge_slots_count, discharge_slots_count, rte_factor, min_profit_eur_kwh):
+    """The original quadratic HSWAS scan over quarterly prices, kept as a reference for the tie-breaks."""
+    n = len(prices)
+    actions = [0] * n
+    interval_ids = [-1] * n
+    current_idx = 0
+    interval_count = 0
+    while current_idx < n - (charge_slots_count + discharge_slots_count) + 1:
+        best_profit = -float('inf')
+        best_charge_idx = best_discharge_idx = -1
+        search_limit = min(n, current_idx + 96)
+        for i in range(current_idx, search_limit - charge_slots_count + 1):
+            avg_charge = sum(prices[k] for k in range(i, i + charge_slots_count)) / charge_slots_count
+            for j in range(i + charge_slots_count, search_limit - discharge_slots_count + 1):
+                avg_discharge = sum(prices[k] for k in range(j, j + discharge_slots_count)) / discharge_slots_count
+                profit = avg_discharge * rte_factor - avg_charge
+                if profit > best_profit:
+                    best_profit, best_charge_idx, best_discharge_idx = profit, i, j
+        if best_profit < min_profit_eur_kwh or best_charge_idx == -1:
+            current_idx += 1
+            continue
+
+        segment_end = best_discharge_idx + discharge_slots_count
+        valley = min(prices[best_charge_idx:segment_end])
+        peak = max(prices[best_charge_idx:segment_end])
+        charge = sorted(
+            (k for k in range(best_charge_idx, best_discharge_idx) if peak * rte_factor - prices[k] >= min_profit_eur_kwh),
+            key=prices.__getitem__,
+        )[:charge_slots_count]
+        discharge = sorted(
+            (k for k in range(best_discharge_idx, segment_end) if prices[k] * rte_factor - valley >= min_profit_eur_kwh),
+            key=prices.__getitem__,
+            reverse=True,
+        )[:discharge_slots_count]
+        if charge or discharge:
+            interval_ids[best_charge_idx:segment_end] = [interval_count] * (segment_end - best_charge_idx)
+            for k in charge:
+                actions[k] = ACTION_CODE_CHARGE
+            for k in discharge:
+                actions[k] = ACTION_CODE_DISCHARGE
+            interval_count += 1
+        current_idx = segment_end
+    return actions, interval_ids
+
+def test_hswas_matches_pairwise_scan_on_ties():
+    """
+    Test HSWAS Tie-Breaks: Verifies the wave finder picks the same window pairs as the pairwise scan.
+
+    Flat and coarsely quantised prices make many window pairs exactly equally profitable;
+    the earliest pair must win, just like the original scan over every (charge, discharge) pair.
+    """
+    strategy = get_arbitrage_strategy(ALGORITHM_HSWAS)
+    timeline = strategy.calculate_schedule(build_timeline([0.2] * 30, 15), 8, 1, 1.0, 0.0, None)
+    expected_actions, expected_ids = _pairwise_hswas([0.2] * 30, 8, 1, 1.0, 0.0)
+    assert list(timeline.actions) == expected_actions == [1] * 8 + [2] + [1] * 8 + [2] + [1] * 8 + [2] + [0] * 3
+    assert list(timeline.interval_ids) == expected_ids
+
+    rng = random.Random(7)
+    for _ in range(150):
+        prices = [rng.choice((0.1, 0.2, 0.3, 0.1 + 0.2, 0.7)) for _ in range(rng.randint(10, 120))]
+        charge_slots_count, discharge_slots_count = rng.randint(1, 8), rng.randint(1, 8)
+        rte_factor = rng.choice((1.0, 0.9, 0.8))
+        min_profit_eur_kwh = rng.choice((0.0, 0.02))
+        timeline = strategy.calculate_schedule(
+            build_timeline(prices, 15), charge_slots_count, discharge_slots_count, rte_factor, min_profit_eur_kwh, None
+        )
+        expected_actions, expected_ids = _pairwise_hswas(
+            prices, charge_slots_count, discharge_slots_count, rte_factor, min_profit_eur_kwh
+        )
+        assert list(timeline.actions) == expected_actions
+        assert list(timeline.interval_ids) == expected_ids
@@ -0,0 +1,51 @@
+import pytest
+from array import array
+from unittest.mock import patch
+from homeassistant.util import dt as dt_util
+from custom_components.zonneplan_peakdetect.const import (
+    ALGORITHM_WHSS,
+    ALGORITHM_HSWAS,
+)
+from custom_components.zonneplan_peakdetect.core.strategies import get_arbitrage_strategy, plan_incrementally
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline
+
+def _prepare(forecast):
+    """Builds the slot timeline the sensor hands to the strategies."""
+    return SlotTimeline(
+        [item['datetime'] for item in forecast],
+        array('d', [item['price_eur_kwh'] for item in forecast]),
+        array('d', [1.0] * len(forecast)),
+        [dt_util.parse_datetime(item['datetime']) for item in forecast],
+        15,
+    )
+
+@pytest.mark.parametrize("algorithm_type", [ALGORITHM_WHSS, ALGORITHM_HSWAS])
+@pytest.mark.parametrize("fixture_name", ["july_baseline_forecast", "august_extremes_forecast", "july29_forecast"])
+def test_incremental_replan_matches_full_replan(request, algorithm_type, fixture_name):
+    """
+    Test Incremental Planning: Verifies re-planning from the previous timeline gives the full re-plan result.
+
+    Simulates the day-ahead prices being appended at the tail, a price correction in the last
+    slot and slots elapsing at the head of the forecast, and checks that unchanged waves are
+    taken over instead of being planned again.
+    """
+    forecast = request.getfixturevalue(fixture_name)
+    strategy = get_arbitrage_strategy(algorithm_type)
+    previous = strategy.calculate_schedule(_prepare(forecast[:-48]), 8, 8, 0.8, 0.02, None)
+    assert previous.waves
+
+    corrected = [dict(item) for item in forecast]
+    corrected[-1]['price_eur_kwh'] += 0.05
+
+    # (updated forecast, whether unchanged waves must be reused)
+    for updated, reuses in ((forecast, True), (corrected, True), (forecast[4:], False)):
+        expected = strategy.calculate_schedule(_prepare(updated), 8, 8, 0.8, 0.02, None)
+        with patch.object(strategy, "calculate_schedule", wraps=strategy.calculate_schedule) as calculate:
+            actual = plan_incrementally(strategy, _prepare(updated), previous, 8, 8, 0.8, 0.02, None)
+
+        assert actual.actions == expected.actions
+        assert actual.interval_ids == expected.interval_ids
+        if reuses:
+            # The last strategy run only covers the suffix after the reused waves
+            assert calculate.call_args.kwargs.get("start_idx", 0) > 0
+        previous = actual
@@ -0,0 +1,169 @@
+import pytest
+import random
+from array import array
+from itertools import product
+from homeassistant.const import Platform
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from custom_components.zonneplan_peakdetect.const import (
+    DOMAIN,
+    ACTION_CHARGE,
+    ACTION_DISCHARGE,
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+    ACTION_CODE_STOP,
+    CONF_MIN_PROFIT,
+    CONF_RTE_PERCENT,
+    CONF_FORECAST_ENTITY,
+    CONF_ALGORITHM,
+    ALGORITHM_PAIRING,
+)
+from custom_components.zonneplan_peakdetect.core.strategies import get_arbitrage_strategy
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline
+from tools.price_generators import SHAPES, build_timeline, generate_prices
+
+async def test_sensor_algorithm_pairing_july29(hass, freezer, july29_forecast):
+    """
+    Test Live Sensor (Pairing): Verifies behavior on the July 29 dataset.
+    
+    Ensures that when configured to run the Pairing algorithm:
+    1. The entity calculates exactly 2 intervals.
+    2. Every interval discharges exactly as many slots as it charges.
+    3. The battery never holds more than the 11 quarters that fit in both directions.
+    """
+    freezer.move_to("2026-07-28T17:59:00+00:00")
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_FORECAST_ENTITY: "sensor.zonneplan_forecast",
+            CONF_ALGORITHM: ALGORITHM_PAIRING,
+            "charge_hours": 3.25,      # 13 quarters
+            "discharge_hours": 2.75,   # 11 quarters
+            CONF_RTE_PERCENT: 20.0,
+            CONF_MIN_PROFIT: 6.0,      # 6 cents
+        },
+        entry_id="test_optimizer_entry",
+    )
+    config_entry.add_to_hass(hass)
+
+    hass.states.async_set(
+        "sensor.zonneplan_forecast",
+        "0.25",
+        {"forecast": july29_forecast}
+    )
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = next(
+        (state.entity_id for state in hass.states.async_all(Platform.SENSOR) if "battery_optimizer" in state.entity_id),
+        None
+    )
+    state = hass.states.get(entity_id)
+    assert state is not None
+    assert state.attributes.get("intervals") == 2
+    assert state.attributes.get("algorithm_type") == ALGORITHM_PAIRING
+
+    schedule = state.attributes.get("schedule")
+    assert len(schedule) == len(july29_forecast)
+
+    for interval_id in (0, 1):
+        interval_slots = [item for item in schedule if item.get("interval_id") == interval_id]
+        charge_slots = [item for item in interval_slots if item["action"] == ACTION_CHARGE]
+        discharge_slots = [item for item in interval_slots if item["action"] == ACTION_DISCHARGE]
+        assert charge_slots
+        assert len(charge_slots) == len(discharge_slots)
+
+    stored = 0
+    for item in schedule:
+        stored += {ACTION_CHARGE: 1, ACTION_DISCHARGE: -1}.get(item["action"], 0)
+        assert 0 <= stored <= 11
+
+def test_pairing_is_optimal_without_capacity_limit():
+    """
+    Test Pairing: Verifies the pairing finds the best possible trades when capacity does not bind.
+    
+    Without minimum profit or a binding capacity, the profit of the schedule must equal the
+    best of all action sequences that never sell more than was bought and end with an empty
+    battery. Negative prices with RTE losses make some slots worth more sold than bought.
+    """
+    rng = random.Random(7)
+    strategy = get_arbitrage_strategy(ALGORITHM_PAIRING)
+
+    for rte_factor, low in ((1.0, 0.0), (1.0, -0.10), (0.9, -0.10), (0.8, -0.30)):
+        for _ in range(50):
+            prices = [round(rng.uniform(low, 0.40), 3) for _ in range(rng.randint(1, 7))]
+
+            def profit(actions):
+                stored, total = 0, 0.0
+                for action, price in zip(actions, prices):
+                    if action == ACTION_CODE_CHARGE:
+                        stored += 1
+                        total -= price
+                    elif action == ACTION_CODE_DISCHARGE:
+                        stored -= 1
+                        total += price * rte_factor
+                    if stored < 0:
+                        return None
+                return total if stored == 0 else None
+
+            best = max(
+                value for actions in product(range(3), repeat=len(prices))
+                if (value := profit(actions)) is not None
+            )
+            timeline = SlotTimeline(
+                [None] * len(prices), array('d', prices), array('d', [1.0] * len(prices)), interval_minutes=15
+            )
+            result = strategy.calculate_schedule(timeline, len(prices), len(prices), rte_factor, 0.0, None)
+            assert profit(result.actions) == pytest.approx(best)
+
+    # Buying both negative slots beats trading between them before the peak
+    prices = [-0.085, -0.071, -0.078, 0.293, 0.325]
+    timeline = SlotTimeline([None] * 5, array('d', prices), array('d', [1.0] * 5), interval_minutes=15)
+    result = strategy.calculate_schedule(timeline, 5, 5, 0.9, 0.0, None)
+    assert list(result.actions) == [
+        ACTION_CODE_CHARGE, ACTION_CODE_STOP, ACTION_CODE_CHARGE, ACTION_CODE_DISCHARGE, ACTION_CODE_DISCHARGE
+    ]
+
+
+def _best_pairing_profit(prices, rte_factor, min_profit_eur_kwh):
+    """Exact optimum by dynamic programming over the number of stored slots, ending empty."""
+    values = [0.0] + [-float('inf')] * len(prices)
+    for price in prices:
+        sell_value = price * rte_factor - min_profit_eur_kwh
+        values = [
+            max(
+                values[level],
+                values[level - 1] - price if level else -float('inf'),
+                values[level + 1] + sell_value if level < len(prices) else -float('inf'),
+            )
+            for level in range(len(prices) + 1)
+        ]
+    return values[0]
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_pairing_matches_exact_pairing(shape):
+    """
+    Test Pairing: Verifies the heap pairing reaches the exact optimum on generated price shapes.
+
+    The "negative" shape dips below zero, where RTE losses make slots worth more sold than
+    bought and sales have to be swapped into buys. Capacity does not bind here.
+    """
+    strategy = get_arbitrage_strategy(ALGORITHM_PAIRING)
+    for resolution_minutes in (60, 15):
+        prices = generate_prices(shape, 2, resolution_minutes)
+        for rte_factor in (1.0, 0.9, 0.8):
+            for min_profit_eur_kwh in (0.0, 0.02):
+                result = strategy.calculate_schedule(
+                    build_timeline(prices, resolution_minutes), len(prices), len(prices),
+                    rte_factor, min_profit_eur_kwh, None,
+                )
+                profit = sum(
+                    price * rte_factor - min_profit_eur_kwh if action == ACTION_CODE_DISCHARGE
+                    else -price if action == ACTION_CODE_CHARGE else 0.0
+                    for action, price in zip(result.actions, prices)
+                )
+                assert profit == pytest.approx(_best_pairing_profit(prices, rte_factor, min_profit_eur_kwh))
+
+    # Slot 1 first sells the charge of slot 0 on, then has to swap into the cheaper buy
+    prices = [-0.29, -0.30, 0.04]
+    result = strategy.calculate_schedule(build_timeline(prices, 15), 3, 3, 0.8, 0.0, None)
+    assert list(result.actions) == [ACTION_CODE_STOP, ACTION_CODE_CHARGE, ACTION_CODE_DISCHARGE]
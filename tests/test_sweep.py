@@ -0,0 +1,58 @@
+from array import array
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.zonneplan_peakdetect.const import ALGORITHM_PAIRING, ALGORITHM_SOC_DP
+from tools.backtest import BacktestConfig, run_backtest
+from tools.price_generators import generate_prices
+from tools.sweep import SAMPLE_GRID, SAMPLE_LHS, SAMPLE_RANDOM, parse_values, run_sweep, sample_combinations
+
+
+def test_parse_values_lists_and_ranges():
+    """Lists are taken as is, ranges include their stop value."""
+    assert parse_values("4,8,12", True) == [4, 8, 12]
+    assert parse_values("4:12:4", True) == [4, 8, 12]
+    assert parse_values("0:1:0.25", False) == [0.0, 0.25, 0.5, 0.75, 1.0]
+    with pytest.raises(ValueError):
+        parse_values("8:4", True)
+
+
+def test_sample_combinations():
+    """The grid covers every combination; sampled points stay within the ranges."""
+    space = {"charge_quarters": [4, 8, 12], "discharge_quarters": [4, 8], "rte_percent": [10.0, 30.0], "min_profit_c_kwh": [6.0]}
+    assert len(sample_combinations(space, SAMPLE_GRID)) == 12
+
+    for method in (SAMPLE_RANDOM, SAMPLE_LHS):
+        combinations = sample_combinations(space, method, samples=50, seed=1)
+        assert combinations
+        for combination in combinations:
+            assert 4 <= combination["charge_quarters"] <= 12
+            assert isinstance(combination["charge_quarters"], int)
+            assert 10.0 <= combination["rte_percent"] <= 30.0
+            assert combination["min_profit_c_kwh"] == 6.0
+
+    # Latin hypercube sampling puts one point in every stratum of a parameter
+    lhs = sample_combinations({"rte_percent": [0.0, 10.0]}, SAMPLE_LHS, samples=10, seed=2)
+    assert sorted(int(combination["rte_percent"]) for combination in lhs) == list(range(10))
+
+
+def test_run_sweep_matches_single_backtests():
+    """Every combination of a sweep reports the same result as its own backtest."""
+    tz = ZoneInfo("Europe/Amsterdam")
+    start = datetime(2025, 3, 1, tzinfo=tz)
+    prices = array('d', generate_prices("duck", 3, 60))
+    starts = [start + timedelta(hours=slot) for slot in range(len(prices))]
+    configs = [
+        BacktestConfig(ALGORITHM_SOC_DP, charge_quarters=4, discharge_quarters=8),
+        BacktestConfig(ALGORITHM_PAIRING, charge_quarters=8, discharge_quarters=8, min_profit_c_kwh=2),
+    ]
+
+    reports = run_sweep(starts, prices, configs, workers=2)
+
+    assert [report["strategy"] for report in reports] == [ALGORITHM_SOC_DP, ALGORITHM_PAIRING]
+    for config, report in zip(configs, reports):
+        expected = run_backtest(starts, prices, config, workers=1)
+        assert report["profit_eur"] == expected["profit_eur"]
+        assert report["cycles"] == expected["cycles"]
@@ -0,0 +1 @@
+"""Development tools for measuring and tuning the arbitrage strategies (not shipped with the integration)."""
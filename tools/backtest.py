@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Backtests the arbitrage strategies on historical day-ahead prices.
+
+    python -m tools.backtest prices_2025.csv --strategies whss pairing --workers 8
+    python -m tools.backtest --synthetic duck --days 365 --resolution 15
+
+Prices are replayed day by day with a rolling "now". At every re-plan time the strategy
+sees the forecast the sensor would have seen: the slots of today, or of today and tomorrow
+once the day-ahead auction has been published. Strategies plan for an empty battery, so
+with --window-start now (a forecast that drops passed slots) every re-plan ignores the
+energy already stored.
+The planned actions are executed until the next re-plan on a battery with the configured
+capacity, and profit, cycles and planning latency are aggregated over all days.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from custom_components.zonneplan_peakdetect.const import (
+    ACTION_CODE_CHARGE,
+    ACTION_CODE_DISCHARGE,
+    BACKEND_AUTO,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
+    DEFAULT_CENTS,
+    DEFAULT_CHARGE_QUARTERS,
+    DEFAULT_DISCHARGE_QUARTERS,
+    DEFAULT_PERCENTAGE,
+)
+from custom_components.zonneplan_peakdetect.core.strategies import STRATEGIES, get_arbitrage_strategy, plan_incrementally
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline, modal_duration, quarters_to_slots, slot_durations
+
+from .price_generators import SHAPES, generate_prices
+
+DEFAULT_TIMEZONE = "Europe/Amsterdam"
+# Local hour at which the next day's prices become available
+DEFAULT_PUBLISH_HOUR = 13
+DEFAULT_REPLAN_MINUTES = 60
+
+# Where the forecast window of a re-plan starts
+WINDOW_START_DAY = "day"
+WINDOW_START_NOW = "now"
+
+
+@dataclass(slots=True)
+class BacktestConfig:
+    """Strategy and battery parameters of a backtest run."""
+
+    strategy: str
+    backend: str = BACKEND_PYTHON
+    charge_quarters: int = DEFAULT_CHARGE_QUARTERS
+    discharge_quarters: int = DEFAULT_DISCHARGE_QUARTERS
+    rte_percent: float = DEFAULT_PERCENTAGE
+    min_profit_c_kwh: float = DEFAULT_CENTS
+    capacity_kwh: float = 1.0
+    replan_minutes: int = DEFAULT_REPLAN_MINUTES
+    publish_hour: int = DEFAULT_PUBLISH_HOUR
+    timezone: str = DEFAULT_TIMEZONE
+    window_start: str = WINDOW_START_DAY
+
+
+@dataclass(slots=True)
+class DayTask:
+    """
+    Everything a worker needs to replay one day: the prices from the start of the day up to
+    the end of the next day, and per re-plan time its slot index and the forecast window.
+    """
+
+    day: date
+    starts: array
+    prices: array
+    day_end: int
+    replans: list[tuple[int, int, int]]
+
+
+@dataclass(slots=True)
+class DayResult:
+    """Outcome of one simulated day."""
+
+    day: date
+    profit_eur: float = 0.0
+    charged_kwh: float = 0.0
+    discharged_kwh: float = 0.0
+    stranded_kwh: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list)
+
+
+def load_prices(path: str) -> tuple[list[datetime], array]:
+    """
+    Loads historical prices from CSV (columns `datetime` and `price_eur_kwh`) or from a
+    JSON/YAML list in any of the forecast schemas the sensor accepts.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as file:
+            rows = [{"datetime": row["datetime"], "price_eur_kwh": float(row["price_eur_kwh"])} for row in csv.DictReader(file)]
+    else:
+        with open(path, encoding="utf-8") as file:
+            content = file.read()
+        try:
+            rows = json.loads(content)
+        except json.JSONDecodeError:
+            import yaml
+            rows = yaml.safe_load(content)
+        if isinstance(rows, dict):
+            rows = rows.get("attributes", rows)
+            rows = rows.get("forecast", rows.get("schedule", rows))
+
+    starts: list[datetime] = []
+    prices = array('d')
+    for item in rows:
+        raw_dt = item.get("start_date") or item.get("datetime")
+        if "price_eur_kwh" in item:
+            price = item["price_eur_kwh"]
+        elif isinstance(item.get("price_tax_included"), dict):
+            price = item["price_tax_included"]["amount"] / 10_000_000.0
+        elif item.get("electricity_price") is not None:
+            price = item["electricity_price"] / 10_000_000.0
+        else:
+            continue
+        if raw_dt is None:
+            continue
+        starts.append(raw_dt if isinstance(raw_dt, datetime) else datetime.fromisoformat(raw_dt))
+        prices.append(price)
+
+    order = sorted(range(len(starts)), key=starts.__getitem__)
+    return [starts[idx] for idx in order], array('d', [prices[idx] for idx in order])
+
+
+def build_tasks(starts: list[datetime], prices: array, config: BacktestConfig) -> list[DayTask]:
+    """Splits the price history into one task per local day with its re-plan times."""
+    tz = ZoneInfo(config.timezone)
+    epochs = array('d', [start.timestamp() for start in starts])
+    if not epochs:
+        return []
+
+    tasks = []
+    day = starts[0].astimezone(tz).date()
+    last_day = starts[-1].astimezone(tz).date()
+    while day <= last_day:
+        midnight = datetime.combine(day, datetime.min.time(), tz)
+        next_midnight = datetime.combine(day + timedelta(days=1), datetime.min.time(), tz)
+        day_after = datetime.combine(day + timedelta(days=2), datetime.min.time(), tz)
+        first = bisect_left(epochs, midnight.timestamp())
+        day_end = bisect_left(epochs, next_midnight.timestamp())
+        window_end = bisect_left(epochs, day_after.timestamp())
+        published = bisect_left(epochs, (midnight + timedelta(hours=config.publish_hour)).timestamp())
+
+        replans = []
+        moment = midnight
+        while moment < next_midnight:
+            idx = bisect_left(epochs, moment.timestamp())
+            if idx >= day_end:
+                break
+            if not replans or replans[-1][0] != idx - first:
+                replans.append(_replan(idx, first, day_end, window_end, published, config))
+            moment += timedelta(minutes=config.replan_minutes)
+        # The sensor re-plans as soon as tomorrow's prices arrive
+        if first <= published < day_end and all(replan[0] != published - first for replan in replans):
+            replans.append(_replan(published, first, day_end, window_end, published, config))
+            replans.sort()
+
+        if replans:
+            tasks.append(DayTask(
+                day,
+                epochs[first:window_end],
+                prices[first:window_end],
+                day_end - first,
+                replans,
+            ))
+        day += timedelta(days=1)
+    return tasks
+
+
+def _replan(
+    idx: int, first: int, day_end: int, window_end: int, published: int, config: BacktestConfig
+) -> tuple[int, int, int]:
+    """Re-plan at slot idx as (slot, window start, window end), relative to the first slot of the day."""
+    start = idx if config.window_start == WINDOW_START_NOW else first
+    end = window_end if idx >= published else day_end
+    return idx - first, start - first, end - first
+
+
+def simulate_day(task: DayTask, config: BacktestConfig) -> DayResult:
+    """
+    Replays one day: plans at every re-plan time and executes the plan until the next one.
+
+    Each day starts with an empty battery, which keeps days independent so they can run in
+    parallel. Energy still stored at the end of the day is reported as stranded and earns
+    nothing. A charge slot moves capacity/charge_slots from the grid into the battery and a
+    discharge slot sells capacity/discharge_slots at the price times the RTE factor; actions
+    the battery cannot follow (charging when full, discharging when empty) are skipped.
+    """
+    tz = ZoneInfo(config.timezone)
+    strategy = get_arbitrage_strategy(config.strategy, config.backend)
+    rte_factor = 1.0 - config.rte_percent / 100.0
+    min_profit_eur_kwh = config.min_profit_c_kwh / 100.0
+    starts = [datetime.fromtimestamp(epoch, tz) for epoch in task.starts]
+    durations = slot_durations(starts)
+    interval_minutes = max(1, modal_duration(durations) // 60)
+    charge_slots = quarters_to_slots(config.charge_quarters, interval_minutes)
+    discharge_slots = quarters_to_slots(config.discharge_quarters, interval_minutes)
+    charge_step = config.capacity_kwh / charge_slots if charge_slots else 0.0
+    discharge_step = config.capacity_kwh / discharge_slots if discharge_slots else 0.0
+
+    result = DayResult(task.day)
+    stored = 0.0
+    previous: SlotTimeline | None = None
+    for k, (now_idx, window_start, window_end) in enumerate(task.replans):
+        until = task.replans[k + 1][0] if k + 1 < len(task.replans) else task.day_end
+        window = slice(window_start, window_end)
+        window_starts = starts[window]
+        timeline = SlotTimeline(
+            [start.isoformat() for start in window_starts],
+            task.prices[window],
+            array('d', [1.0]) * (window_end - window_start),
+            window_starts,
+            interval_minutes,
+            durations[window],
+        )
+        started = time.perf_counter()
+        timeline = plan_incrementally(
+            strategy, timeline, previous, charge_slots, discharge_slots, rte_factor, min_profit_eur_kwh, starts[now_idx]
+        )
+        result.latencies_ms.append((time.perf_counter() - started) * 1000.0)
+        previous = timeline
+
+        for idx in range(now_idx, until):
+            code = timeline.actions[idx - window_start]
+            price = task.prices[idx]
+            if code == ACTION_CODE_CHARGE:
+                energy = min(charge_step, config.capacity_kwh - stored)
+                stored += energy
+                result.charged_kwh += energy
+                result.profit_eur -= energy * price
+            elif code == ACTION_CODE_DISCHARGE:
+                energy = min(discharge_step, stored)
+                stored -= energy
+                result.discharged_kwh += energy
+                result.profit_eur += energy * price * rte_factor
+
+    result.stranded_kwh = stored
+    return result
+
+
+def _simulate_chunk(tasks: list[DayTask], config: BacktestConfig) -> list[DayResult]:
+    """Worker entry point; several days per call keep the pickling overhead low."""
+    return [simulate_day(task, config) for task in tasks]
+
+
+def run_backtest(
+    starts: list[datetime], prices: array, config: BacktestConfig, workers: int | None = None
+) -> dict[str, Any]:
+    """
+    Backtests one strategy over the whole price history and returns the aggregated report.
+
+    Days are spread over a ProcessPoolExecutor; workers=1 runs them in this process.
+    """
+    tasks = build_tasks(starts, prices, config)
+    started = time.perf_counter()
+    if workers == 1 or len(tasks) <= 1:
+        days = _simulate_chunk(tasks, config)
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk = max(1, math.ceil(len(tasks) / (4 * workers)))
+            chunks = [tasks[idx:idx + chunk] for idx in range(0, len(tasks), chunk)]
+            days = [day for result in executor.map(_simulate_chunk, chunks, [config] * len(chunks)) for day in result]
+    elapsed = time.perf_counter() - started
+    return summarize(days, config, elapsed)
+
+
+def summarize(days: list[DayResult], config: BacktestConfig, elapsed_s: float = 0.0) -> dict[str, Any]:
+    """Aggregates day results into profit, cycle and planning latency totals."""
+    latencies = sorted(latency for day in days for latency in day.latencies_ms)
+    discharged = sum(day.discharged_kwh for day in days)
+    return {
+        "strategy": config.strategy,
+        "days": len(days),
+        "profit_eur": round(sum(day.profit_eur for day in days), 4),
+        "charged_kwh": round(sum(day.charged_kwh for day in days), 4),
+        "discharged_kwh": round(discharged, 4),
+        "stranded_kwh": round(sum(day.stranded_kwh for day in days), 4),
+        "cycles": round(discharged / config.capacity_kwh, 2) if config.capacity_kwh else 0.0,
+        "replans": len(latencies),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p95": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3) if latencies else 0.0,
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "elapsed_s": round(elapsed_s, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("prices", nargs="?", help="CSV, JSON or YAML file with historical prices")
+    parser.add_argument("--synthetic", choices=SHAPES, help="backtest a generated price series instead")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--resolution", type=int, default=15, help="minutes per slot of the synthetic series")
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--backend", choices=[BACKEND_AUTO, BACKEND_PYTHON, BACKEND_NUMPY], default=BACKEND_PYTHON)
+    parser.add_argument("--charge-quarters", type=int, default=DEFAULT_CHARGE_QUARTERS)
+    parser.add_argument("--discharge-quarters", type=int, default=DEFAULT_DISCHARGE_QUARTERS)
+    parser.add_argument("--rte", type=float, default=DEFAULT_PERCENTAGE, help="price delta / RTE loss in percent")
+    parser.add_argument("--min-profit", type=float, default=DEFAULT_CENTS, help="minimum profit in ct/kWh")
+    parser.add_argument("--capacity", type=float, default=1.0, help="battery capacity in kWh")
+    parser.add_argument("--replan-minutes", type=int, default=DEFAULT_REPLAN_MINUTES)
+    parser.add_argument("--publish-hour", type=int, default=DEFAULT_PUBLISH_HOUR)
+    parser.add_argument("--timezone", default=DEFAULT_TIMEZONE)
+    parser.add_argument(
+        "--window-start", choices=[WINDOW_START_DAY, WINDOW_START_NOW], default=WINDOW_START_DAY,
+        help="whether the forecast includes the passed slots of today",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", default=None, help="write the reports as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        start = datetime.combine(date(2025, 1, 1), datetime.min.time(), ZoneInfo(args.timezone))
+        prices = array('d', generate_prices(args.synthetic, args.days, args.resolution))
+        starts = [start + timedelta(minutes=args.resolution * slot) for slot in range(len(prices))]
+    elif args.prices:
+        starts, prices = load_prices(args.prices)
+    else:
+        parser.error("either a price file or --synthetic is required")
+
+    reports = []
+    for name in args.strategies:
+        config = BacktestConfig(
+            name,
+            args.backend,
+            args.charge_quarters,
+            args.discharge_quarters,
+            args.rte,
+            args.min_profit,
+            args.capacity,
+            args.replan_minutes,
+            args.publish_hour,
+            args.timezone,
+            args.window_start,
+        )
+        report = run_backtest(starts, prices, config, args.workers)
+        reports.append(report)
+        print(
+            f"{name:<8} profit {report['profit_eur']:10.2f} EUR  cycles {report['cycles']:7.1f}  "
+            f"plan mean {report['latency_ms']['mean']:7.2f} ms  p95 {report['latency_ms']['p95']:7.2f} ms  "
+            f"({report['days']} days in {report['elapsed_s']:.1f} s)"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(reports, file, indent=2)
+            file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
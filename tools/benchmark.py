@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmarks every registered arbitrage strategy over synthetic price series.
+
+    python -m tools.benchmark run --output tools/benchmark_baseline.json
+    python -m tools.benchmark compare --baseline tools/benchmark_baseline.json --tolerance 25
+
+`run` records the wall time, peak traced memory and slots/second of every strategy on every
+price shape, horizon and resolution. `compare` re-runs the same cases and exits with status 1
+when a strategy got slower or hungrier than the baseline by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import product
+
+from custom_components.zonneplan_peakdetect.const import (
+    BACKEND_AUTO,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
+    DEFAULT_CENTS,
+    DEFAULT_CHARGE_QUARTERS,
+    DEFAULT_DISCHARGE_QUARTERS,
+    DEFAULT_PERCENTAGE,
+)
+from custom_components.zonneplan_peakdetect.core.strategies import STRATEGIES, get_arbitrage_strategy
+from custom_components.zonneplan_peakdetect.core.timeline import quarters_to_slots
+
+from .price_generators import HORIZON_DAYS, RESOLUTIONS, SHAPES, build_timeline, generate_prices
+
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE_PERCENT = 25.0
+# Timings below this absolute difference are treated as noise, whatever the percentage
+DEFAULT_MIN_DELTA_MS = 2.0
+
+
+def case_key(shape: str, days: int, resolution_minutes: int) -> str:
+    """Stable name of a benchmark case, used as key in the baseline file."""
+    return f"{shape}/{days}d/{resolution_minutes}m"
+
+
+def benchmark_case(
+    strategy,
+    prices: list[float],
+    resolution_minutes: int,
+    charge_quarters: int,
+    discharge_quarters: int,
+    repeat: int,
+) -> dict[str, float]:
+    """Runs one strategy on one price series; the best of `repeat` timings is kept."""
+    charge_slots = quarters_to_slots(charge_quarters, resolution_minutes)
+    discharge_slots = quarters_to_slots(discharge_quarters, resolution_minutes)
+    rte_factor = 1.0 - DEFAULT_PERCENTAGE / 100.0
+    min_profit_eur_kwh = DEFAULT_CENTS / 100.0
+
+    best = float('inf')
+    for _ in range(repeat):
+        timeline = build_timeline(prices, resolution_minutes)
+        started = time.perf_counter()
+        strategy.calculate_schedule(timeline, charge_slots, discharge_slots, rte_factor, min_profit_eur_kwh, None)
+        best = min(best, time.perf_counter() - started)
+
+    # Separate pass, tracing slows the strategy down too much to time it at the same time
+    timeline = build_timeline(prices, resolution_minutes)
+    tracemalloc.start()
+    try:
+        strategy.calculate_schedule(timeline, charge_slots, discharge_slots, rte_factor, min_profit_eur_kwh, None)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "slots": len(prices),
+        "wall_ms": round(best * 1000.0, 3),
+        "peak_kib": round(peak / 1024.0, 1),
+        "slots_per_s": round(len(prices) / best) if best > 0 else 0,
+    }
+
+
+def run_benchmarks(
+    strategies: list[str],
+    backend: str = BACKEND_PYTHON,
+    repeat: int = DEFAULT_REPEAT,
+    shapes: tuple[str, ...] = SHAPES,
+    horizons: tuple[int, ...] = HORIZON_DAYS,
+    resolutions: tuple[int, ...] = RESOLUTIONS,
+    charge_quarters: int = DEFAULT_CHARGE_QUARTERS,
+    discharge_quarters: int = DEFAULT_DISCHARGE_QUARTERS,
+) -> dict:
+    """Benchmarks the given strategies on every case and returns a baseline document."""
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for name in strategies:
+        strategy = get_arbitrage_strategy(name, backend)
+        cases = results.setdefault(name, {})
+        for shape, days, resolution in product(shapes, horizons, resolutions):
+            prices = generate_prices(shape, days, resolution)
+            cases[case_key(shape, days, resolution)] = benchmark_case(
+                strategy, prices, resolution, charge_quarters, discharge_quarters, repeat
+            )
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "backend": backend,
+            "repeat": repeat,
+            "charge_quarters": charge_quarters,
+            "discharge_quarters": discharge_quarters,
+        },
+        "results": results,
+    }
+
+
+def find_regressions(
+    baseline: dict,
+    current: dict,
+    tolerance_percent: float = DEFAULT_TOLERANCE_PERCENT,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> list[str]:
+    """
+    Lists every strategy that is worse than the baseline beyond the tolerance.
+
+    Wall time is compared on the total over the cases both runs share, since single
+    sub-millisecond cases are too noisy to gate on. Peak memory is deterministic and is
+    compared per case. Strategies missing from the baseline are skipped, so a newly
+    registered strategy does not fail the gate before it has a baseline.
+    """
+    factor = 1.0 + tolerance_percent / 100.0
+    regressions = []
+    for name, cases in current["results"].items():
+        baseline_cases = baseline["results"].get(name, {})
+        shared = [key for key in cases if key in baseline_cases]
+        if not shared:
+            continue
+
+        wall = sum(cases[key]["wall_ms"] for key in shared)
+        base_wall = sum(baseline_cases[key]["wall_ms"] for key in shared)
+        if wall > base_wall * factor and wall - base_wall > min_delta_ms:
+            regressions.append(f"{name}: total wall time {base_wall:.1f} ms -> {wall:.1f} ms")
+
+        for key in shared:
+            peak, base_peak = cases[key]["peak_kib"], baseline_cases[key]["peak_kib"]
+            if peak > base_peak * factor and peak - base_peak > 1.0:
+                regressions.append(f"{name} {key}: peak memory {base_peak:.1f} KiB -> {peak:.1f} KiB")
+    return regressions
+
+
+def _summary(document: dict) -> str:
+    """One line per strategy with its total wall time and worst peak memory."""
+    lines = []
+    for name, cases in document["results"].items():
+        total_ms = sum(result["wall_ms"] for result in cases.values())
+        total_slots = sum(result["slots"] for result in cases.values())
+        peak = max(result["peak_kib"] for result in cases.values())
+        rate = total_slots / (total_ms / 1000.0) if total_ms else 0.0
+        lines.append(f"{name:<8} {total_ms:10.1f} ms total {rate:12.0f} slots/s  peak {peak:8.1f} KiB")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("run", "compare"):
+        sub = commands.add_parser(command)
+        sub.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=list(STRATEGIES))
+        sub.add_argument("--backend", choices=[BACKEND_AUTO, BACKEND_PYTHON, BACKEND_NUMPY], default=None)
+        sub.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+        if command == "run":
+            sub.add_argument("--output", default=None, help="write the baseline JSON here")
+        else:
+            sub.add_argument("--baseline", required=True)
+            sub.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE_PERCENT, help="allowed regression in percent")
+            sub.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    # Compare against the backend the baseline was recorded with, unless asked otherwise
+    backend = args.backend or (baseline["meta"]["backend"] if baseline else BACKEND_PYTHON)
+
+    current = run_benchmarks(args.strategies, backend, args.repeat)
+    print(_summary(current))
+
+    if args.command == "run":
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(current, file, indent=2, sort_keys=True)
+                file.write("\n")
+            print(f"Baseline written to {args.output}")
+        return 0
+
+    regressions = find_regressions(baseline, current, args.tolerance, args.min_delta_ms)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:g}%")
+        return 1
+    print(f"No regressions beyond {args.tolerance:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Synthetic day-ahead price series for benchmarking the arbitrage strategies."""
+
+from __future__ import annotations
+
+import math
+import random
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from custom_components.zonneplan_peakdetect.core.timeline import SlotTimeline
+
+SHAPES = ("flat", "sine", "duck", "spiky", "negative")
+HORIZON_DAYS = (1, 2, 7)
+RESOLUTIONS = (60, 15, 5)
+
+DEFAULT_START = datetime(2026, 7, 1, tzinfo=timezone.utc)
+
+
+def _bump(hour: float, center: float, width: float) -> float:
+    """Gaussian bump around center (hours of the day)."""
+    return math.exp(-((hour - center) / width) ** 2)
+
+
+def _duck(hour: float, solar_depth: float) -> float:
+    """Duck curve: morning ramp, deep solar valley at noon, steep evening peak."""
+    return (
+        0.22
+        + 0.08 * _bump(hour, 8.0, 1.5)
+        - solar_depth * _bump(hour, 13.0, 2.5)
+        + 0.18 * _bump(hour, 19.5, 1.8)
+    )
+
+
+def generate_prices(shape: str, days: int, resolution_minutes: int, seed: int = 0) -> list[float]:
+    """
+    Returns a price series in €/kWh for `days` days at the given resolution.
+
+    The same shape, horizon, resolution and seed always produce the same series.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown price shape '{shape}', expected one of {', '.join(SHAPES)}")
+
+    rng = random.Random(f"{shape}-{days}-{resolution_minutes}-{seed}")
+    slots = days * 24 * 60 // resolution_minutes
+    prices = []
+    for slot in range(slots):
+        hour = (slot * resolution_minutes / 60.0) % 24.0
+        if shape == "flat":
+            price = 0.25 + rng.uniform(-0.002, 0.002)
+        elif shape == "sine":
+            price = 0.22 + 0.08 * math.sin(2 * math.pi * (hour - 9.0) / 24.0) + rng.gauss(0, 0.01)
+        elif shape == "duck":
+            price = _duck(hour, 0.14) + rng.gauss(0, 0.01)
+        elif shape == "spiky":
+            price = 0.22 + 0.05 * math.sin(2 * math.pi * hour / 12.0) + rng.gauss(0, 0.015)
+            if rng.random() < 0.05:
+                price += rng.uniform(0.3, 0.8)
+        else:
+            price = _duck(hour, 0.32) + rng.gauss(0, 0.015)
+        prices.append(round(price, 5))
+    return prices
+
+
+def build_timeline(
+    prices: list[float], resolution_minutes: int, start: datetime = DEFAULT_START
+) -> SlotTimeline:
+    """Builds the slot timeline the sensor would hand to a strategy for this price series."""
+    starts = [start + timedelta(minutes=resolution_minutes * slot) for slot in range(len(prices))]
+    return SlotTimeline(
+        [slot_start.isoformat() for slot_start in starts],
+        array('d', prices),
+        array('d', [1.0]) * len(prices),
+        starts,
+        resolution_minutes,
+    )
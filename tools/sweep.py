@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Sweeps the strategy parameters over a price history and reports the most profitable settings.
+
+    python -m tools.sweep prices_2025.csv --charge-quarters 4:16:2 --discharge-quarters 4:16:2
+    python -m tools.sweep prices_2025.csv --sample lhs --samples 2000 --rte 10:30 --min-profit 0:10
+
+Every parameter takes a list (`4,8,12`) or a range (`start:stop[:step]`, stop included).
+`grid` evaluates every combination; `random` and `lhs` (Latin hypercube) draw --samples
+combinations from the ranges. The history is parsed once and handed to the worker processes
+through shared memory; each worker splits it into days once and then backtests one
+combination per job with the same engine as tools.backtest.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from itertools import product
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from custom_components.zonneplan_peakdetect.const import (
+    BACKEND_AUTO,
+    BACKEND_NUMPY,
+    BACKEND_PYTHON,
+    DEFAULT_CENTS,
+    DEFAULT_CHARGE_QUARTERS,
+    DEFAULT_DISCHARGE_QUARTERS,
+    DEFAULT_PERCENTAGE,
+)
+from custom_components.zonneplan_peakdetect.core.strategies import STRATEGIES
+
+from .backtest import (
+    DEFAULT_PUBLISH_HOUR,
+    DEFAULT_REPLAN_MINUTES,
+    DEFAULT_TIMEZONE,
+    WINDOW_START_DAY,
+    WINDOW_START_NOW,
+    BacktestConfig,
+    DayTask,
+    build_tasks,
+    load_prices,
+    simulate_day,
+    summarize,
+)
+from .price_generators import SHAPES, generate_prices
+
+SAMPLE_GRID = "grid"
+SAMPLE_RANDOM = "random"
+SAMPLE_LHS = "lhs"
+
+# Swept fields of BacktestConfig and whether they only take whole numbers
+PARAMETERS = {
+    "charge_quarters": True,
+    "discharge_quarters": True,
+    "rte_percent": False,
+    "min_profit_c_kwh": False,
+}
+
+# Per worker process: the day tasks built once from the shared history
+_worker_tasks: list[DayTask] = []
+
+
+def parse_values(spec: str, integer: bool) -> list[float]:
+    """Expands `a,b,c` or `start:stop[:step]` (stop included) into a list of values."""
+    if ":" not in spec:
+        values = [float(part) for part in spec.split(",") if part]
+    else:
+        parts = [float(part) for part in spec.split(":")]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid range '{spec}', expected start:stop[:step]")
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) == 3 else 1.0
+        if step <= 0 or stop < start:
+            raise ValueError(f"Invalid range '{spec}'")
+        count = int((stop - start) / step + 1e-9) + 1
+        values = [start + k * step for k in range(count)]
+    return [int(round(value)) if integer else round(value, 6) for value in values]
+
+
+def sample_combinations(
+    space: dict[str, list[float]], method: str = SAMPLE_GRID, samples: int = 100, seed: int = 0
+) -> list[dict[str, float]]:
+    """
+    Returns the parameter combinations to evaluate.
+
+    The grid takes every listed value; random and Latin hypercube sampling draw from the
+    range between the smallest and largest listed value of every parameter, rounding the
+    whole-number parameters. Duplicates are dropped.
+    """
+    names = list(space)
+    if method == SAMPLE_GRID:
+        return [dict(zip(names, values)) for values in product(*(space[name] for name in names))]
+
+    rng = random.Random(seed)
+    if method == SAMPLE_LHS:
+        # One value from every stratum per parameter, strata shuffled independently
+        columns = []
+        for _ in names:
+            strata = [(k + rng.random()) / samples for k in range(samples)]
+            rng.shuffle(strata)
+            columns.append(strata)
+        units = list(zip(*columns))
+    elif method == SAMPLE_RANDOM:
+        units = [tuple(rng.random() for _ in names) for _ in range(samples)]
+    else:
+        raise ValueError(f"Unknown sampling method '{method}'")
+
+    combinations: dict[tuple[float, ...], dict[str, float]] = {}
+    for unit in units:
+        values = []
+        for name, u in zip(names, unit):
+            low, high = min(space[name]), max(space[name])
+            value = low + u * (high - low)
+            values.append(int(round(value)) if PARAMETERS.get(name) else round(value, 4))
+        combinations.setdefault(tuple(values), dict(zip(names, values)))
+    return list(combinations.values())
+
+
+def _init_worker(name: str, slots: int, config: BacktestConfig) -> None:
+    """Copies the shared history out of shared memory and splits it into day tasks, once per worker."""
+    global _worker_tasks
+    shared = SharedMemory(name=name)
+    try:
+        history = array('d')
+        history.frombytes(shared.buf[:2 * slots * history.itemsize])
+    finally:
+        shared.close()
+    tz = ZoneInfo(config.timezone)
+    starts = [datetime.fromtimestamp(epoch, tz) for epoch in history[:slots]]
+    _worker_tasks = build_tasks(starts, history[slots:], config)
+
+
+def _evaluate(config: BacktestConfig) -> dict[str, Any]:
+    """Backtests one parameter combination on the tasks of this worker."""
+    started = time.perf_counter()
+    days = [simulate_day(task, config) for task in _worker_tasks]
+    return summarize(days, config, time.perf_counter() - started)
+
+
+def run_sweep(
+    starts: list[datetime],
+    prices: array,
+    configs: list[BacktestConfig],
+    workers: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Backtests every config over the history and returns their reports in the same order.
+
+    All configs must share the replay settings (timezone, re-plan cadence, publish hour and
+    window start), since the day tasks are built once per worker from the first config.
+    """
+    if not configs or not starts:
+        return []
+    history = array('d', [start.timestamp() for start in starts])
+    history.extend(prices)
+    shared = SharedMemory(create=True, size=len(history) * history.itemsize)
+    try:
+        shared.buf[:len(history) * history.itemsize] = history.tobytes()
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared.name, len(starts), configs[0])
+        ) as executor:
+            chunksize = max(1, len(configs) // (8 * workers))
+            return list(executor.map(_evaluate, configs, chunksize=chunksize))
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def best_per_strategy(reports: list[dict[str, Any]], top: int = 1) -> dict[str, list[dict[str, Any]]]:
+    """The `top` most profitable reports of every strategy."""
+    ranked: dict[str, list[dict[str, Any]]] = {}
+    for report in sorted(reports, key=lambda report: report["profit_eur"], reverse=True):
+        entries = ranked.setdefault(report["strategy"], [])
+        if len(entries) < top:
+            entries.append(report)
+    return ranked
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("prices", nargs="?", help="CSV, JSON or YAML file with historical prices")
+    parser.add_argument("--synthetic", choices=SHAPES, help="sweep over a generated price series instead")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--resolution", type=int, default=15, help="minutes per slot of the synthetic series")
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--backend", choices=[BACKEND_AUTO, BACKEND_PYTHON, BACKEND_NUMPY], default=BACKEND_PYTHON)
+    parser.add_argument("--charge-quarters", default=str(DEFAULT_CHARGE_QUARTERS))
+    parser.add_argument("--discharge-quarters", default=str(DEFAULT_DISCHARGE_QUARTERS))
+    parser.add_argument("--rte", default=str(DEFAULT_PERCENTAGE), help="price delta / RTE loss in percent")
+    parser.add_argument("--min-profit", default=str(DEFAULT_CENTS), help="minimum profit in ct/kWh")
+    parser.add_argument("--sample", choices=[SAMPLE_GRID, SAMPLE_RANDOM, SAMPLE_LHS], default=SAMPLE_GRID)
+    parser.add_argument("--samples", type=int, default=200, help="combinations drawn by random/lhs sampling")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capacity", type=float, default=1.0, help="battery capacity in kWh")
+    parser.add_argument("--replan-minutes", type=int, default=DEFAULT_REPLAN_MINUTES)
+    parser.add_argument("--publish-hour", type=int, default=DEFAULT_PUBLISH_HOUR)
+    parser.add_argument("--timezone", default=DEFAULT_TIMEZONE)
+    parser.add_argument("--window-start", choices=[WINDOW_START_DAY, WINDOW_START_NOW], default=WINDOW_START_DAY)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--top", type=int, default=3, help="settings reported per strategy")
+    parser.add_argument("--output", default=None, help="write all reports as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        start = datetime.combine(date(2025, 1, 1), datetime.min.time(), ZoneInfo(args.timezone))
+        prices = array('d', generate_prices(args.synthetic, args.days, args.resolution))
+        starts = [start + timedelta(minutes=args.resolution * slot) for slot in range(len(prices))]
+    elif args.prices:
+        starts, prices = load_prices(args.prices)
+    else:
+        parser.error("either a price file or --synthetic is required")
+
+    try:
+        space = {
+            "charge_quarters": parse_values(args.charge_quarters, True),
+            "discharge_quarters": parse_values(args.discharge_quarters, True),
+            "rte_percent": parse_values(args.rte, False),
+            "min_profit_c_kwh": parse_values(args.min_profit, False),
+        }
+    except ValueError as err:
+        parser.error(str(err))
+    combinations = sample_combinations(space, args.sample, args.samples, args.seed)
+
+    base = BacktestConfig(
+        args.strategies[0],
+        args.backend,
+        capacity_kwh=args.capacity,
+        replan_minutes=args.replan_minutes,
+        publish_hour=args.publish_hour,
+        timezone=args.timezone,
+        window_start=args.window_start,
+    )
+    configs = [
+        replace(base, strategy=name, **combination)
+        for name in args.strategies
+        for combination in combinations
+    ]
+
+    started = time.perf_counter()
+    reports = run_sweep(starts, prices, configs, args.workers)
+    for config, report in zip(configs, reports):
+        report["parameters"] = {name: getattr(config, name) for name in PARAMETERS}
+    print(f"{len(configs)} backtests over {len(starts)} slots in {time.perf_counter() - started:.1f} s")
+
+    for name, entries in best_per_strategy(reports, args.top).items():
+        for rank, report in enumerate(entries, 1):
+            parameters = "  ".join(f"{key}={value:g}" for key, value in report["parameters"].items())
+            print(f"{name:<8} #{rank} profit {report['profit_eur']:10.2f} EUR  cycles {report['cycles']:7.1f}  {parameters}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(reports, file, indent=2)
+            file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())